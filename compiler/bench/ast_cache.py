@@ -0,0 +1,60 @@
+"""
+AST cache benchmark: front-end time of a cold run (hash + parse + store)
+against a warm run (hash + map the entry and rebuild the tree) on generated
+programs of several sizes.
+
+Usage (from compiler/): python bench/ast_cache.py [repeats]
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.ast_cache import ASTCache
+from classes.parser import Parser
+
+def generated_program(statements: int) -> str:
+    lines = ["BEGIN", "int i = 0", "int total = 0", "eq line = 3 * x + y / 4 - 7"]
+    for n in range(statements):
+        lines += [f"total = (total + i * {n}) / 3 - {n} // statement {n}",
+                  f"if total > {n} && i != {n}", "BEGIN", f"    print(total - {n})", "END"]
+    lines.append("END")
+    return "\n".join(lines) + "\n"
+
+def front_end(path: str, cache: ASTCache) -> None:
+    """What main.py does before running the program."""
+    with open(path, "rb") as source_file:
+        source_hash = ASTCache.source_hash(source_file)
+        program = cache.load(source_hash)
+        if program is None:
+            program = Parser.run_stream(io.TextIOWrapper(source_file))
+            cache.store(source_hash, program)
+
+def best_of(repeats: int, setup, run) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        setup(); start = time.perf_counter(); run(); best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    work_dir = tempfile.mkdtemp(prefix="khcache-bench-")
+    try:
+        cache_dir = os.path.join(work_dir, ASTCache.DEFAULT_DIR_NAME)
+        cache = ASTCache(cache_dir)
+        print(f"{'statements':>10} {'source':>9} {'cold (parse)':>13} {'warm (cache)':>13} {'speed-up':>9}")
+        for statements in (10, 100, 1000, 10000):
+            path = os.path.join(work_dir, f"program_{statements}.kh")
+            with open(path, "w") as f: f.write(generated_program(statements))
+            cold = best_of(repeats, lambda: shutil.rmtree(cache_dir, ignore_errors=True), lambda: front_end(path, cache))
+            warm = best_of(repeats, lambda: None, lambda: front_end(path, cache))
+            print(f"{statements:>10} {os.path.getsize(path) / 1024:>7.0f}KiB {cold * 1000:>11.2f}ms {warm * 1000:>11.2f}ms {cold / warm:>8.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
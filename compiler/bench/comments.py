@@ -0,0 +1,71 @@
+"""
+Comment-heavy lexing benchmark: the old two-pass front end vs. the single pass.
+
+Before, Parser.run first removed comments with a regex over the whole source
+(`re.subn(r'//(.*?)\\n|//(.*?)$', '', code)`, the former PrePro.filter). This
+built a second copy of the program, and then the lexer scanned what was left.
+Now the lexer skips `//` comments while it looks for the next token. This script
+times both paths on a generated program where most of the bytes are comments,
+and reports their peak memory.
+
+Usage (from compiler/): python bench/comments.py [program_kib] [repeats]
+"""
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.regex_tokenizer import RegexTokenizer
+from classes.token_ import EOF
+
+LEGACY_COMMENT_PATTERN = re.compile(r'//(.*?)\n|//(.*?)$')
+
+def two_pass(source: str) -> int:
+    tokenizer = RegexTokenizer(LEGACY_COMMENT_PATTERN.subn('', source)[0]); count = 1
+    while tokenizer.next.ttype != EOF: tokenizer.select_next(); count += 1
+    return count
+
+def single_pass(source: str) -> int:
+    tokenizer = RegexTokenizer(source); count = 1
+    while tokenizer.next.ttype != EOF: tokenizer.select_next(); count += 1
+    return count
+
+def commented_program(size_bytes: int) -> str:
+    """Each statement is preceded by a comment block and followed by a trailing comment."""
+    lines = ["// generated benchmark program", "BEGIN", "int counter = 0"]
+    size = 0; i = 0
+    while size < size_bytes:
+        block = [f"    // step {i}: {'explains what the next statement does and why ' * 3}",
+                 f"    //   see also step {i - 1}; nothing in here is ever tokenized",
+                 f"    counter = counter + {i} // running sum, trailing comment {i}"]
+        lines += block; size += sum(len(line) + 1 for line in block); i += 1
+    lines.append("END")
+    return "\n".join(lines) + "\n"
+
+def measure(front_end, source: str, repeats: int):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter(); front_end(source); best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    front_end(source)
+    peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return best, peak
+
+def main() -> None:
+    program_kib = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = commented_program(program_kib * 1024)
+    comment_bytes = sum(len(match.group(0)) for match in re.finditer(r"//[^\n]*", source))
+    print(f"program: {len(source) / 1024:.0f} KiB, {comment_bytes / len(source):.0%} comments")
+    results = {}
+    for label, front_end in (("regex strip + lexer (old)", two_pass), ("lexer only (single pass)", single_pass)):
+        elapsed, peak = results[label] = measure(front_end, source, repeats)
+        print(f"  {label:<26} {elapsed:.3f}s  peak {peak / 1024:.0f} KiB")
+    (old_time, old_peak), (new_time, new_peak) = results.values()
+    print(f"  speed-up {old_time / new_time:.2f}x, peak memory {new_peak / old_peak:.1%} of the two-pass front end")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for input sources: a loop that reads and sums integers with
+input(), run by the VM with its values coming from stdin redirected to a file
+(one input() call per value), from the same file through FileSource
+(memory-mapped and parsed in bulk) and from a list and a NumPy array through
+IterableSource. Reports wall time per source, setup included, and checks that
+the output is the same.
+
+Usage (from compiler/): python bench/input_source.py [values]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.optimizer import Optimizer
+from classes.type_checker import TypeChecker
+from classes.symbol_table import SymbolTable
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.input_source import StdinSource, FileSource, IterableSource, set_input_source
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def program(count: int) -> str:
+    return "\n".join([
+        "BEGIN", "int total = 0", "int i = 0",
+        f"while i < {count}", "BEGIN", "total = total + input()", "i = i + 1", "END",
+        "print(total)", "END"]) + "\n"
+
+def run(bytecode, make_source, stdin_path: str):
+    output = io.StringIO()
+    with open(stdin_path, encoding="utf-8") as stdin, contextlib.redirect_stdout(output):
+        saved_stdin = sys.stdin; sys.stdin = stdin
+        try:
+            start = time.perf_counter()
+            previous = set_input_source(make_source())
+            try: VM(bytecode).run(SymbolTable())
+            finally: set_input_source(previous)
+            elapsed = time.perf_counter() - start
+        finally: sys.stdin = saved_stdin
+    return elapsed, output.getvalue()
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    values = [(i * 7919) % 100003 - 50000 for i in range(count)]
+    ast = Parser.run(program(count)); TypeChecker.run(ast); Optimizer.run(ast)
+    bytecode = Compiler.run(ast)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.txt")
+        with open(path, "w", encoding="utf-8") as file: file.write("\n".join(map(str, values)) + "\n")
+        sources = [("stdin", StdinSource), ("file", lambda: FileSource(path)), ("list", lambda: IterableSource(values))]
+        if np is not None: sources.append(("numpy array", lambda: IterableSource(np.array(values, dtype=np.int64))))
+        print(f"{count} input() values")
+        print(f"{'source':<12} {'time (s)':>9} {'vs stdin':>9}")
+        stdin_time, expected = run(bytecode, StdinSource, path)
+        for label, make_source in sources:
+            elapsed, output = (stdin_time, expected) if label == "stdin" else run(bytecode, make_source, path)
+            assert output == expected == f"{sum(values)}\n", (label, output, expected)
+            print(f"{label:<12} {elapsed:>9.3f} {stdin_time / elapsed:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Lexer differential check and benchmark.
+
+1. Runs Tokenizer and RegexTokenizer over every program in testes/ and over
+   randomly generated inputs, and fails if the token streams (type, value,
+   line, column) or the lexical errors differ. StreamTokenizer, fed through
+   tiny chunks, must match RegexTokenizer the same way (the checks are in
+   tests/lexer_differential.py, shared with tests/test_lexer.py).
+2. Times the lexers on a large generated program and reports the peak memory
+   of lexing it from a file loaded whole vs. streamed.
+
+Usage (from compiler/): python bench/lexer.py [fuzz_cases] [program_kib]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.token_ import EOF
+from classes.tokenizer import Tokenizer
+from classes.regex_tokenizer import RegexTokenizer
+from classes.stream_tokenizer import StreamTokenizer
+from tests.lexer_differential import check, check_stream, sources as differential_sources
+
+def generated_program(size_bytes: int) -> str:
+    """Statement-heavy program with a few very long identifiers and numbers."""
+    lines = ["BEGIN", "int counter = 0", "int total_accumulator", "eq longEquationName = 3 * x + y / 4"]
+    size = 0; i = 0
+    while size < size_bytes:
+        block = [f"    total_accumulator = (counter * {i} + 12345) / 7 - counter // running sum {i}",
+                 f"    if counter >= {i} && total_accumulator != 0 || false"]
+        if i % 100 == 0: block.append(f"    int generated_identifier_{'x' * 2000} = {'9' * 2000}")
+        lines += block; size += sum(len(line) + 1 for line in block); i += 1
+    lines.append("END")
+    return "\n".join(lines) + "\n"
+
+def time_lexer(tokenizer_class, source) -> float:
+    start = time.perf_counter()
+    tokenizer = tokenizer_class(source)
+    while tokenizer.next.ttype != EOF: tokenizer.select_next()
+    return time.perf_counter() - start
+
+def main() -> None:
+    fuzz_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    program_kib = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    sources = differential_sources(fuzz_cases)
+    failures = check(sources)
+    print(f"differential check: {len(sources)} inputs, {failures} mismatches")
+    stream_failures = check_stream(sources)
+    print(f"stream differential check: {len(sources)} inputs, {stream_failures} mismatches")
+    failures += stream_failures
+
+    source = generated_program(program_kib * 1024)
+    simple = time_lexer(Tokenizer, source); fast = time_lexer(RegexTokenizer, source)
+    print(f"lexing {len(source) / 1024:.0f} KiB: Tokenizer {simple:.3f}s, RegexTokenizer {fast:.3f}s ({simple / fast:.1f}x)")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".kh", delete=False) as f: f.write(source)
+    try:
+        def whole_file():
+            with open(f.name, "r") as handle: return RegexTokenizer(handle.read())
+        def streamed():
+            handle = open(f.name, "r"); return StreamTokenizer(handle), handle
+        for label, make in (("read() + RegexTokenizer", whole_file), ("StreamTokenizer", streamed)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            made = make(); tokenizer = made[0] if isinstance(made, tuple) else made
+            while tokenizer.next.ttype != EOF: tokenizer.select_next()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+            if isinstance(made, tuple): made[1].close()
+            print(f"  {label:<24} {elapsed:.3f}s (traced), peak {peak / 1024:.0f} KiB")
+    finally: os.unlink(f.name)
+    if failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+AST memory benchmark: parses a large generated program and reports how many
+nodes it has and the bytes they take, measured with tracemalloc as the memory
+still held once parsing is done (so the source and tokens are not counted).
+
+The same program is then parsed into the array-backed FlatAST, and both forms
+are saved and reloaded (the Node tree pickled, the FlatAST mapped as the AST
+cache does it). The two forms are run on a smaller program to check they print
+the same thing.
+
+Usage (from compiler/): python bench/node_memory.py [statements]
+"""
+import contextlib
+import gc
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.node import Node
+from classes.parser import Parser
+from classes.flat_ast import FlatAST, FlatBuilder
+from classes.symbol_table import SymbolTable
+
+def generated_program(statements: int) -> str:
+    lines = ["BEGIN", "int i = 0", "int total = 0", "int x", "int y"]
+    for n in range(statements):
+        lines += [f"eq e{n} = 3 * x + y / 4 - (x - {n}) * 2", f"total = (total + i * {n}) / 3 - {n}",
+                  f"if total > {n} && i != {n}", "BEGIN", f"    print(total - {n}, -i)", "END",
+                  f"solve(e{n} == {n}, x, y == i)"]
+    lines.append("END")
+    return "\n".join(lines) + "\n"
+
+def shallow_size(node: Node) -> int:
+    """The node object, its instance dict and its own children list (not the nodes in it)."""
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"): size += sys.getsizeof(node.__dict__)
+    if isinstance(node.children, list): size += sys.getsizeof(node.children)
+    return size
+
+def count_nodes(root: Node):
+    counts = Counter(); sizes = {}; stack = [root]
+    while stack:
+        node = stack.pop(); name = type(node).__name__; counts[name] += 1
+        sizes[name] = min(sizes.get(name, sys.maxsize), shallow_size(node))
+        stack.extend(child for child in node.children if isinstance(child, Node))
+    return counts, sizes
+
+def parse_measured(source: str, builder=None):
+    """The parsed program, the parse time and the memory it holds."""
+    gc.collect(); tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter(); program = Parser.run(source, builder=builder); elapsed = time.perf_counter() - start
+    gc.collect(); held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return program, elapsed, held
+
+def reload_time(path: str, write, load) -> float:
+    with open(path, "wb") as file: write(file)
+    start = time.perf_counter(); load(path); return time.perf_counter() - start
+
+def run_output(program) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output): program.evaluate(SymbolTable(parent=None))
+    return output.getvalue()
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generated_program(statements)
+    program, elapsed, held = parse_measured(source)
+    counts, sizes = count_nodes(program); total = sum(counts.values())
+    print(f"{statements} generated statements, {len(source) / 1024:.0f} KiB of source, parsed in {elapsed:.2f}s")
+    print(f"{total} nodes, {held / 2**20:.1f} MiB held by the AST, {held / total:.0f} bytes per node")
+    print(f"  {'class':<16} {'nodes':>9} {'bytes (min)':>11}")
+    for name, count in counts.most_common(): print(f"  {name:<16} {count:>9} {sizes[name]:>11}")
+    flat, flat_elapsed, flat_held = parse_measured(source, FlatBuilder())
+    print(f"FlatAST: {len(flat)} nodes, parsed in {flat_elapsed:.2f}s, {flat_held / 2**20:.1f} MiB held, {flat_held / len(flat):.0f} bytes per node")
+    with tempfile.TemporaryDirectory() as directory:
+        def load_pickle(path):
+            with open(path, "rb") as file: return pickle.load(file)
+        pickled = reload_time(os.path.join(directory, "ast.pickle"), lambda file: pickle.dump(program, file, protocol=pickle.HIGHEST_PROTOCOL), load_pickle)
+        mapped = reload_time(os.path.join(directory, "ast.khf"), flat.write, FlatAST.open)
+        print(f"reload: Node tree (pickle) {pickled * 1000:.1f}ms, FlatAST (mmap) {mapped * 1000:.1f}ms")
+    small = generated_program(50)
+    same = run_output(Parser.run(small)) == run_output(Parser.run(small, builder=FlatBuilder()))
+    print(f"output of a 50-statement program: {'same' if same else 'DIFFERS'}")
+    if not same: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark for the output sink: a loop that prints one line per iteration, run
+by the tree-walker and the VM with every line passed to print() (as before the
+sink) and with the default buffered StreamSink. The output goes to a file,
+block-buffered as when stdout is redirected, and line-buffered as on a
+terminal or under `python -u`, where each print() is a write system call.
+
+Also runs it into a ListSink and checks that every sink gets the same lines.
+
+Usage (from compiler/): python bench/output_sink.py [iterations]
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.optimizer import Optimizer
+from classes.type_checker import TypeChecker
+from classes.symbol_table import SymbolTable
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.output import OutputSink, StreamSink, ListSink, set_sink
+
+class PrintSink(OutputSink):
+    """One print() call per line."""
+    def write_line(self, line: str) -> None:
+        print(line)
+
+def program(iterations: int) -> str:
+    return "\n".join([
+        "BEGIN", "int i = 0", "eq line = 2 * x + 1",
+        f"while i < {iterations}", "BEGIN",
+        "print(i)", "i = i + 1", "END",
+        "print(line)", "END"]) + "\n"
+
+def run(ast, engine: str, sink: OutputSink) -> float:
+    previous = set_sink(sink)
+    try:
+        start = time.perf_counter()
+        if engine == "vm": VM(Compiler.run(ast)).run(SymbolTable())
+        else: ast.evaluate(SymbolTable())
+        return time.perf_counter() - start
+    finally: set_sink(previous)
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    ast = Parser.run(program(iterations)); TypeChecker.run(ast); Optimizer.run(ast)
+    expected = ListSink(); run(ast, "tree", expected)
+    print(f"{iterations} printed lines")
+    print(f"{'stdout':<15} {'engine':<7} {'print() (s)':>12} {'buffered (s)':>13} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "output.txt")
+        for label, line_buffering in (("block-buffered", False), ("line-buffered", True)):
+            for engine in ("tree", "vm"):
+                times = []
+                for sink in (PrintSink(), StreamSink()):
+                    with open(path, "w", encoding="utf-8") as file, contextlib.redirect_stdout(file):
+                        file.reconfigure(line_buffering=line_buffering); times.append(run(ast, engine, sink))
+                    with open(path, encoding="utf-8") as file: assert file.read().splitlines() == expected.lines, (engine, type(sink).__name__)
+                print(f"{label:<15} {engine:<7} {times[0]:>12.3f} {times[1]:>13.3f} {times[0] / times[1]:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark for the statement profiler: the while loop of bench/type_checks.py
+run by the tree-walker before, with and after the Profiler.
+
+The profiler swaps timed evaluate methods into the statement classes only
+while installed, so the runs before and after it must take the same time and
+find the original methods in place. Reports wall time of each run, the
+profiled run's overhead and its hot-spot table, and checks that the output is
+the same.
+
+Usage (from compiler/): python bench/profiler.py [iterations]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.optimizer import Optimizer
+from classes.type_checker import TypeChecker
+from classes.symbol_table import SymbolTable
+from classes.profiler import Profiler, PROFILED_STATEMENTS
+
+def program(iterations: int) -> str:
+    return "\n".join([
+        "BEGIN", "int total = 0", "int i = 0", "bool odd = false",
+        f"while i < {iterations}", "BEGIN",
+        "int square = i * i",
+        "if odd && square > 10", "BEGIN", "total = total + square / 3 - i", "END",
+        "else", "BEGIN", "total = total - (i - 1) * 2", "END",
+        "odd = !odd", "i = i + 1", "END",
+        "print(total, odd)", "END"]) + "\n"
+
+def run(ast, profiler=None):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        if profiler: profiler.install()
+        try: ast.evaluate(SymbolTable())
+        finally:
+            if profiler: profiler.uninstall()
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ast = Parser.run(program(iterations)); TypeChecker.run(ast); Optimizer.run(ast)
+    originals = {node_class: node_class.__dict__["evaluate"] for node_class in PROFILED_STATEMENTS}
+    before_time, before_output = run(ast)
+    profiler = Profiler(); profiled_time, profiled_output = run(ast, profiler)
+    after_time, after_output = run(ast)
+    assert profiled_output == before_output == after_output, (before_output, profiled_output, after_output)
+    assert all(node_class.__dict__["evaluate"] is evaluate for node_class, evaluate in originals.items())
+    print(f"while loop, {iterations} iterations")
+    print(f"{'run':<16} {'time (s)':>9}")
+    for label, elapsed in (("before profiling", before_time), ("profiled", profiled_time), ("after profiling", after_time)):
+        print(f"{label:<16} {elapsed:>9.3f}")
+    print(f"profiling overhead {profiled_time / before_time:.2f}x\n")
+    print(profiler.report())
+
+if __name__ == "__main__":
+    main()
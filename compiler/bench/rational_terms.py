@@ -0,0 +1,58 @@
+"""
+Benchmark for exact (rational) coefficients in solve(): a generated equation of
+thousands of terms `c * v / d` over int variables, solved for x a number of
+times, through the equation's cached LinearForm and through the AST walk
+(SolveCmdNode.use_linear_forms = False).
+
+"fractional" picks the divisors at random, so almost every division leaves a
+Fraction; "exact" makes every divisor divide its numerator, so the equation
+has int coefficients. The AST walk carries Fractions through every node; the
+LinearForm is scaled to int coefficients once (LinearForm.integral), so both
+equations are solved on ints. The printed result is checked against one
+computed directly with fractions.Fraction (see tests/rational_equations.py).
+
+Usage (from compiler/): python bench/rational_terms.py [terms] [solves]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable
+from classes.ops import SolveCmdNode
+from tests.rational_equations import equation, expected_line
+
+def run(source: str, use_linear_forms: bool):
+    SolveCmdNode.use_linear_forms = use_linear_forms
+    program = Parser.run(source); output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output): program.evaluate(SymbolTable(parent=None))
+    return time.perf_counter() - start, output.getvalue()
+
+def main() -> None:
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    solves = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    failures = 0
+    print(f"{terms} terms, {solves} solves")
+    print(f"{'divisions':<11} {'AST walk (s)':>13} {'linear form (s)':>16} {'speed-up':>9}  result")
+    for exact in (False, True):
+        declarations, body, const = equation(terms, exact, random.Random(terms))
+        source = "\n".join(["BEGIN", "int x", *declarations, f"eq f = {body}", "int i = 0", f"while i < {solves}", "BEGIN",
+                            "solve(f == 0, x)", "i = i + 1", "END", "END"]) + "\n"
+        walk_time, walk_output = run(source, False)
+        form_time, form_output = run(source, True)
+        line = form_output.splitlines()[0]
+        ok = walk_output == form_output and form_output == (line + "\n") * solves and line == expected_line(const)
+        failures += not ok
+        print(f"{'exact' if exact else 'fractional':<11} {walk_time:>13.3f} {form_time:>16.3f} {walk_time / form_time:>8.1f}x  "
+              f"{line if ok else 'WRONG: ' + line}")
+    SolveCmdNode.use_linear_forms = True
+    if failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
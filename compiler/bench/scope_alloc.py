@@ -0,0 +1,99 @@
+"""
+Allocation benchmark for block scopes: a while loop of 10^6 iterations whose body
+declares a variable and runs an `if` branch, executed with scope recycling on and off.
+
+Reports wall time, the number of scope objects created and the approximate
+memory allocated for them (object, instance dict and variable storage).
+
+Usage (from compiler/): python bench/scope_alloc.py [iterations]
+"""
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable, Frame
+from classes.value_type import INT_TYPE
+from classes.ops import BlockNode
+from classes.bytecode import Compiler
+from classes.vm import VM
+
+PROGRAM = """BEGIN
+int i = 0
+int s = 0
+while i < {n}
+BEGIN
+    int t = i * 2
+    if t > 5
+    BEGIN
+        s = s + 1
+    END
+    i = i + 1
+END
+print(s)
+END
+"""
+
+class CountingSymbolTable(SymbolTable):
+    created = 0
+    def __init__(self, *args, **kwargs): CountingSymbolTable.created += 1; super().__init__(*args, **kwargs)
+
+def measure(run):
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): run()
+    return time.perf_counter() - start
+
+def scope_size(scope) -> int:
+    """Bytes held by one scope holding a single variable."""
+    if isinstance(scope, Frame): storage = sys.getsizeof(scope.values) + sys.getsizeof(scope.blank)
+    else: storage = sys.getsizeof({"t": (0, INT_TYPE)})
+    return sys.getsizeof(scope) + sys.getsizeof(scope.__dict__) + storage
+
+def count_frames(run):
+    created = [0]; original_init = Frame.__init__
+    def counting_init(self, *args, **kwargs): created[0] += 1; original_init(self, *args, **kwargs)
+    Frame.__init__ = counting_init
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): run()
+    finally: Frame.__init__ = original_init
+    return created[0]
+
+def count_symbol_tables(run):
+    import classes.ops as ops
+    original = ops.SymbolTable; ops.SymbolTable = CountingSymbolTable; CountingSymbolTable.created = 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): run()
+    finally: ops.SymbolTable = original
+    return CountingSymbolTable.created
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    source = PROGRAM.format(n=n)
+    print(f"while loop, {n} iterations")
+    print(f"{'engine':<8} {'scopes':<8} {'time (s)':>9} {'scopes created':>15} {'scope bytes':>13}")
+    for recycle in (False, True):
+        BlockNode.recycle_scopes = recycle
+        ast = Parser.run(source)
+        run = lambda: ast.evaluate(SymbolTable(parent=None))
+        elapsed = measure(run)
+        created = count_symbol_tables(lambda: Parser.run(source).evaluate(SymbolTable(parent=None)))
+        bytes_allocated = created * scope_size(SymbolTable(parent=None))
+        print(f"{'tree':<8} {'pooled' if recycle else 'fresh':<8} {elapsed:>9.3f} {created:>15} {bytes_allocated:>13}")
+    BlockNode.recycle_scopes = True
+    for recycle in (False, True):
+        VM.recycle_frames = recycle
+        bytecode = Compiler.run(Parser.run(source))
+        run = lambda: VM(bytecode).run(SymbolTable(parent=None))
+        elapsed = measure(run); created = count_frames(run)
+        bytes_allocated = created * scope_size(Frame(bytecode.layout))
+        print(f"{'vm':<8} {'pooled' if recycle else 'fresh':<8} {elapsed:>9.3f} {created:>15} {bytes_allocated:>13}")
+    VM.recycle_frames = True
+
+if __name__ == "__main__":
+    main()
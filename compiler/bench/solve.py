@@ -0,0 +1,139 @@
+"""
+solve() benchmark: the README's `while` loop solving the same equation once per
+iteration, with the equation's cached LinearForm vs. substitute_ast +
+collect_terms_linear on every call (SolveCmdNode.use_linear_forms = False).
+Output of both runs is compared as well.
+
+The README sweep is also run as one range solve(), `y in 0..n`, against the
+loop, with and without NumPy (classes/batch_solve.py), comparing output.
+
+Then times multi-variable solve() on generated sparse systems of a few hundred
+equations with a known integer solution, through the language and directly
+on classes/linear_system.py, and checks the solution.
+
+Usage (from compiler/): python bench/solve.py [iterations] [system_sizes...]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable
+from classes.ops import SolveCmdNode
+from classes.linear_system import solve_linear_system, UNIQUE
+import classes.batch_solve as batch_solve
+
+PROGRAMS = {
+    "README sweep": """BEGIN
+int x
+int y
+int z = 5
+eq fxy = 3*x + y/4 + z + 3
+int i = 0
+while i <= {n}
+BEGIN
+solve(fxy == 0, x, y==i)
+i = i + 1
+END
+END
+""",
+    "wide equation": """BEGIN
+int a = 2
+int b = 3
+int c
+int x
+eq wide = a*x + b*y + 4*(x - c) - (7*p + 2*q - r) / 1 + 12*s - 3*(t + u + v) + w * 2 + 5
+int i = 0
+while i <= {n}
+BEGIN
+solve(wide == i, x, y==i, p==1, q==2, r==3, s==i, t==0, u==1, v==2, w==i, c==1)
+i = i + 1
+END
+END
+""",
+}
+
+RANGE_PROGRAM = """BEGIN
+int x
+int y
+int z = 5
+eq fxy = 3*x + y/4 + z + 3
+solve(fxy == 0, x, y in 0..{n})
+END
+"""
+
+def run(source: str, use_linear_forms: bool):
+    SolveCmdNode.use_linear_forms = use_linear_forms
+    program = Parser.run(source)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output): program.evaluate(SymbolTable(parent=None))
+    return time.perf_counter() - start, output.getvalue()
+
+def bench_range(iterations: int, loop_time: float, loop_output: str) -> bool:
+    """The README sweep as a range solve(), against the loop's time and output."""
+    numpy = batch_solve.np; ok = True
+    for label, module in (("NumPy", numpy), ("pure Python", None)):
+        if label == "NumPy" and numpy is None: print("range solve     NumPy not installed, skipped"); continue
+        batch_solve.np = module
+        elapsed, output = run(RANGE_PROGRAM.replace("{n}", str(iterations - 1)), True)
+        same = output == loop_output; ok = ok and same
+        print(f"range solve    {iterations} values, {label}: {elapsed:.3f}s ({loop_time / elapsed:.1f}x vs. loop)"
+              f"{'' if same else '  OUTPUT DIFFERS'}")
+    batch_solve.np = numpy
+    return ok
+
+def sparse_system(n: int, per_row: int, rng: random.Random):
+    """n equations over x0..x(n-1), per_row + 1 terms each, with a random integer solution."""
+    solution = [rng.randint(-50, 50) for _ in range(n)]
+    rows = []
+    for i in range(n):
+        cols = {i} | set(rng.sample(range(n), per_row)) # the diagonal keeps the system non-singular in practice
+        row = {c: rng.choice([-3, -2, -1, 1, 2, 3, 5]) for c in cols}
+        row[i] += 7 * rng.choice([-1, 1])
+        rows.append((row, sum(v * solution[c] for c, v in row.items())))
+    return rows, solution
+
+def system_program(rows) -> str:
+    lines = ["BEGIN"]
+    for i, (row, _) in enumerate(rows):
+        lines.append(f"eq e{i} = " + " + ".join(f"{v} * x{c}" for c, v in sorted(row.items())))
+    equations = ", ".join(f"e{i} == {rhs}" for i, (_, rhs) in enumerate(rows))
+    lines += [f"solve({equations}, {', '.join(f'x{c}' for c in range(len(rows)))})", "END"]
+    return "\n".join(lines) + "\n"
+
+def bench_system(n: int) -> bool:
+    rows, solution = sparse_system(n, 3, random.Random(n))
+    start = time.perf_counter()
+    outcome, values = solve_linear_system([{**row, n: rhs} for row, rhs in rows], n)
+    direct = time.perf_counter() - start
+    ok = outcome == UNIQUE and values == solution
+    elapsed, output = run(system_program(rows), True)
+    expected = "".join(f"x{c} = {v}\n" for c, v in enumerate(solution))
+    ok = ok and output == expected
+    print(f"system {n}x{n} (4 terms/row): solve() {elapsed:.3f}s, Bareiss alone {direct:.3f}s{'' if ok else '  WRONG SOLUTION'}")
+    return ok
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    system_sizes = [int(arg) for arg in sys.argv[2:]] or [50, 100, 200, 400]
+    failures = 0
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(iterations - 1))
+        walk_time, walk_output = run(source, False)
+        form_time, form_output = run(source, True)
+        same = walk_output == form_output; failures += not same
+        print(f"{name:<14} {iterations} solves: AST walk {walk_time:.3f}s, linear form {form_time:.3f}s "
+              f"({walk_time / form_time:.1f}x){'' if same else '  OUTPUT DIFFERS'}")
+        if name == "README sweep": failures += not bench_range(iterations, form_time, form_output)
+    SolveCmdNode.use_linear_forms = True
+    for n in system_sizes: failures += not bench_system(n)
+    if failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+show() benchmark for substitute_ast: a loop calling show(big, x==k) on an
+equation of a few hundred nodes, with structural sharing and memoization
+against the previous full-copy substitution (patched back into classes/ops.py).
+
+Two sweeps are timed: a new k on every call, where only the path from the root
+to x is rebuilt, and the same k on every call, where the memo answers. Reports
+wall time and AST nodes allocated, and compares the output of both versions.
+
+Usage (from compiler/): python bench/substitute.py [calls] [terms]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes.ops as ops
+from classes.node import Node
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable
+
+def copying_substitute(node, substitutions, symbol_table):
+    """substitute_ast before sharing: every call copies the whole tree."""
+    if isinstance(node, ops.IdentifierNode):
+        if node.value in substitutions: return ops.IntLiteralNode(substitutions[node.value])
+        return ops.IdentifierNode(node.value)
+    if isinstance(node, (ops.IntLiteralNode, ops.BoolLiteralNode)): return type(node)(node.value)
+    if isinstance(node, ops.EquationNode): return ops.EquationNode(copying_substitute(node.symbolic_expression, substitutions, symbol_table))
+    if isinstance(node, ops.BinOpNode): return ops.BinOpNode(node.value, copying_substitute(node.left, substitutions, symbol_table), copying_substitute(node.right, substitutions, symbol_table))
+    if isinstance(node, ops.UnOpNode): return ops.UnOpNode(node.value, copying_substitute(node.operand, substitutions, symbol_table))
+    return type(node)(node.value, [copying_substitute(child, substitutions, symbol_table) for child in node.children])
+
+def program(calls: int, terms: int, same_value: bool) -> str:
+    lines = ["BEGIN", "int x", "int y"] + [f"int c{i} = {i % 7 + 1}" for i in range(terms)]
+    body = " + ".join(f"c{i} * (y - {i})" for i in range(terms))
+    lines += [f"eq big = {body} + 3 * x", "int k = 0", f"while k < {calls}", "BEGIN",
+              f"show(big, x=={'3' if same_value else 'k'})", "k = k + 1", "END", "END"]
+    return "\n".join(lines) + "\n"
+
+def run(source: str, substitute):
+    ops.substitute_ast = substitute; ops.substitution_memo.clear()
+    created = [0]; original_init = Node.__init__
+    def counting_init(self, *args, **kwargs): created[0] += 1; original_init(self, *args, **kwargs)
+    ast = Parser.run(source); output = io.StringIO()
+    Node.__init__ = counting_init
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output): ast.evaluate(SymbolTable(parent=None))
+        elapsed = time.perf_counter() - start
+    finally: Node.__init__ = original_init
+    return elapsed, created[0], output.getvalue()
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    terms = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    shared_substitute = ops.substitute_ast; failures = 0
+    print(f"{calls} x show(big, x==...) on a {terms}-term equation")
+    print(f"{'sweep':<10} {'substitute_ast':<15} {'time (s)':>9} {'nodes allocated':>16}")
+    for same_value in (False, True):
+        source = program(calls, terms, same_value); outputs = []
+        for label, substitute in (("full copy", copying_substitute), ("shared", shared_substitute)):
+            elapsed, created, output = run(source, substitute); outputs.append(output)
+            print(f"{'x==3' if same_value else 'x==k':<10} {label:<15} {elapsed:>9.3f} {created:>16}")
+        if outputs[0] != outputs[1]: failures += 1; print("  OUTPUT DIFFERS")
+    ops.substitute_ast = shared_substitute
+    if failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
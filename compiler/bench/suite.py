@@ -0,0 +1,197 @@
+"""
+Benchmark suite: generated workloads timed stage by stage, saved as JSON and
+compared against a stored baseline.
+
+Workloads (sizes multiplied by --scale):
+  deep_expression  print() and 'eq' bodies thousands of operators deep
+  while_loop       a long while loop of int/bool arithmetic and branches
+  eq_variables     many 'eq' declarations over many free variables, each shown and solved
+  solve_sweep      solve() over a wide range, and once per iteration of a loop
+  large_source     a long straight-line program, mostly tokenizer and parser work
+
+Stages (seconds, best of --repeat runs):
+  tokenize         RegexTokenizer over the whole source
+  parse            Parser.run, tokenizing included
+  evaluate (tree)  the tree-walker, after the type checker and optimizer
+  evaluate (vm)    bytecode compilation and the VM
+  evaluate (codegen) code generation and the generated function
+  show, solve      time inside show() and solve() statements, from a run under the Profiler
+
+Program output is discarded. --save writes the results; --baseline compares
+against results saved earlier, on the same machine and scale, and exits with
+status 1 if a stage got slower than the baseline by more than --threshold
+(stages under MIN_COMPARED_SECONDS in the baseline are too noisy to compare).
+
+Usage (from compiler/): python bench/suite.py [--scale S] [--repeat N] [--only NAME,...]
+                        [--save PATH] [--baseline PATH] [--threshold FRACTION]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.token_ import EOF
+from classes.regex_tokenizer import RegexTokenizer
+from classes.parser import Parser
+from classes.optimizer import Optimizer
+from classes.type_checker import TypeChecker
+from classes.symbol_table import SymbolTable
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.codegen import CodeGenerator
+from classes.profiler import Profiler
+from classes.ops import ShowCmdNode, SolveCmdNode
+from classes.output import OutputSink, set_sink
+
+MIN_COMPARED_SECONDS = 0.005
+
+# --- Workloads ---
+
+def deep_expression(scale: float) -> str:
+    terms = int(3000 * scale); repeats = int(50 * scale) or 1
+    value = " ".join(f"{'+' if k % 3 else '-'} i * {k % 7 + 1}" for k in range(terms))
+    equation = " ".join(f"+ x * {k % 5 + 1} {'-' if k % 2 else '+'} {k % 11}" for k in range(terms))
+    return "\n".join([
+        "BEGIN", "int i = 3", "int r = 0", f"eq deep = 1 {equation}",
+        f"while r < {repeats}", "BEGIN", f"print(r {value})", "r = r + 1", "END",
+        "show(deep)", "solve(deep == 7, x)", "END"]) + "\n"
+
+def while_loop(scale: float) -> str:
+    return "\n".join([
+        "BEGIN", "int total = 0", "int i = 0", "bool odd = false",
+        f"while i < {int(100000 * scale)}", "BEGIN",
+        "int square = i * i",
+        "if odd && square > 10", "BEGIN", "total = total + square / 3 - i", "END",
+        "elif i == 2", "BEGIN", "total = 0", "END",
+        "else", "BEGIN", "total = total - (i - 1) * 2", "END",
+        "odd = !odd", "i = i + 1", "END",
+        "print(total, odd)", "END"]) + "\n"
+
+def eq_variables(scale: float) -> str:
+    count = int(400 * scale); width = 20
+    lines = ["BEGIN"]
+    for k in range(count):
+        body = " + ".join(f"{(k + c) % 9 + 1} * x{c}" for c in range(width))
+        substitutions = ", ".join(f"x{c} == {(k * c) % 13}" for c in range(1, width))
+        lines += [f"eq e{k} = {body} - {k}", f"show(e{k}, {substitutions})", f"solve(e{k} == {k % 17}, x0, {substitutions})"]
+    return "\n".join(lines + ["END"]) + "\n"
+
+def solve_sweep(scale: float) -> str:
+    return "\n".join([
+        "BEGIN", "eq f = 3 * x + 2 * y - 7 + z * y", "int i = 0",
+        f"solve(f == 0, x, z == 1, y in 0..{int(20000 * scale)})",
+        f"while i < {int(2000 * scale)}", "BEGIN", "solve(f == i, x, y == i, z == 2)", "i = i + 1", "END",
+        "END"]) + "\n"
+
+def large_source(scale: float) -> str:
+    lines = ["BEGIN"]
+    for k in range(int(10000 * scale)):
+        lines += [f"int a{k} = {k} * 3 + 1 // declaration", f"a{k} = a{k} - {k % 7} * 2",
+                  f"if a{k} > {2 * k}", "BEGIN", f"print(a{k})", "END"]
+    return "\n".join(lines + ["END"]) + "\n"
+
+WORKLOADS = {
+    "deep_expression": deep_expression, "while_loop": while_loop, "eq_variables": eq_variables,
+    "solve_sweep": solve_sweep, "large_source": large_source,
+}
+
+# --- Stages ---
+
+class NullSink(OutputSink):
+    def write_line(self, line: str) -> None:
+        pass
+
+def checked_program(source: str):
+    ast = Parser.run(source); TypeChecker.run(ast); Optimizer.run(ast)
+    return ast
+
+def tokenize(source: str) -> None:
+    tokenizer = RegexTokenizer(source)
+    while tokenizer.next.ttype != EOF: tokenizer.select_next()
+
+ENGINES = {
+    "tree": lambda ast: ast.evaluate(SymbolTable()),
+    "vm": lambda ast: VM(Compiler.run(ast)).run(SymbolTable()),
+    "codegen": lambda ast: CodeGenerator.run(ast).run(SymbolTable()),
+}
+
+def timed(function, *args) -> float:
+    start = time.perf_counter(); function(*args)
+    return time.perf_counter() - start
+
+def command_times(source: str) -> dict:
+    """Time inside show() and solve() statements, from one run under the Profiler."""
+    ast = checked_program(source); profiler = Profiler(); profiler.install()
+    try: ast.evaluate(SymbolTable())
+    finally: profiler.uninstall()
+    times = {}
+    for node, count, total, self_time in profiler.records.values():
+        stage = "show" if isinstance(node, ShowCmdNode) else "solve" if isinstance(node, SolveCmdNode) else None
+        if stage: times[stage] = times.get(stage, 0.0) + total
+    return times
+
+def measure(source: str, repeat: int) -> dict:
+    """Best time of every stage over repeat runs; each evaluation gets a freshly parsed program."""
+    best = {}
+    def record(stage, elapsed): best[stage] = min(best.get(stage, elapsed), elapsed)
+    for _ in range(repeat):
+        record("tokenize", timed(tokenize, source))
+        record("parse", timed(Parser.run, source))
+        for engine, run in ENGINES.items(): record(f"evaluate ({engine})", timed(run, checked_program(source)))
+        for stage, elapsed in command_times(source).items(): record(stage, elapsed)
+    return best
+
+# --- Baselines ---
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """Prints the change of every stage against the baseline; returns the number of regressions."""
+    regressions = 0
+    print(f"\nagainst baseline (threshold +{threshold:.0%})")
+    print(f"{'workload':<16} {'stage':<19} {'baseline (s)':>12} {'now (s)':>9} {'change':>8}")
+    for workload, stages in results["results"].items():
+        for stage, elapsed in stages.items():
+            before = baseline["results"].get(workload, {}).get(stage)
+            if before is None: continue
+            verdict = ""
+            if before >= MIN_COMPARED_SECONDS and elapsed > before * (1 + threshold): verdict = "REGRESSION"; regressions += 1
+            print(f"{workload:<16} {stage:<19} {before:>12.4f} {elapsed:>9.4f} {elapsed / before - 1:>+7.0%} {verdict}")
+    return regressions
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(prog="bench/suite.py", description="Khwarizmi benchmark suite")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="multiplies every workload size")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the best time is kept")
+    arg_parser.add_argument("--only", help="comma-separated workloads to run (default: all)")
+    arg_parser.add_argument("--save", metavar="PATH", help="write the results as JSON to PATH")
+    arg_parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --save")
+    arg_parser.add_argument("--threshold", type=float, default=0.25, help="slowdown counted as a regression, as a fraction (default 0.25)")
+    args = arg_parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown: arg_parser.error(f"unknown workloads: {', '.join(unknown)} (choose from {', '.join(WORKLOADS)})")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file: baseline = json.load(file)
+        if baseline["scale"] != args.scale: arg_parser.error(f"the baseline was recorded with --scale {baseline['scale']}")
+
+    results = {"scale": args.scale, "repeat": args.repeat, "python": platform.python_version(), "results": {}}
+    previous_sink = set_sink(NullSink())
+    try:
+        print(f"{'workload':<16} {'stage':<19} {'time (s)':>9}")
+        for name in names:
+            source = WORKLOADS[name](args.scale)
+            stages = results["results"][name] = measure(source, args.repeat)
+            for stage, elapsed in stages.items(): print(f"{name:<16} {stage:<19} {elapsed:>9.4f}")
+    finally: set_sink(previous_sink)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file: json.dump(results, file, indent=2)
+    if baseline is not None and compare(results, baseline, args.threshold): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Micro-benchmarks for integer-tagged token and value types.
+
+Token kinds (TokenType) and runtime types (ValueType) used to be strings such as
+"OPERATOR_PLUS" and "eq_repr". Each case below times a hot check in its string
+form (copied from the code before the change) against the current form:
+- the parser's token-kind tests (Parser.consume and friends);
+- picking the rule at the start of a statement: a chain of comparisons with a
+  freshly built list vs. the Parser.statement_parsers table;
+- applying a binary operator: the string if-chain vs. BINARY_OPERATIONS;
+- the declared-type check of an assignment (check_assignment_type).
+Last, it parses and runs a generated program end to end.
+
+Usage (from compiler/): python bench/token_kinds.py [iterations] [statements]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.token_ import *
+from classes.value_type import *
+from classes.ops import apply_binary_operator
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable, check_assignment_type
+
+STATEMENT_STARTS = ["TYPE_INT", "IDENTIFIER", "PRINT_CMD", "IF_KEYWORD", "WHILE_KEYWORD", "SOLVE_CMD"]
+
+def string_statement_rule(ttype: str) -> int:
+    """The old parse_declaration_or_statement test order; returns which rule matched."""
+    if ttype in ["TYPE_INT", "TYPE_BOOL", "TYPE_EQ"]: return 0
+    elif ttype == "IDENTIFIER": return 1
+    elif ttype == "IF_KEYWORD": return 2
+    elif ttype == "WHILE_KEYWORD": return 3
+    elif ttype == "PRINT_CMD": return 4
+    elif ttype == "SHOW_CMD": return 5
+    elif ttype == "SOLVE_CMD": return 6
+    return -1
+
+def string_binary_operator(op: str, left_val: Any, left_type: str, right_val: Any, right_type: str):
+    """apply_binary_operator before ValueType."""
+    if op in ['+', '-', '*', '/']:
+        if not (left_type == "int" and right_type == "int"): raise TypeError(op)
+        if op == '+': return left_val + right_val, "int"
+        if op == '-': return left_val - right_val, "int"
+        if op == '*': return left_val * right_val, "int"
+        if op == '/': return left_val // right_val, "int"
+    elif op in ["&&", "||"]:
+        if not (left_type == "bool" and right_type == "bool"): raise TypeError(op)
+        if op == '&&': return left_val and right_val, "bool"
+        if op == '||': return left_val or right_val, "bool"
+    elif op in ["==", "!=", "<", ">", "<=", ">="]:
+        can_compare = (left_type == "int" and right_type == "int") or \
+                      (left_type == "bool" and right_type == "bool" and op in ["==", "!="])
+        if not can_compare: raise TypeError(op)
+        if op == '==': return left_val == right_val, "bool"
+        if op == '!=': return left_val != right_val, "bool"
+        if op == '<': return left_val < right_val, "bool"
+        if op == '>': return left_val > right_val, "bool"
+        if op == '<=': return left_val <= right_val, "bool"
+        if op == '>=': return left_val >= right_val, "bool"
+
+def string_assignment_type(key: str, declared_type: str, new_value: Any) -> None:
+    if declared_type == "int" and not isinstance(new_value, int): raise TypeError(key)
+    if declared_type == "bool" and not isinstance(new_value, bool): raise TypeError(key)
+    if declared_type == "eq": raise TypeError(key)
+
+def time_best(body, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter(); body(); best = min(best, time.perf_counter() - start)
+    return best
+
+def token_checks(iterations: int):
+    # Tokens late in the keyword list cost the string form the most comparisons.
+    string_kinds = [name for name in STATEMENT_STARTS for _ in range(iterations // len(STATEMENT_STARTS))]
+    int_kinds = [TokenType[name].value for name in string_kinds]
+    def by_string():
+        for ttype in string_kinds:
+            if ttype == "NEWLINE" or ttype == "END_KEYWORD" or ttype == "EOF": pass
+    def by_int():
+        for ttype in int_kinds:
+            if ttype == NEWLINE or ttype == END_KEYWORD or ttype == EOF: pass
+    yield "token kind tests", time_best(by_string), time_best(by_int)
+
+    # Parser.statement_parsers maps to bound methods; a table of the same shape is enough here
+    rules = {TYPE_INT: 0, TYPE_BOOL: 0, TYPE_EQ: 0, IDENTIFIER: 1, IF_KEYWORD: 2, WHILE_KEYWORD: 3, PRINT_CMD: 4, SHOW_CMD: 5, SOLVE_CMD: 6}
+    def chain():
+        for ttype in string_kinds: string_statement_rule(ttype)
+    def table():
+        get = rules.get
+        for ttype in int_kinds: get(ttype)
+    yield "statement dispatch", time_best(chain), time_best(table)
+
+def value_checks(iterations: int):
+    operations = [("+", 3, 4), ("*", 3, 4), ("<", 3, 4), ("==", 3, 4), ("&&", True, False)] * (iterations // 5)
+    string_operations = [(op, a, "bool" if a is True else "int", b, "bool" if b is False else "int") for op, a, b in operations]
+    int_operations = [(op, a, BOOL_TYPE if a is True else INT_TYPE, b, BOOL_TYPE if b is False else INT_TYPE) for op, a, b in operations]
+    def by_string():
+        for operation in string_operations: string_binary_operator(*operation)
+    def by_table():
+        for operation in int_operations: apply_binary_operator(*operation)
+    yield "binary operator", time_best(by_string), time_best(by_table)
+
+    def string_check():
+        for i in range(iterations): string_assignment_type("x", "bool", True)
+    def int_check():
+        for i in range(iterations): check_assignment_type("x", BOOL_TYPE, True)
+    yield "assignment type check", time_best(string_check), time_best(int_check)
+
+def program(statements: int) -> str:
+    lines = ["BEGIN", "int total = 0", "int i = 0", "bool flag = true", f"while i < {statements}", "BEGIN"]
+    lines += ["if i > 3 && flag", "BEGIN", "total = total + i * 2 - 1", "END", "else", "BEGIN", "total = total - 1", "END",
+              "flag = !(total == 7) || i < 2", "i = i + 1", "END", "print(total)", "END"]
+    return "\n".join(lines) + "\n"
+
+def end_to_end(statements: int):
+    source = program(statements)
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()): Parser.run(source).evaluate(SymbolTable())
+    return time_best(run, repeats=1)
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 600000
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    print(f"{'case':<22} {'strings (s)':>12} {'ints (s)':>10} {'speed-up':>9}")
+    for label, old, new in list(token_checks(iterations)) + list(value_checks(iterations)):
+        print(f"{label:<22} {old:>12.3f} {new:>10.3f} {old / new:>8.2f}x")
+    print(f"program, {statements} loop iterations: {end_to_end(statements):.3f}s (tree-walker)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import functools
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Optional, BinaryIO
+from classes.ops import ProgramNode
+from classes.flat_ast import FlatAST
+
+# Bump when the parser output changes in a way the classes fingerprint below would not catch.
+CACHE_FORMAT_VERSION = 2
+CLASSES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@functools.lru_cache(maxsize=None)
+def compiler_version() -> str:
+    """
+    Identifies the compiler that produced a cached AST: the cache format, the
+    Python version and the contents of every module in classes/, so any edit to
+    the compiler invalidates old entries, whatever happens to the files' mtimes
+    (a checkout, touch -r, a filesystem with coarse timestamps). Computed once
+    per process.
+    """
+    digest = hashlib.sha256(f"format={CACHE_FORMAT_VERSION}\npython={sys.version_info[0]}.{sys.version_info[1]}\n".encode())
+    for name in sorted(os.listdir(CLASSES_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(CLASSES_DIR, name), "rb") as module: source = module.read()
+            digest.update(f"{name}:{len(source)}\n".encode()); digest.update(source)
+    return digest.hexdigest()[:16]
+
+class ASTCache:
+    """
+    On-disk cache of parsed programs, like __pycache__ for .kh files.
+
+    An entry is the program straight out of the parser (before the resolver or
+    the VM compiler annotate it) in the array layout FlatAST.write produces,
+    stored in a file named after the SHA-256 of the source bytes and the
+    compiler version. Changing either the
+    program or the compiler therefore misses the old entry instead of reusing it;
+    stale entries are left to the eviction policy: whenever the directory grows
+    past max_bytes, the least recently used entries (by mtime, refreshed on every
+    hit) are deleted until it is back under the limit.
+
+    Entries are data, never code: loading one maps the file (FlatAST.open) and,
+    for load(), rebuilds the Node tree from the arrays. Whoever can write to
+    the cache directory can at worst make a run see a different or malformed
+    Khwarizmi program, not run Python code in the interpreter, which is why
+    entries are not pickled. The cache never makes a run fail: unreadable or
+    corrupt entries count as a miss and are removed, and failing to write one
+    is ignored. --flat-ast runs use the same entries without building the tree
+    (load_flat/store_flat).
+    """
+    DEFAULT_DIR_NAME = "__khcache__"
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    SUFFIX = ".khf"
+    HASH_CHUNK_SIZE = 1 << 16
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = compiler_version()
+
+    @staticmethod
+    def default_dir(source_path: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(source_path)), ASTCache.DEFAULT_DIR_NAME)
+
+    @staticmethod
+    def source_hash(source: BinaryIO) -> str:
+        """SHA-256 of a binary file, read in chunks; leaves the file positioned at its start."""
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: source.read(ASTCache.HASH_CHUNK_SIZE), b""): digest.update(chunk)
+        source.seek(0)
+        return digest.hexdigest()
+
+    def entry_path(self, source_hash: str) -> str:
+        key = hashlib.sha256(f"{source_hash}:{self.version}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def load(self, source_hash: str) -> Optional[ProgramNode]:
+        flat = self.load_flat(source_hash)
+        if flat is None: return None
+        try:
+            program = flat.to_program()
+            if not isinstance(program, ProgramNode): raise ValueError("cache entry is not a program")
+        except Exception: # corrupt: nodes out of range or out of order, unknown kinds
+            self.discard(self.entry_path(source_hash))
+            return None
+        return program
+
+    def load_flat(self, source_hash: str) -> Optional[FlatAST]:
+        path = self.entry_path(source_hash)
+        try:
+            program = FlatAST.open(path)
+        except FileNotFoundError:
+            return None
+        except Exception: # corrupt, truncated or written on another machine
+            self.discard(path)
+            return None
+        self.touch(path)
+        return program
+
+    @staticmethod
+    def touch(path: str) -> None:
+        try: os.utime(path) # mark as recently used for eviction
+        except OSError: pass
+
+    def store(self, source_hash: str, program: ProgramNode) -> None:
+        self.store_flat(source_hash, FlatAST.from_program(program))
+
+    def store_flat(self, source_hash: str, program: FlatAST) -> None:
+        self.write_entry(self.entry_path(source_hash), program.write)
+
+    def write_entry(self, path: str, write) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file and rename it, so concurrent runs never see half an entry.
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as temp: write(temp)
+                if os.path.getsize(temp_path) > self.max_bytes: self.discard(temp_path); return
+                os.replace(temp_path, path)
+            except BaseException:
+                self.discard(temp_path)
+                raise
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        with os.scandir(self.cache_dir) as scan:
+            for dir_entry in scan:
+                if not dir_entry.name.endswith(self.SUFFIX): continue
+                try: stat = dir_entry.stat()
+                except OSError: continue
+                entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes: break
+            self.discard(path); total -= size
+
+    @staticmethod
+    def discard(path: str) -> None:
+        try: os.remove(path)
+        except OSError: pass
@@ -0,0 +1,168 @@
+from classes.linear_form import LinearForm, ProductTerm, QuotientTerm, TARGET, FREE, NONLINEAR, ZERO_DIVISOR_MESSAGE, Number, common_denominator, exact_quotient
+from typing import Dict, Any, Set, List, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError: # optional: ranges are then solved one value at a time
+    np = None
+
+BATCH_SIZE = 1 << 16     # range values evaluated per array pass
+INT64_SAFE_BOUND = 1 << 62 # every intermediate of the array pass must stay below this in magnitude
+
+def outcome_message(solve_for_var_name: str, coeff: Number, const: Number, is_linear: bool, other_free_vars: Set[str]) -> str:
+    """
+    What solve() prints for `coeff * x + const == 0`, once the terms are
+    collected. Fraction terms are first scaled by their common denominator, so
+    the fraction of an unsolvable equation is printed over ints as usual.
+    """
+    if not is_linear: return f"Error: Equation is not linear with respect to '{solve_for_var_name}' after substitutions."
+    if other_free_vars: return f"Error: Cannot solve. Equation has other unresolved symbolic variables: {other_free_vars}."
+    if coeff.__class__ is not int or const.__class__ is not int:
+        scale = common_denominator((coeff, const)); coeff = int(coeff * scale); const = int(const * scale)
+    if coeff == 0: return "Infinite solutions" if const == 0 else "No solution"
+    if (-const % coeff) != 0: return f"No integer solution for {solve_for_var_name} (result is {-const}/{coeff})."
+    return f"{solve_for_var_name} = {-const // coeff}"
+
+def solve_range(form: LinearForm, values: Dict[str, Any], other_free_vars: Set[str], target_value: int,
+                solve_for_var_name: str, range_name: str, low: int, high: int) -> Iterator[List[str]]:
+    """
+    Output lines of solve(eq == target_value, x, ..., range_name == v) for every v in
+    low..high, in order and in chunks: exactly what a loop over the values prints.
+    values is the form's value map (see ops.form_values); range_name is either
+    missing from it or overwritten with each v.
+
+    With NumPy, each chunk is solved in one pass over int64 arrays, linearity,
+    zero-divisor and divisibility checks included, on the form scaled to int
+    coefficients (LinearForm.integral). Values for which a quotient term does
+    not come out even are solved again one at a time. Without NumPy, or when
+    magnitude_bound cannot rule out an int64 overflow, every value is solved
+    one at a time with LinearForm.evaluate.
+    """
+    if range_name not in values:
+        # Every value gives the same answer.
+        line = solve_one(form, values, other_free_vars, target_value, solve_for_var_name)
+        for start in range(low, high + 1, BATCH_SIZE): yield [line] * (min(start + BATCH_SIZE, high + 1) - start)
+        return
+    integral, denominator = form.integral()
+    bounds = {name: max(abs(value), 1) for name, value in values.items() if type(value) is int}
+    bounds[range_name] = max(abs(low), abs(high), 1)
+    coeff_bound, const_bound = magnitude_bound(integral, bounds)
+    vectorize = np is not None and max(coeff_bound, const_bound + abs(target_value) * denominator) < INT64_SAFE_BOUND
+    for start in range(low, high + 1, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, high + 1)
+        if vectorize: yield solve_batch(form, integral, denominator, values, other_free_vars, target_value, solve_for_var_name, range_name, start, stop)
+        else:
+            lines = []
+            for value in range(start, stop):
+                values[range_name] = value
+                lines.append(solve_one(form, values, other_free_vars, target_value, solve_for_var_name))
+            yield lines
+
+def solve_one(form: LinearForm, values: Dict[str, Any], other_free_vars: Set[str], target_value: int, solve_for_var_name: str) -> str:
+    integral, denominator = form.integral()
+    try: coeff, const, is_linear = integral.evaluate(values)
+    except ZeroDivisionError as e: return f"Error: {e}"
+    return outcome_message(solve_for_var_name, exact_quotient(coeff, denominator), exact_quotient(const, denominator) - target_value,
+                           is_linear, other_free_vars)
+
+# --- NumPy pass ---
+
+SOLVED, NO_INTEGER_SOLUTION, NO_SOLUTION, INFINITE_SOLUTIONS, NOT_LINEAR, ZERO_DIVISOR, RATIONAL = range(7)
+
+def solve_batch(form: LinearForm, integral: LinearForm, denominator: int, values: Dict[str, Any], other_free_vars: Set[str],
+                target_value: int, solve_for_var_name: str, range_name: str, start: int, stop: int) -> List[str]:
+    """One chunk of solve_range: integral is denominator * form, with int coefficients."""
+    values[range_name] = np.arange(start, stop, dtype=np.int64)
+    coeff, const, is_linear, error, rational = evaluate_batch(integral, values)
+    shape = (stop - start,)
+    coeff = np.broadcast_to(coeff, shape); const = np.broadcast_to(const - target_value * denominator, shape)
+    if denominator != 1:
+        # outcome_message scales by the denominator of the exact terms, which may divide this one
+        common = np.gcd(np.gcd(coeff, const), denominator); coeff = coeff // common; const = const // common
+    safe_coeff = np.where(coeff == 0, 1, coeff)
+    outcome = np.select(
+        [np.broadcast_to(rational, shape), np.broadcast_to(error, shape), np.broadcast_to(np.logical_not(is_linear), shape),
+         coeff == 0, (-const % safe_coeff) != 0],
+        [RATIONAL, ZERO_DIVISOR, NOT_LINEAR, np.where(const == 0, INFINITE_SOLUTIONS, NO_SOLUTION), NO_INTEGER_SOLUTION],
+        SOLVED)
+    solution = -const // safe_coeff
+    if other_free_vars: outcome = np.where(outcome >= NOT_LINEAR, outcome, -1) # unresolved, once linear and defined
+    fixed = {
+        ZERO_DIVISOR: f"Error: {ZERO_DIVISOR_MESSAGE}",
+        NOT_LINEAR: outcome_message(solve_for_var_name, 0, 0, False, set()),
+        -1: outcome_message(solve_for_var_name, 0, 0, True, other_free_vars),
+        INFINITE_SOLUTIONS: "Infinite solutions", NO_SOLUTION: "No solution",
+    }
+    outcome = outcome.tolist()
+    if not any(outcome): return [f"{solve_for_var_name} = {v}" for v in solution.tolist()]
+    lines = []
+    for value, kind, c, k, v in zip(range(start, stop), outcome, coeff.tolist(), const.tolist(), solution.tolist()):
+        if kind == SOLVED: lines.append(f"{solve_for_var_name} = {v}")
+        elif kind == NO_INTEGER_SOLUTION: lines.append(f"No integer solution for {solve_for_var_name} (result is {-k}/{c}).")
+        elif kind == RATIONAL: values[range_name] = value; lines.append(solve_one(form, values, other_free_vars, target_value, solve_for_var_name))
+        else: lines.append(fixed[kind])
+    return lines
+
+def evaluate_batch(form: LinearForm, values: Dict[str, Any]) -> Tuple[Any, Any, Any, Any, Any]:
+    """
+    LinearForm.evaluate with arrays among the values, for a form with int
+    coefficients: (coeff, const, is_linear, raises_zero_division, rational),
+    each an array or a scalar. rational marks the values for which a quotient
+    term does not come out even, so the exact result is a Fraction. A value for
+    which the scalar evaluation raises or is rational gets an arbitrary
+    coefficient and constant.
+    """
+    coeff = 0; const = form.const; is_linear = True; error = False; rational = False
+    for name, c in form.coeffs.items():
+        value = values[name]
+        if value is TARGET: coeff += c
+        elif value is FREE: pass
+        elif value is NONLINEAR: is_linear = False
+        else: const = const + c * value
+    for m, term in form.terms:
+        if isinstance(term, ProductTerm): term_coeff, term_const, term_linear, term_error, term_rational = product_batch(term, values)
+        else: term_coeff, term_const, term_linear, term_error, term_rational = quotient_batch(term, values)
+        coeff = coeff + m * term_coeff; const = const + m * term_const
+        is_linear = np.logical_and(is_linear, term_linear); error = np.logical_or(error, term_error)
+        rational = np.logical_or(rational, term_rational)
+    return coeff, const, is_linear, error, rational
+
+def product_batch(term: ProductTerm, values: Dict[str, Any]):
+    left_coeff, left_const, left_linear, left_error, left_rational = evaluate_batch(term.left, values)
+    right_coeff, right_const, right_linear, right_error, right_rational = evaluate_batch(term.right, values)
+    is_linear = np.logical_and(np.logical_and(left_linear, right_linear), np.logical_or(left_coeff == 0, right_coeff == 0))
+    coeff = np.where(left_coeff != 0, left_coeff * right_const, right_coeff * left_const)
+    return (np.where(is_linear, coeff, 0), np.where(is_linear, left_const * right_const, 0), is_linear,
+            np.logical_or(left_error, right_error), np.logical_or(left_rational, right_rational))
+
+def quotient_batch(term: QuotientTerm, values: Dict[str, Any]):
+    left_coeff, left_const, left_linear, left_error, left_rational = evaluate_batch(term.dividend, values)
+    right_coeff, right_const, right_linear, right_error, right_rational = evaluate_batch(term.divisor, values)
+    checked = np.logical_and(np.logical_and(left_linear, right_linear), right_coeff == 0) # where the scalar code tests the divisor
+    error = np.logical_or(np.logical_or(left_error, right_error), np.logical_and(checked, right_const == 0))
+    divisor = np.where(right_const == 0, 1, right_const)
+    is_linear = np.logical_and(checked, right_const != 0)
+    uneven = np.logical_and(is_linear, np.logical_or(left_coeff % divisor != 0, left_const % divisor != 0))
+    return (np.where(is_linear, left_coeff // divisor, 0), np.where(is_linear, left_const // divisor, 0), is_linear, error,
+            np.logical_or(np.logical_or(left_rational, right_rational), uneven))
+
+def magnitude_bound(form: LinearForm, bounds: Dict[str, int]) -> Tuple[int, int]:
+    """
+    Upper bounds on |coeff| and |const| of every partial result evaluate_batch
+    computes, given a bound (at least 1) on each int value. Names missing from
+    bounds are TARGET (coefficient 1) or free/non-linear (0).
+    """
+    coeff_bound = 0; const_bound = max(abs(form.const), 1)
+    for name, c in form.coeffs.items():
+        if name in bounds: const_bound += abs(c) * bounds[name]
+        else: coeff_bound += abs(c)
+    for m, term in form.terms:
+        if isinstance(term, ProductTerm):
+            left_coeff, left_const = magnitude_bound(term.left, bounds); right_coeff, right_const = magnitude_bound(term.right, bounds)
+            term_coeff, term_const = left_coeff * right_const + right_coeff * left_const, left_const * right_const
+        else:
+            # An exact quotient is no larger than the dividend; the divisor's partial results count too.
+            (left_coeff, left_const), (right_coeff, right_const) = magnitude_bound(term.dividend, bounds), magnitude_bound(term.divisor, bounds)
+            term_coeff, term_const = max(left_coeff, right_coeff), max(left_const, right_const)
+        coeff_bound += abs(m) * term_coeff; const_bound += abs(m) * term_const
+    return max(coeff_bound, 1), const_bound
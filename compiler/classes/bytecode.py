@@ -0,0 +1,221 @@
+from classes.ops import *
+from classes.node import Node
+from classes.resolver import Resolver
+from classes.type_checker import TypeChecker
+from classes.symbol_table import ScopeLayout
+from typing import List, Any, Tuple
+import operator
+
+# --- Opcodes ---
+# Each instruction is an (opcode, argument) tuple. Opcodes are plain ints so the
+# VM dispatch loop compares small ints instead of strings.
+
+LOAD_CONST = 0     # arg: value                  -> push value (a literal, or a symbolic expression's node)
+LOAD_VAR = 1       # arg: (name, IdentifierNode) -> push variable value (the node itself if UNASSIGNED)
+ADD = 2            # arg: BinOpNode (pushed instead of the result when an operand is symbolic)
+SUB = 3
+MUL = 4
+DIV = 5
+EQ = 6
+NEQ = 7
+LT = 8
+GT = 9
+LTE = 10
+GTE = 11
+AND = 12
+OR = 13
+NEG = 14           # arg: UnOpNode
+NOT = 15           # arg: UnOpNode
+INPUT = 16         # arg: None                   -> push an int read from stdin
+DECLARE = 17       # arg: (slot, name, type_str) -> declare without initializer
+DECLARE_INIT = 18  # arg: (slot, name, type_str) -> pop initializer, declare
+DECLARE_EQ = 19    # arg: (slot, name, ast)      -> declare 'eq' variable holding ast
+ASSIGN_BEGIN = 20  # arg: (name, rhs_ast, target)-> unresolved target: 'eq' vars store ast and jump; else push declared type
+STORE = 21         # arg: name                   -> pop value and declared type, assign by name
+PRINT = 22         # arg: argument count
+EXEC_NODE = 23     # arg: Node                   -> delegate to node.evaluate (show/solve)
+PUSH_SCOPE = 24    # arg: ScopeLayout
+POP_SCOPE = 25     # arg: None
+JUMP = 26          # arg: target pc
+JUMP_IF_FALSE = 27 # arg: (target pc, error message if the condition is not a bool)
+BINARY_CONST = 28  # arg: (operator function, BinOpNode, int constant) -> superinstruction for `expr <op> literal`
+HALT = 29          # arg: None                   -> end of program
+LOAD_SLOT = 30     # arg: (depth, slot, IdentifierNode) -> push resolved variable value
+STORE_SLOT = 31    # arg: (depth, slot, name, declared_type) -> pop value, type-check, assign
+STORE_EQ_SLOT = 32 # arg: (depth, slot, ast)     -> assign an 'eq' variable its new AST
+
+# Unchecked forms, emitted where the TypeChecker proved the operand types (see TypeChecker)
+BINARY_TYPED = 33        # arg: operator function  -> pop right, apply to left in place
+BINARY_CONST_TYPED = 34  # arg: (operator function, int constant)
+UNARY_TYPED = 35         # arg: operator function
+LOAD_SLOT_TYPED = 36     # arg: (depth, slot)      -> push a variable that always holds a concrete value
+STORE_SLOT_TYPED = 37    # arg: (depth, slot)      -> pop value, assign
+DECLARE_TYPED = 38       # arg: (slot, name, type_str) -> pop initializer, declare
+JUMP_IF_FALSE_TYPED = 39 # arg: target pc          -> pop a bool condition
+
+# Operators fused into BINARY_CONST when the right operand is an integer literal.
+# Division is only fused for non-zero constants so the zero check can be skipped.
+CONST_OPERATORS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.floordiv,
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt, ">": operator.gt, "<=": operator.le, ">=": operator.ge,
+}
+
+BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV,
+    "==": EQ, "!=": NEQ, "<": LT, ">": GT, "<=": LTE, ">=": GTE,
+    "&&": AND, "||": OR,
+}
+
+UNARY_OPCODES = {"-": NEG, "!": NOT}
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items())
+                if name.isupper() and isinstance(value, int) and not name.startswith("_")}
+
+
+class Bytecode:
+    """A flat instruction list produced from a ProgramNode, plus the layout of its global frame."""
+    def __init__(self, instructions: List[Tuple[int, Any]], layout: ScopeLayout):
+        self.instructions = instructions
+        self.layout = layout
+
+    def disassemble(self) -> str:
+        lines = []
+        for pc, (opcode, arg) in enumerate(self.instructions):
+            if isinstance(arg, Node): arg = f"<{type(arg).__name__}:{arg.value}>"
+            elif isinstance(arg, tuple): arg = tuple(f"<{type(a).__name__}>" if isinstance(a, Node) else a for a in arg)
+            lines.append(f"{pc:5d} {OPCODE_NAMES[opcode]:<14} {'' if arg is None else arg}")
+        return "\n".join(lines)
+
+
+class Compiler:
+    """Lowers a ProgramNode AST into Bytecode for the stack VM (classes/vm.py)."""
+    def __init__(self):
+        self.instructions: List[Tuple[int, Any]] = []
+
+    def emit(self, opcode: int, arg: Any = None) -> int:
+        self.instructions.append((opcode, arg))
+        return len(self.instructions) - 1
+
+    def patch(self, index: int, arg: Any) -> None:
+        self.instructions[index] = (self.instructions[index][0], arg)
+
+    def here(self) -> int:
+        return len(self.instructions)
+
+    # --- Statements ---
+
+    def compile_block(self, block: BlockNode) -> None:
+        for stmt_node in block.children: self.compile_statement(stmt_node)
+
+    def compile_scoped_block(self, block: BlockNode) -> None:
+        """Blocks of if/elif/else and while bodies run in a child scope, unless they declare nothing."""
+        if block.layout is None: return self.compile_block(block)
+        self.emit(PUSH_SCOPE, block.layout)
+        self.compile_block(block)
+        self.emit(POP_SCOPE)
+
+    def compile_statement(self, node: Node) -> None:
+        if isinstance(node, VarDecNode):
+            if node.type_name_str == EQ_TYPE: self.emit(DECLARE_EQ, (node.slot, node.var_name, node.init_expression))
+            elif node.init_expression:
+                self.compile_expression(node.init_expression)
+                self.emit(DECLARE_TYPED if node.typed else DECLARE_INIT, (node.slot, node.var_name, node.type_name_str))
+            else: self.emit(DECLARE, (node.slot, node.var_name, node.type_name_str))
+        elif isinstance(node, AssignmentNode) and node.children[0].binding is not None:
+            target = node.children[0]; depth, slot = target.binding; rhs = node.children[1]
+            if target.declared_type == EQ_TYPE:
+                self.emit(STORE_EQ_SLOT, (depth, slot, rhs))
+            else:
+                self.compile_expression(rhs)
+                if node.typed: self.emit(STORE_SLOT_TYPED, (depth, slot))
+                else: self.emit(STORE_SLOT, (depth, slot, target.value, target.declared_type))
+        elif isinstance(node, AssignmentNode):
+            # No visible declaration: keep the by-name path so the failure is reported at run time.
+            var_name = node.children[0].value; rhs = node.children[1]
+            begin = self.emit(ASSIGN_BEGIN)
+            self.compile_expression(rhs)
+            self.emit(STORE, var_name)
+            self.patch(begin, (var_name, rhs, self.here()))
+        elif isinstance(node, PrintCmdNode):
+            arg_nodes = node.children[0].children
+            for arg_node in arg_nodes: self.compile_expression(arg_node)
+            self.emit(PRINT, len(arg_nodes))
+        elif isinstance(node, (ShowCmdNode, SolveCmdNode)):
+            self.emit(EXEC_NODE, node)
+        elif isinstance(node, IfNode):
+            self.compile_if(node)
+        elif isinstance(node, WhileNode):
+            loop_start = self.here()
+            exit_jump = self.compile_condition(node.children[0])
+            self.compile_scoped_block(node.children[1])
+            self.emit(JUMP, loop_start)
+            self.patch_condition(exit_jump, "While condition must be boolean.")
+        elif isinstance(node, BlockNode):
+            self.compile_block(node)
+        else:
+            raise KhwarizmiRuntimeError(f"Bytecode compiler: unsupported statement node '{type(node).__name__}'.")
+
+    def compile_if(self, node: IfNode) -> None:
+        end_jumps = []
+        branches = [(node.condition, node.if_block, node.condition_message)]
+        branches += [(elif_node.condition, elif_node.block, "Elif condition must be boolean.") for elif_node in node.elif_clauses]
+        for condition, block, error_message in branches:
+            next_branch = self.compile_condition(condition)
+            self.compile_scoped_block(block)
+            end_jumps.append(self.emit(JUMP))
+            self.patch_condition(next_branch, error_message)
+        if node.else_block: self.compile_scoped_block(node.else_block)
+        for jump in end_jumps: self.patch(jump, self.here())
+
+    def compile_condition(self, condition: Node) -> int:
+        """Emits condition and the jump taken when it is false, to be patched with patch_condition."""
+        self.compile_expression(condition)
+        return self.emit(JUMP_IF_FALSE_TYPED if TypeChecker.annotated_type(condition) == BOOL_TYPE else JUMP_IF_FALSE)
+
+    def patch_condition(self, jump: int, error_message: str) -> None:
+        """Points jump here; the checked form also carries the message for a non-bool condition."""
+        self.patch(jump, self.here() if self.instructions[jump][0] == JUMP_IF_FALSE_TYPED else (self.here(), error_message))
+
+    # --- Expressions ---
+
+    def compile_expression(self, root: Node) -> None:
+        """Emits root's code in evaluation order, from an explicit stack of nodes and of (opcode, arg) left to emit after an operand."""
+        stack: List[Any] = [root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, tuple): self.emit(*node)
+            elif isinstance(node, (IntLiteralNode, BoolLiteralNode)):
+                self.emit(LOAD_CONST, node.value)
+            elif isinstance(node, IdentifierNode):
+                if node.binding is not None and TypeChecker.annotated_type(node) is not None: self.emit(LOAD_SLOT_TYPED, node.binding)
+                elif node.binding is not None: self.emit(LOAD_SLOT, (node.binding[0], node.binding[1], node))
+                else: self.emit(LOAD_VAR, (node.value, node))
+            elif isinstance(node, (BinOpNode, UnOpNode)) and node.symbolic:
+                self.emit(LOAD_CONST, node) # evaluates to itself; its operands need no code
+            elif isinstance(node, BinOpNode):
+                right = node.right
+                if isinstance(right, IntLiteralNode) and node.value in CONST_OPERATORS and not (node.value == "/" and right.value == 0):
+                    if node.operation is not None: stack += ((BINARY_CONST_TYPED, (CONST_OPERATORS[node.value], right.value)), node.left)
+                    else: stack += ((BINARY_CONST, (CONST_OPERATORS[node.value], node, right.value)), node.left)
+                    continue
+                if node.operation is not None:
+                    stack += ((BINARY_TYPED, node.operation[0]), right, node.left)
+                    continue
+                if node.value not in BINARY_OPCODES: raise KhwarizmiRuntimeError(f"Unknown binary operator: {node.value}")
+                stack += ((BINARY_OPCODES[node.value], node), right, node.left)
+            elif isinstance(node, UnOpNode):
+                if node.value not in UNARY_OPCODES: raise KhwarizmiRuntimeError(f"Unknown unary operator: {node.value}")
+                if node.operation is not None: stack += ((UNARY_TYPED, node.operation[0]), node.operand)
+                else: stack += ((UNARY_OPCODES[node.value], node), node.operand)
+            elif isinstance(node, InputNode):
+                self.emit(INPUT)
+            else:
+                raise KhwarizmiRuntimeError(f"Bytecode compiler: unsupported expression node '{type(node).__name__}'.")
+
+    @staticmethod
+    def run(program: ProgramNode) -> Bytecode:
+        Resolver.run(program)
+        compiler = Compiler()
+        compiler.compile_block(program.children[0])
+        compiler.emit(HALT)
+        return Bytecode(compiler.instructions, program.children[0].layout)
@@ -0,0 +1,233 @@
+from classes.ops import *
+from classes.node import Node, postorder
+from classes.resolver import Resolver
+from classes.type_checker import TypeChecker
+from classes.symbol_table import ScopeLayout, Frame, UNASSIGNED, UNDECLARED
+from classes.vm import value_type, binary_slow_path, unary_slow_path
+from typing import List, Any, Dict, Callable
+
+# Python operators for the operations the TypeChecker proved well-typed. `&&` and
+# `||` evaluate both operands, like every engine, so they map to `&` and `|`,
+# which give a bool for bool operands.
+TYPED_OPERATORS = {
+    "+": "+", "-": "-", "*": "*", "/": "//",
+    "==": "==", "!=": "!=", "<": "<", ">": ">", "<=": "<=", ">=": ">=",
+    "&&": "&", "||": "|",
+}
+TYPED_UNARY_OPERATORS = {"-": "-", "!": "not "}
+SEPARATOR = ' + " " + ' # between the texts of print() arguments
+
+# CPython limits: nested indentation levels, and statically nested loops in one function.
+MAX_NESTING = 80
+MAX_LOOP_NESTING = 16
+
+# --- Run-time helpers called from generated code: the checks the VM makes on its slow paths ---
+
+def checked_store(name: str, declared_type: ValueType, value: Any) -> Any:
+    """value, if it may be stored in an int/bool variable declared with declared_type (STORE_SLOT)."""
+    value_kind = value_type(value)
+    if declared_type != value_kind:
+        if isinstance(value, Node) and value_kind == EQ_REPR_TYPE:
+            raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{name}'.")
+        raise KhwarizmiRuntimeError(f"Type mismatch for '{name}'. Expected '{type_name(declared_type)}', got '{type_name(value_kind)}'.")
+    return value
+
+def checked_condition(value: Any, message: str) -> Any:
+    if value.__class__ is not bool: raise KhwarizmiRuntimeError(message)
+    return value
+
+def redeclared(name: str) -> None:
+    raise KeyError(f"Variable '{name}' already declared in this scope.")
+
+def load_unresolved(scope: Any, name: str, node: IdentifierNode) -> Any:
+    """A variable without a visible declaration, looked up by name (LOAD_VAR)."""
+    try: value, _ = scope.get_var(name)
+    except KeyError: raise KhwarizmiRuntimeError(f"Undeclared identifier '{name}' used.")
+    return node if value is UNASSIGNED else value
+
+def declared_type_of(scope: Any, name: str) -> ValueType:
+    return scope.get_var(name)[1]
+
+def print_text(value: Any, scope: Any) -> str:
+    """What print() shows for one value of a type only known at run time."""
+    return format_print_args([(value, value_type(value))], scope)
+
+RUNTIME = {
+    "Frame": Frame, "UNASSIGNED": UNASSIGNED, "UNDECLARED": UNDECLARED, "EQ_TYPE": EQ_TYPE,
+    "binary_slow_path": binary_slow_path, "unary_slow_path": unary_slow_path, "read_input_int": read_input_int, "write_line": write_line, "evaluate_expression": evaluate_expression,
+    "checked_store": checked_store, "checked_condition": checked_condition, "redeclared": redeclared,
+    "load_unresolved": load_unresolved, "declared_type_of": declared_type_of, "print_text": print_text,
+}
+
+
+class CompiledProgram:
+    """A ProgramNode compiled to one Python function by CodeGenerator; `source` is its text."""
+    def __init__(self, source: str, constants: List[Any], layout: ScopeLayout):
+        self.source = source
+        self.constants = constants
+        self.layout = layout
+        namespace = dict(RUNTIME, C=tuple(constants))
+        exec(compile(source, "<khwarizmi>", "exec"), namespace)
+        self.function: Callable[[Any, Any], None] = namespace["program"]
+
+    def run(self, symbol_table: SymbolTable) -> None:
+        try: self.function(Frame(self.layout, parent=symbol_table), symbol_table)
+        except Exception as e: report_runtime_error(e)
+        finally: flush_output()
+
+
+class CodeGenerator:
+    """
+    Compiles a type-checked ProgramNode into the source of one Python function,
+    run natively by CompiledProgram: `while` becomes a Python while loop and
+    every operation the TypeChecker proved well-typed becomes a bare Python
+    operator, so operator and type dispatch are decided once, here.
+
+    Variables live in the same array-backed Frames as in the VM: the generated
+    code keeps the Frame of each open block at depth d in the local `f<d>` and
+    its value list in `v<d>`, so a resolved variable is `v<d>[slot]`. show(),
+    solve() and symbolic values still find variables by name through the Frames.
+    AST nodes the code needs (symbolic expressions, 'eq' bodies, show/solve
+    statements) are referenced as constants, `C[i]`.
+
+    Everything else mirrors the VM's checked opcodes, with the same messages.
+    An expression deeper than RECURSION_HEIGHT is left to the tree-walker
+    (evaluate_expression), and so is a statement nested past CPython's
+    indentation or loop nesting limits.
+    """
+    def __init__(self):
+        self.lines: List[str] = ["def program(f0, global_scope):", "    v0 = f0.values"]
+        self.constants: List[Any] = []; self.constant_index: Dict[int, int] = {}
+        self.indent = 1; self.depth = 0; self.loops = 0
+        self.temps = 0 # temporaries used by the current statement, t0, t1, ...
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line)
+
+    def constant(self, value: Any) -> str:
+        index = self.constant_index.get(id(value))
+        if index is None:
+            index = self.constant_index[id(value)] = len(self.constants); self.constants.append(value)
+        return f"C[{index}]"
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"t{self.temps - 1}"
+
+    @property
+    def scope(self) -> str:
+        """The innermost open Frame, for name-based lookups."""
+        return f"f{self.depth}"
+
+    # --- Statements ---
+
+    def compile_block(self, block: BlockNode) -> None:
+        for stmt_node in block.children: self.temps = 0; self.compile_statement(stmt_node)
+
+    def compile_scoped_block(self, block: BlockNode) -> None:
+        """Body of an if/elif/else or while: a pooled Frame, as in the VM, unless the block declares nothing."""
+        self.indent += 1; start = len(self.lines)
+        if block.layout is None: self.compile_block(block)
+        else:
+            self.depth += 1; pool = self.constant(Frame(block.layout))
+            self.emit(f"f{self.depth} = {pool}; f{self.depth}.reset(f{self.depth - 1}); v{self.depth} = f{self.depth}.values")
+            self.compile_block(block)
+            self.depth -= 1
+        if len(self.lines) == start: self.emit("pass")
+        self.indent -= 1
+
+    def compile_statement(self, node: Node) -> None:
+        if isinstance(node, (IfNode, WhileNode)) and (self.indent >= MAX_NESTING or self.loops >= MAX_LOOP_NESTING):
+            self.emit(f"{self.constant(node)}.evaluate({self.scope})")
+        elif isinstance(node, VarDecNode):
+            slot = f"v{self.depth}[{node.slot}]"
+            if node.type_name_str == EQ_TYPE: value = self.constant(node.init_expression) if node.init_expression else "None"
+            elif not node.init_expression: value = "UNASSIGNED"
+            else:
+                value = self.temp(); expression = self.compile_expression(node.init_expression)
+                if not node.typed: expression = f"checked_store({node.var_name!r}, {node.type_name_str}, {expression})"
+                self.emit(f"{value} = {expression}")
+            self.emit(f"if {slot} is not UNDECLARED: redeclared({node.var_name!r})")
+            self.emit(f"{slot} = {value}")
+        elif isinstance(node, AssignmentNode) and node.children[0].binding is not None:
+            target = node.children[0]; depth, slot = target.binding; rhs = node.children[1]
+            if target.declared_type == EQ_TYPE: self.emit(f"v{depth}[{slot}] = {self.constant(rhs)}")
+            elif node.typed: self.emit(f"v{depth}[{slot}] = {self.compile_expression(rhs)}")
+            else: self.emit(f"v{depth}[{slot}] = checked_store({target.value!r}, {target.declared_type}, {self.compile_expression(rhs)})")
+        elif isinstance(node, AssignmentNode):
+            # No visible declaration: looked up by name, so the failure is reported at run time.
+            name = node.children[0].value; declared = self.temp()
+            self.emit(f"{declared} = declared_type_of({self.scope}, {name!r})")
+            self.emit(f"if {declared} == EQ_TYPE: {self.scope}.set_var({name!r}, ({self.constant(node.children[1])}, EQ_TYPE))")
+            self.emit(f"else: {self.scope}.set_var({name!r}, (checked_store({name!r}, {declared}, {self.compile_expression(node.children[1])}), {declared}))")
+        elif isinstance(node, PrintCmdNode):
+            # Every argument is evaluated before any is formatted, as on the VM stack.
+            texts = []
+            for arg_node in node.children[0].children:
+                value = self.temp(); self.emit(f"{value} = {self.compile_expression(arg_node)}")
+                arg_type = TypeChecker.annotated_type(arg_node)
+                if arg_type == INT_TYPE: texts.append(f"str({value})")
+                elif arg_type == BOOL_TYPE: texts.append(f"('true' if {value} else 'false')")
+                else: texts.append(f"print_text({value}, {self.scope})")
+            self.emit(f"write_line({SEPARATOR.join(texts) if texts else repr('')})")
+        elif isinstance(node, (ShowCmdNode, SolveCmdNode)):
+            self.emit(f"{self.constant(node)}.evaluate({self.scope})")
+        elif isinstance(node, IfNode):
+            branches = [(node.condition, node.if_block, node.condition_message)]
+            branches += [(elif_node.condition, elif_node.block, "Elif condition must be boolean.") for elif_node in node.elif_clauses]
+            for keyword, (condition, block, message) in zip(["if"] + ["elif"] * len(node.elif_clauses), branches):
+                self.emit(f"{keyword} {self.compile_condition(condition, message)}:"); self.compile_scoped_block(block)
+            if node.else_block: self.emit("else:"); self.compile_scoped_block(node.else_block)
+        elif isinstance(node, WhileNode):
+            self.emit(f"while {self.compile_condition(node.children[0], 'While condition must be boolean.')}:")
+            self.loops += 1; self.compile_scoped_block(node.children[1]); self.loops -= 1
+        elif isinstance(node, BlockNode):
+            self.compile_block(node)
+        else:
+            raise KhwarizmiRuntimeError(f"Code generator: unsupported statement node '{type(node).__name__}'.")
+
+    def compile_condition(self, condition: Node, message: str) -> str:
+        expression = self.compile_expression(condition)
+        if TypeChecker.annotated_type(condition) == BOOL_TYPE: return expression
+        return f"checked_condition({expression}, {message!r})"
+
+    # --- Expressions ---
+
+    def compile_expression(self, root: Node) -> str:
+        """
+        Python expression for root's value, built post-order from a stack of the
+        operands' texts. Subexpressions are fully parenthesized, which CPython
+        accepts up to RECURSION_HEIGHT levels deep.
+        """
+        if root.height > RECURSION_HEIGHT: return f"evaluate_expression({self.constant(root)}, {self.scope})[0]"
+        texts: List[str] = []
+        for node in postorder(root):
+            if isinstance(node, (BinOpNode, UnOpNode)) and node.symbolic:
+                del texts[len(texts) - len(node.children):]; texts.append(self.constant(node))
+            elif isinstance(node, BinOpNode):
+                right = texts.pop(); left = texts.pop()
+                if node.operation is not None: texts.append(f"({left} {TYPED_OPERATORS[node.value]} {right})")
+                else: texts.append(f"binary_slow_path({self.constant(node)}, {left}, {right})")
+            elif isinstance(node, UnOpNode):
+                if node.operation is not None: texts[-1] = f"({TYPED_UNARY_OPERATORS[node.value]}{texts[-1]})"
+                else: texts[-1] = f"unary_slow_path({self.constant(node)}, {texts[-1]})"
+            elif isinstance(node, (IntLiteralNode, BoolLiteralNode)):
+                texts.append(f"({node.value!r})")
+            elif isinstance(node, IdentifierNode):
+                if node.binding is None: texts.append(f"load_unresolved({self.scope}, {node.value!r}, {self.constant(node)})")
+                else:
+                    slot = f"v{node.binding[0]}[{node.binding[1]}]"
+                    if TypeChecker.annotated_type(node) is not None or node.declared_type == EQ_TYPE: texts.append(slot)
+                    else: value = self.temp(); texts.append(f"({self.constant(node)} if ({value} := {slot}) is UNASSIGNED else {value})")
+            elif isinstance(node, InputNode):
+                texts.append("read_input_int()")
+            else:
+                raise KhwarizmiRuntimeError(f"Code generator: unsupported expression node '{type(node).__name__}'.")
+        return texts[0]
+
+    @staticmethod
+    def run(program: ProgramNode) -> CompiledProgram:
+        Resolver.run(program)
+        generator = CodeGenerator()
+        generator.compile_block(program.children[0])
+        return CompiledProgram("\n".join(generator.lines) + "\n", generator.constants, program.children[0].layout)
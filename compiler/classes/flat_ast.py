@@ -0,0 +1,425 @@
+from classes.ops import *
+from classes.node import Node
+from classes.symbol_table import SymbolTable, UNASSIGNED
+from array import array
+from typing import List, Any, Dict, Optional, Tuple, BinaryIO
+from bisect import bisect_left
+import mmap
+import struct
+import sys
+
+# --- Node kinds ---
+
+PROGRAM = 0   # children: block
+BLOCK = 1     # children: statements
+VAR_DEC = 2   # op: declared type, value: name, children: initializer (if any)
+ASSIGN = 3    # value: target name, children: expression
+IF = 4        # op: HAS_ELSE | ELIF_CONDITION bits, children: condition, block, ELIFs..., else block
+ELIF = 5      # children: condition, block
+WHILE = 6     # children: condition, block
+ARGS = 7      # children: arguments
+PRINT = 8     # children: ARGS
+SHOW = 9      # children: ARGS
+SOLVE = 10    # children: ARGS
+RANGE = 11    # children: identifier, low, high
+BINOP = 12    # op: operator, children: left, right
+UNOP = 13     # op: operator, children: operand
+INT = 14      # value: literal (index into ints)
+BOOL = 15     # value: 0 or 1
+IDENT = 16    # value: name
+INPUT = 17
+
+HAS_ELSE = 1       # IF op bit: the last child is the else block
+ELIF_CONDITION = 2 # IF op bit: the first condition was an elif's (see IfNode.condition_message)
+ELIF_MESSAGE = "Elif condition must be boolean."
+
+OPERATORS = ("+", "-", "*", "/", "==", "!=", "<", ">", "<=", ">=", "&&", "||", "!")
+OPERATOR_CODES = {op: code for code, op in enumerate(OPERATORS)}
+TYPES = (INT_TYPE, BOOL_TYPE, EQ_TYPE)
+TYPE_CODES = {type_name: code for code, type_name in enumerate(TYPES)}
+
+KIND_NAMES = {PROGRAM: "ProgramNode", BLOCK: "BlockNode", VAR_DEC: "VarDecNode", ASSIGN: "AssignmentNode", IF: "IfNode",
+              ELIF: "ElifNode", WHILE: "WhileNode", ARGS: "ArgumentListNode", PRINT: "PrintCmdNode", SHOW: "ShowCmdNode",
+              SOLVE: "SolveCmdNode", RANGE: "RangeNode", BINOP: "BinOpNode", UNOP: "UnOpNode", INT: "IntLiteralNode",
+              BOOL: "BoolLiteralNode", IDENT: "IdentifierNode", INPUT: "InputNode"}
+
+
+class FlatAST:
+    """
+    A parsed program as parallel arrays instead of Node objects, for generated
+    programs too large to keep as a tree (about 24 bytes per node, tables
+    included, against ~100 for slotted nodes; see bench/node_memory.py).
+    Nodes are numbered in the order the parser completes them, so children come
+    before their parent and the program node is the last one. Node i has
+      kinds[i]   its kind (see above)
+      ops[i]     operator of a BINOP/UNOP (index into OPERATORS), declared type of
+                 a VAR_DEC (index into TYPES), HAS_ELSE/ELIF_CONDITION for an IF
+      values[i]  name of an IDENT/VAR_DEC/ASSIGN (index into strings), literal of
+                 an INT (index into ints), 0/1 for a BOOL
+      edges[firsts[i]:firsts[i] + counts[i]] its children
+    Names and literals are interned, so each distinct one is stored once.
+    Statements (the nodes the parser locates) have their (line, column) in
+    lines/columns at the index of their node in `located`, which is sorted as
+    the parser locates a statement right after adding it; node() restores
+    them, for the TypeChecker's messages.
+
+    evaluate() runs the program straight from the arrays with the tree-walker's
+    semantics, somewhat slower than the tree-walker itself: memory is what this
+    form saves. Only what needs a real tree becomes one (see node()): symbolic
+    values, 'eq' bodies and show/solve statements. The VM compiles to_program().
+    The front end (TypeChecker, Optimizer) works on Node trees too, so main.py
+    runs it on to_program() and evaluates from_program() of the result: the
+    whole tree exists once, while it is checked, but not while the program runs.
+
+    write() stores the arrays as they are in memory; open() maps such a file and
+    uses the arrays in place (memoryview casts), so reloading reads only the
+    string tables and pages the rest in on demand. The file format is native
+    endian and refused on a machine of the other byte order.
+    """
+    MAGIC = b"KHF2"
+    HEADER = struct.Struct("=4sB3xqqqqqq") # magic, big-endian flag, node count, edge count, located count, root, strings size, ints size
+
+    def __init__(self, kinds: array, ops: array, values: array, firsts: array, counts: array, edges: array,
+                 located: array, lines: array, columns: array,
+                 strings: List[str], ints: List[int], root: int, buffer: Optional[mmap.mmap] = None):
+        self.kinds = kinds; self.ops = ops; self.values = values
+        self.firsts = firsts; self.counts = counts; self.edges = edges
+        self.located = located; self.lines = lines; self.columns = columns
+        self.strings = strings; self.ints = ints; self.root = root
+        self.buffer = buffer # the mapped file the arrays are views of, kept open while they are in use
+        self.materialized: Dict[int, Node] = {}
+        self.scope_pool: Dict[int, SymbolTable] = {} # per BLOCK, like BlockNode._pooled_scope
+        self.block_declares: Dict[int, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def children(self, i: int):
+        first = self.firsts[i]
+        return self.edges[first:first + self.counts[i]]
+
+    # --- Node trees ---
+
+    def node(self, i: int) -> Node:
+        """The Node tree for node i, built once, so the same node always yields the same object (as a tree-walked AST does)."""
+        node = self.materialized.get(i)
+        if node is not None: return node
+        stack = [i] # children are built before their parent, from an explicit stack as expressions can be very deep
+        while stack:
+            j = stack[-1]
+            pending = [child for child in self.children(j) if child not in self.materialized]
+            if pending:
+                if min(pending) < 0 or max(pending) >= j: raise ValueError("FlatAST: children must come before their parent") # e.g. a damaged file
+                stack.extend(reversed(pending)); continue
+            stack.pop(); self.materialized[j] = self.build_node(j, self.materialized)
+        return self.materialized[i]
+
+    def position(self, i: int) -> Optional[Tuple[int, int]]:
+        """The (line, column) of statement i, None if the parser did not locate node i."""
+        k = bisect_left(self.located, i)
+        if k == len(self.located) or self.located[k] != i: return None
+        return self.lines[k], self.columns[k]
+
+    def to_program(self) -> ProgramNode:
+        """The whole program as a Node tree, e.g. for the bytecode compiler: every node in turn, as children come first."""
+        if len(self.edges) and min(self.edges) < 0: raise ValueError("FlatAST: negative child index") # e.g. a damaged file
+        nodes: List[Node] = []
+        for i in range(len(self.kinds)): nodes.append(self.build_node(i, nodes)) # a child not built yet raises IndexError
+        return nodes[self.root]
+
+    @staticmethod
+    def from_program(program: ProgramNode) -> "FlatAST":
+        """program as arrays, e.g. once the front end has rewritten its Node tree (the inverse of to_program)."""
+        builder = FlatBuilder()
+        return builder.finish(builder.flatten(program))
+
+    def build_node(self, i: int, built) -> Node:
+        """Node i, its children taken from built (indexed by node)."""
+        kind = self.kinds[i]; children = [built[child] for child in self.children(i)]
+        if kind == BINOP: return BinOpNode(OPERATORS[self.ops[i]], children[0], children[1])
+        if kind == IDENT: return IdentifierNode(self.strings[self.values[i]])
+        if kind == INT: return IntLiteralNode(self.ints[self.values[i]])
+        if kind == UNOP: return UnOpNode(OPERATORS[self.ops[i]], children[0])
+        if kind == BOOL: return BoolLiteralNode(bool(self.values[i]))
+        if kind == INPUT: return InputNode("input")
+        if kind == ARGS: return ArgumentListNode(value="args", children=children)
+        if kind == PRINT: return self.located_node(i, PrintCmdNode(value="print", children=children))
+        if kind == SHOW: return self.located_node(i, ShowCmdNode(value="show", children=children))
+        if kind == SOLVE: return self.located_node(i, SolveCmdNode(value="solve", children=children))
+        if kind == RANGE: return RangeNode(value="in", children=children)
+        if kind == VAR_DEC: return self.located_node(i, VarDecNode(TYPES[self.ops[i]], self.strings[self.values[i]], children[0] if children else None))
+        if kind == ASSIGN: return self.located_node(i, AssignmentNode(value="=", children=[IdentifierNode(self.strings[self.values[i]]), children[0]]))
+        if kind == IF:
+            else_block = children.pop() if self.ops[i] & HAS_ELSE else None
+            node = IfNode(children[0], children[1], children[2:], else_block)
+            if self.ops[i] & ELIF_CONDITION: node.condition_message = ELIF_MESSAGE
+            return self.located_node(i, node)
+        if kind == ELIF: return self.located_node(i, ElifNode(children[0], children[1]))
+        if kind == WHILE: return self.located_node(i, WhileNode(value="while", children=children))
+        if kind == BLOCK: return BlockNode(value="Block", children=children)
+        if kind == PROGRAM: return ProgramNode(value="Program", children=children)
+        raise ValueError(f"FlatAST: unknown node kind {kind}")
+
+    def located_node(self, i: int, node: Node) -> Node:
+        node.position = self.position(i); return node
+
+    # --- Evaluation (mirrors the evaluate methods in classes/ops.py) ---
+
+    def evaluate(self, symbol_table: SymbolTable):
+        try: return self.run_block(self.children(self.root)[0], symbol_table)
+        except Exception as e: report_runtime_error(e)
+        finally: flush_output()
+
+    def run_block(self, block: int, symbol_table: SymbolTable):
+        for statement in self.children(block): self.run_statement(statement, symbol_table)
+        return None, "void"
+
+    def enter_scope(self, block: int, symbol_table: SymbolTable) -> SymbolTable:
+        """BlockNode.enter_scope for a BLOCK node."""
+        if not BlockNode.recycle_scopes: return SymbolTable(parent=symbol_table)
+        declares = self.block_declares.get(block)
+        if declares is None: declares = self.block_declares[block] = any(self.kinds[stmt] == VAR_DEC for stmt in self.children(block))
+        if not declares: return symbol_table
+        scope = self.scope_pool.get(block)
+        if scope is None: scope = self.scope_pool[block] = SymbolTable(parent=symbol_table)
+        else: scope.symbols.clear(); scope.parent = symbol_table
+        return scope
+
+    def run_statement(self, i: int, symbol_table: SymbolTable) -> None:
+        kind = self.kinds[i]
+        if kind == ASSIGN:
+            var_name = self.strings[self.values[i]]; rhs = self.edges[self.firsts[i]]
+            _, declared_type = symbol_table.get_var(var_name)
+            if declared_type == EQ_TYPE:
+                # RHS for 'eq' assignment is the AST itself, not its evaluated value
+                symbol_table.set_var(var_name, (self.node(rhs), EQ_TYPE)); return
+            new_value, new_type = self.evaluate_expression(rhs, symbol_table)
+            if isinstance(new_value, Node) and new_type == EQ_REPR_TYPE:
+                raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{var_name}'.")
+            if declared_type == INT_TYPE and new_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'int', got '{type_name(new_type)}'.")
+            if declared_type == BOOL_TYPE and new_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'bool', got '{type_name(new_type)}'.")
+            symbol_table.set_var(var_name, (new_value, declared_type))
+        elif kind == PRINT:
+            args = self.children(self.edges[self.firsts[i]])
+            write_line(format_print_args([self.evaluate_expression(arg, symbol_table) for arg in args], symbol_table))
+        elif kind == WHILE:
+            condition, body = self.children(i)
+            while True:
+                cond_val, cond_type = self.evaluate_expression(condition, symbol_table)
+                if cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError("While condition must be boolean.")
+                if not cond_val: break
+                self.run_block(body, self.enter_scope(body, symbol_table))
+        elif kind == IF:
+            self.run_if(i, symbol_table)
+        elif kind == VAR_DEC:
+            self.run_declaration(i, symbol_table)
+        elif kind == SHOW or kind == SOLVE:
+            self.node(i).evaluate(symbol_table)
+        else:
+            raise KhwarizmiRuntimeError(f"FlatAST: unsupported statement node '{KIND_NAMES.get(kind, kind)}'.")
+
+    def run_declaration(self, i: int, symbol_table: SymbolTable) -> None:
+        var_name = self.strings[self.values[i]]; type_name_str = TYPES[self.ops[i]]
+        init_expression = self.edges[self.firsts[i]] if self.counts[i] else None
+        if type_name_str == EQ_TYPE:
+            symbol_table.create_var(var_name, type_name_str, None if init_expression is None else self.node(init_expression))
+        elif init_expression is not None:
+            init_val, init_type = self.evaluate_expression(init_expression, symbol_table)
+            if isinstance(init_val, Node) and init_type == EQ_REPR_TYPE:
+                raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{var_name}'.")
+            if type_name_str == INT_TYPE and init_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'int', got '{type_name(init_type)}'.")
+            if type_name_str == BOOL_TYPE and init_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'bool', got '{type_name(init_type)}'.")
+            symbol_table.create_var(var_name, type_name_str, init_val)
+        else: symbol_table.create_var(var_name, type_name_str, None)
+
+    def run_if(self, i: int, symbol_table: SymbolTable) -> None:
+        children = self.children(i)
+        cond_val, cond_type = self.evaluate_expression(children[0], symbol_table)
+        if cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError(ELIF_MESSAGE if self.ops[i] & ELIF_CONDITION else "If condition must be boolean.")
+        if cond_val: return self.run_scoped_block(children[1], symbol_table)
+        has_else = self.ops[i] & HAS_ELSE
+        for elif_node in children[2:len(children) - has_else]:
+            condition, block = self.children(elif_node)
+            elif_cond_val, elif_cond_type = self.evaluate_expression(condition, symbol_table)
+            if elif_cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError(ELIF_MESSAGE)
+            if elif_cond_val: return self.run_scoped_block(block, symbol_table)
+        if has_else: self.run_scoped_block(children[-1], symbol_table)
+
+    def run_scoped_block(self, block: int, symbol_table: SymbolTable) -> None:
+        self.run_block(block, self.enter_scope(block, symbol_table))
+
+    def evaluate_expression(self, root: int, symbol_table: SymbolTable):
+        """
+        Operands are evaluated left to right from an explicit stack (as in
+        ops.evaluate_expression); ~i on the stack applies operator node i to the
+        results of its operands.
+        """
+        results: List[Any] = []; stack = [root]; kinds = self.kinds; firsts = self.firsts; edges = self.edges
+        while stack:
+            i = stack.pop()
+            if i < 0:
+                i = ~i; op = OPERATORS[self.ops[i]]
+                if kinds[i] == UNOP:
+                    val, type_str = results[-1]
+                    results[-1] = (self.node(i), EQ_REPR_TYPE) if type_str == EQ_REPR_TYPE else apply_unary_operator(op, val, type_str)
+                else: right = results.pop(); results[-1] = self.binary_value(i, op, *results[-1], *right)
+                continue
+            kind = kinds[i]
+            if kind == BINOP: first = firsts[i]; stack += (~i, edges[first + 1], edges[first])
+            elif kind == UNOP: stack += (~i, edges[firsts[i]])
+            else: results.append(self.evaluate_operand(i, kind, symbol_table))
+        return results[0]
+
+    def binary_value(self, i: int, op: str, left_val: Any, left_type: ValueType, right_val: Any, right_type: ValueType):
+        if left_type == EQ_REPR_TYPE or right_type == EQ_REPR_TYPE:
+            if op in ["==", "!="]:
+                if left_type != EQ_REPR_TYPE and left_type not in [INT_TYPE, BOOL_TYPE]:
+                    raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{type_name(left_type)}' using '{op}'.")
+                if right_type != EQ_REPR_TYPE and right_type not in [INT_TYPE, BOOL_TYPE]:
+                    raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{type_name(right_type)}' using '{op}'.")
+            return self.node(i), EQ_REPR_TYPE
+        return apply_binary_operator(op, left_val, left_type, right_val, right_type)
+
+    def evaluate_operand(self, i: int, kind: int, symbol_table: SymbolTable):
+        if kind == INT: return self.ints[self.values[i]], INT_TYPE
+        if kind == IDENT:
+            name = self.strings[self.values[i]]
+            try: value, type_str = symbol_table.get_var(name)
+            except KeyError: raise KhwarizmiRuntimeError(f"Undeclared identifier '{name}' used.")
+            if value is UNASSIGNED: return self.node(i), EQ_REPR_TYPE
+            if type_str == EQ_TYPE: return value, EQ_REPR_TYPE # 'value' is the AST of the equation
+            return value, type_str
+        if kind == BOOL: return bool(self.values[i]), BOOL_TYPE
+        if kind == INPUT: return read_input_int(), INT_TYPE
+        return self.node(i).evaluate(symbol_table)
+
+    # --- Serialization ---
+
+    def write(self, file: BinaryIO) -> None:
+        strings = "\n".join(self.strings).encode(); ints = "\n".join(map(str, self.ints)).encode()
+        file.write(self.HEADER.pack(self.MAGIC, sys.byteorder == "big", len(self.kinds), len(self.edges), len(self.located), self.root, len(strings), len(ints)))
+        # The 4-byte columns first, so each one starts 4-byte aligned after the 56-byte header.
+        for column in (self.values, self.firsts, self.counts, self.edges, self.located, self.lines, self.columns, self.kinds, self.ops): file.write(column)
+        file.write(strings); file.write(ints)
+
+    @staticmethod
+    def open(path: str) -> "FlatAST":
+        """Maps a file written by write(); raises ValueError if it is not one."""
+        with open(path, "rb") as file: buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(buffer) < FlatAST.HEADER.size: raise ValueError("truncated flat AST file")
+            magic, big_endian, node_count, edge_count, located_count, root, strings_size, ints_size = FlatAST.HEADER.unpack_from(buffer)
+            if magic != FlatAST.MAGIC: raise ValueError("not a flat AST file")
+            if big_endian != (sys.byteorder == "big"): raise ValueError("flat AST file written on a machine of the other byte order")
+            view = memoryview(buffer); offset = FlatAST.HEADER.size; columns = []
+            for typecode, count in (("i", node_count), ("i", node_count), ("I", node_count), ("i", edge_count),
+                                    ("i", located_count), ("i", located_count), ("i", located_count), ("B", node_count), ("B", node_count)):
+                size = count * array(typecode).itemsize
+                columns.append(view[offset:offset + size].cast(typecode)); offset += size
+            if offset + strings_size + ints_size != len(buffer): raise ValueError("truncated flat AST file")
+            strings = buffer[offset:offset + strings_size].decode().split("\n") if strings_size else []
+            offset += strings_size
+            ints = [int(text) for text in buffer[offset:offset + ints_size].split(b"\n")] if ints_size else []
+        except BaseException:
+            buffer.close()
+            raise
+        values, firsts, counts, edges, located, lines, columns, kinds, ops = columns
+        return FlatAST(kinds, ops, values, firsts, counts, edges, located, lines, columns, strings, ints, root, buffer)
+
+
+class FlatBuilder:
+    """Parser builder (see parser.NodeBuilder) appending each node to FlatAST arrays; a node handle is its index."""
+    def __init__(self):
+        self.kinds = array("B"); self.ops = array("B"); self.values = array("i")
+        self.firsts = array("i"); self.counts = array("I"); self.edges = array("i")
+        self.located = array("i"); self.lines = array("i"); self.columns = array("i")
+        self.strings: List[str] = []; self.string_codes: Dict[str, int] = {}
+        self.ints: List[int] = []; self.int_codes: Dict[int, int] = {}
+
+    def add(self, kind: int, op: int = 0, value: int = 0, children=()) -> int:
+        self.kinds.append(kind); self.ops.append(op); self.values.append(value)
+        self.firsts.append(len(self.edges)); self.counts.append(len(children)); self.edges.extend(children)
+        return len(self.kinds) - 1
+
+    def string(self, text: str) -> int:
+        code = self.string_codes.get(text)
+        if code is None: code = self.string_codes[text] = len(self.strings); self.strings.append(text)
+        return code
+
+    def program(self, block): return self.add(PROGRAM, children=(block,))
+    def block(self, statements): return self.add(BLOCK, children=statements)
+    def var_dec(self, type_name, var_name, init_expression):
+        return self.add(VAR_DEC, TYPE_CODES[type_name], self.string(var_name), () if init_expression is None else (init_expression,))
+    def assignment(self, var_name, expression): return self.add(ASSIGN, value=self.string(var_name), children=(expression,))
+    def if_statement(self, condition, if_block, elif_clauses, else_block):
+        children = [condition, if_block] + elif_clauses
+        if else_block is not None: children.append(else_block)
+        return self.add(IF, op=HAS_ELSE if else_block is not None else 0, children=children)
+    def elif_clause(self, condition, block): return self.add(ELIF, children=(condition, block))
+    def while_loop(self, condition, block): return self.add(WHILE, children=(condition, block))
+    def argument_list(self, args): return self.add(ARGS, children=args)
+    def print_command(self, arg_list): return self.add(PRINT, children=(arg_list,))
+    def show_command(self, arg_list): return self.add(SHOW, children=(arg_list,))
+    def solve_command(self, arg_list): return self.add(SOLVE, children=(arg_list,))
+    def range_argument(self, name, low, high): return self.add(RANGE, children=(name, low, high))
+    def binary(self, op, left, right): return self.add(BINOP, OPERATOR_CODES[op], children=(left, right))
+    def unary(self, op, operand): return self.add(UNOP, OPERATOR_CODES[op], children=(operand,))
+    def int_literal(self, value):
+        code = self.int_codes.get(value)
+        if code is None: code = self.int_codes[value] = len(self.ints); self.ints.append(value)
+        return self.add(INT, value=code)
+    def bool_literal(self, value): return self.add(BOOL, value=int(value))
+    def identifier(self, name): return self.add(IDENT, value=self.string(name))
+    def input_call(self): return self.add(INPUT)
+    def is_identifier(self, node) -> bool: return self.kinds[node] == IDENT
+    def type_name(self, node) -> str: return KIND_NAMES[self.kinds[node]]
+    def locate(self, statement, token):
+        self.located.append(statement); self.lines.append(token.line); self.columns.append(token.column); return statement
+
+    def flatten(self, root: Node) -> int:
+        """
+        Adds the Node tree under root, as the parser would have built it (children
+        first, from an explicit stack), and returns root's handle. Statements keep
+        their positions; an IF whose first condition was an elif's keeps its message.
+        """
+        handles: List[int] = []; stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            # An assignment's target is stored as its name, not as a child
+            operands = [child for child in (node.children[1:] if isinstance(node, AssignmentNode) else node.children) if isinstance(child, Node)]
+            if not children_done:
+                stack.append((node, True)); stack.extend((child, False) for child in reversed(operands)); continue
+            children = handles[len(handles) - len(operands):]; del handles[len(handles) - len(operands):]
+            handle = self.add_node(node, children)
+            position = getattr(node, "position", None)
+            if position is not None: self.located.append(handle); self.lines.append(position[0]); self.columns.append(position[1])
+            handles.append(handle)
+        return handles[0]
+
+    def add_node(self, node: Node, children: List[int]) -> int:
+        if isinstance(node, BinOpNode): return self.binary(node.value, children[0], children[1])
+        if isinstance(node, IdentifierNode): return self.identifier(node.value)
+        if isinstance(node, IntLiteralNode): return self.int_literal(node.value)
+        if isinstance(node, UnOpNode): return self.unary(node.value, children[0])
+        if isinstance(node, BoolLiteralNode): return self.bool_literal(node.value)
+        if isinstance(node, InputNode): return self.input_call()
+        if isinstance(node, ArgumentListNode): return self.argument_list(children)
+        if isinstance(node, PrintCmdNode): return self.print_command(children[0])
+        if isinstance(node, ShowCmdNode): return self.show_command(children[0])
+        if isinstance(node, SolveCmdNode): return self.solve_command(children[0])
+        if isinstance(node, RangeNode): return self.range_argument(*children)
+        if isinstance(node, VarDecNode): return self.var_dec(node.type_name_str, node.var_name, children[0] if children else None)
+        if isinstance(node, AssignmentNode): return self.assignment(node.children[0].value, children[0])
+        if isinstance(node, IfNode):
+            handle = self.if_statement(children[0], children[1], children[2:2 + len(node.elif_clauses)], children[-1] if node.else_block is not None else None)
+            if node.condition_message == ELIF_MESSAGE: self.ops[handle] |= ELIF_CONDITION
+            return handle
+        if isinstance(node, ElifNode): return self.elif_clause(children[0], children[1])
+        if isinstance(node, WhileNode): return self.while_loop(children[0], children[1])
+        if isinstance(node, BlockNode): return self.block(children)
+        if isinstance(node, ProgramNode): return self.program(children[0])
+        raise ValueError(f"FlatAST: cannot flatten node '{type(node).__name__}'")
+
+    def finish(self, program) -> FlatAST:
+        return FlatAST(self.kinds, self.ops, self.values, self.firsts, self.counts, self.edges,
+                       self.located, self.lines, self.columns, self.strings, self.ints, program)
@@ -0,0 +1,100 @@
+import itertools
+import mmap
+import operator
+from typing import Any, Iterable, Iterator, List, Optional
+from classes.output import write_line, flush_output
+
+INVALID_INPUT_MESSAGE = "Invalid input. Please enter an integer."
+
+class InputSource:
+    """Where input() reads its integers from. read_int raises EOFError once there are none left."""
+    def read_int(self) -> int:
+        raise NotImplementedError
+
+
+class StdinSource(InputSource):
+    """One line of stdin per value, re-prompting on invalid input; output printed so far is written out first."""
+    def read_int(self) -> int:
+        while True:
+            flush_output()
+            try: return int(input())
+            except ValueError: write_line(INVALID_INPUT_MESSAGE)
+
+
+class IterableSource(InputSource):
+    """
+    Values taken in order from an iterable of ints, for embedders and batch
+    jobs. A NumPy array is converted to Python ints up front; any other value
+    must support operator.index.
+    """
+    def __init__(self, values: Iterable[Any]):
+        if hasattr(values, "tolist"): values = values.tolist() # NumPy scalars would fail the engines' `is int` checks
+        self.values = iter(values)
+
+    def read_int(self) -> int:
+        for value in self.values: return value if value.__class__ is int else operator.index(value)
+        raise EOFError
+
+
+class FileSource(InputSource):
+    """
+    The lines of a file, read as stdin would read them but parsed in bulk: the
+    file is memory-mapped and split into lines CHUNK_SIZE bytes at a time, as
+    input() gets to them, and each chunk's lines are converted to ints at once.
+    Only the current chunk's values are held, whatever the file's size; the
+    mapping is closed when its last chunk has been read. A line that is not an
+    integer is reported and skipped when its turn comes, as on stdin.
+    """
+    INVALID = None # stands for a line that is not an integer
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file: # the mapping stays valid once the file is closed
+            size = file.seek(0, 2)
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.values = itertools.chain.from_iterable(FileSource.read_chunks(buffer, size))
+
+    @staticmethod
+    def read_chunks(buffer: Optional[mmap.mmap], size: int) -> Iterator[List[Any]]:
+        """The values of each chunk of buffer's lines in turn; closes buffer at the end."""
+        try:
+            start = 0
+            while start < size:
+                # Chunks end after a newline, so no line is split (a line longer than a chunk makes its own chunk).
+                end = size if start + FileSource.CHUNK_SIZE >= size else buffer.rfind(b"\n", start, start + FileSource.CHUNK_SIZE) + 1
+                if end <= start: end = buffer.find(b"\n", start + FileSource.CHUNK_SIZE) + 1 or size
+                lines = buffer[start:end].split(b"\n")
+                if not lines[-1]: lines.pop() # the chunk's final newline ends its last line; input() sees no line after the file's
+                start = end
+                yield FileSource.parse_lines(lines)
+        finally:
+            if buffer is not None: buffer.close()
+
+    @staticmethod
+    def parse_lines(lines: List[bytes]) -> List[Any]:
+        try: return list(map(int, lines))
+        except ValueError: return [FileSource.parse_line(line) for line in lines]
+
+    @staticmethod
+    def parse_line(line: bytes) -> Any:
+        try: return int(line.decode("utf-8")) # as a str, int() also accepts non-ASCII digits
+        except ValueError: return FileSource.INVALID
+
+    def read_int(self) -> int:
+        for value in self.values:
+            if value is not FileSource.INVALID: return value
+            write_line(INVALID_INPUT_MESSAGE)
+        raise EOFError
+
+
+# The source every engine's input() reads from; replaced with set_input_source.
+source: InputSource = StdinSource()
+
+def set_input_source(new_source: InputSource) -> InputSource:
+    """Makes input() read from new_source; returns the previous source."""
+    global source
+    previous = source; source = new_source
+    return previous
+
+def read_int() -> int:
+    return source.read_int()
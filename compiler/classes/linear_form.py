@@ -0,0 +1,178 @@
+from fractions import Fraction
+from math import lcm
+from typing import Dict, List, Tuple, Any, FrozenSet, Iterable, Union
+
+Number = Union[int, Fraction]
+
+# Markers in the value map handed to LinearForm.evaluate, next to plain int values.
+TARGET = object()    # the variable being solved for
+FREE = object()      # unassigned or undeclared: contributes 0 and is reported as unresolved
+NONLINEAR = object() # bool/eq variable: makes the equation non-linear
+
+ZERO_DIVISOR_MESSAGE = "Khwarizmi: Division by zero constant in symbolic term collection."
+
+def exact_quotient(dividend: Number, divisor: Number) -> Number:
+    """dividend / divisor in an equation: an int when the division comes out even (the common case), else a Fraction."""
+    quotient, remainder = divmod(dividend, divisor)
+    return quotient if remainder == 0 else Fraction(dividend, divisor)
+
+def common_denominator(numbers: Iterable[Number]) -> int:
+    """Smallest positive int turning every number into an int when multiplied by it (1 for ints)."""
+    return lcm(*(number.denominator for number in numbers))
+
+class LinearForm:
+    """
+    Normalized 'eq' expression: sum(coeffs[name] * name) + const + sum(m * term)
+    over all the identifiers it mentions, built once by ops.linear_form_of.
+
+    Sums, negations, products with a constant and divisions by a non-zero
+    constant are flattened into the coefficient map. Division in an equation is
+    exact: coefficients stay ints until a division does not come out even, and
+    are Fractions from then on (see exact_quotient). What cannot be flattened
+    without knowing variable values (a product of two non-constant forms, a
+    division by one) is kept as a ProductTerm/QuotientTerm, evaluated with the
+    rules collect_terms_linear applies to the same node. Names whose terms cancel
+    keep a 0 coefficient so they are still type-checked and reported when free,
+    exactly like the AST walk.
+    """
+    def __init__(self, coeffs: Dict[str, Number] = None, const: Number = 0, terms: List[Tuple[Number, Any]] = None):
+        self.coeffs = coeffs if coeffs is not None else {}
+        self.const = const
+        self.terms = terms if terms is not None else [] # (multiplier, ProductTerm | QuotientTerm)
+        self._names = None; self._integral = None
+
+    def is_constant(self) -> bool:
+        return not self.coeffs and not self.terms
+
+    def scaled(self, factor: Number) -> "LinearForm":
+        return LinearForm({name: c * factor for name, c in self.coeffs.items()}, self.const * factor,
+                          [(m * factor, term) for m, term in self.terms])
+
+    def add(self, other: "LinearForm", sign: int = 1) -> "LinearForm":
+        """Adds sign * other to this form in place and returns it: a sum chain costs its length, not its square."""
+        coeffs = self.coeffs
+        for name, c in other.coeffs.items(): coeffs[name] = coeffs.get(name, 0) + sign * c
+        self.const += sign * other.const; self.terms += [(m * sign, term) for m, term in other.terms]
+        self._names = self._integral = None
+        return self
+
+    def names(self) -> FrozenSet[str]:
+        """Every identifier the expression mentions, including inside product/quotient terms."""
+        if self._names is None:
+            names = set(self.coeffs)
+            for _, term in self.terms: names |= term.names()
+            self._names = frozenset(names)
+        return self._names
+
+    def integral(self) -> Tuple["LinearForm", int]:
+        """
+        (d * self, d), where d is the smallest positive int that makes every
+        coefficient, constant and term multiplier of the copy an int, inside the
+        factors and operands of its terms too; d is 1 for a form without
+        Fractions. Solving evaluates this copy, on ints, and divides by d once
+        at the end. Built on first use and kept.
+        """
+        if self._integral is not None: return self._integral
+        terms = []
+        for m, term in self.terms:
+            if isinstance(term, ProductTerm):
+                (left, left_d), (right, right_d) = term.left.integral(), term.right.integral()
+                terms.append((exact_quotient(m, left_d * right_d), ProductTerm(left, right)))
+            else:
+                (dividend, dividend_d), (divisor, divisor_d) = term.dividend.integral(), term.divisor.integral()
+                terms.append((exact_quotient(m * divisor_d, dividend_d), QuotientTerm(dividend, divisor)))
+        d = common_denominator([*self.coeffs.values(), self.const, *(m for m, _ in terms)])
+        self._integral = (LinearForm({name: int(c * d) for name, c in self.coeffs.items()}, int(self.const * d),
+                                     [(int(m * d), term) for m, term in terms]), d)
+        return self._integral
+
+    def evaluate(self, values: Dict[str, Any]) -> Tuple[Number, Number, bool]:
+        """
+        (coefficient of the TARGET variable, constant, is_linear) once every name is
+        replaced by its entry in values. All terms are evaluated even after the form
+        is known to be non-linear, since the AST walk raises for a zero divisor anywhere.
+        """
+        coeff = 0; const = self.const; is_linear = True
+        for name, c in self.coeffs.items():
+            value = values[name]
+            if value is TARGET: coeff += c
+            elif value is FREE: pass
+            elif value is NONLINEAR: is_linear = False
+            else: const += c * value
+        for m, term in self.terms:
+            term_coeff, term_const, term_linear = term.evaluate(values)
+            coeff += m * term_coeff; const += m * term_const; is_linear = is_linear and term_linear
+        return coeff, const, is_linear
+
+    def evaluate_vector(self, values: Dict[str, Any]) -> Tuple[Dict[str, Number], Number, bool]:
+        """evaluate() with several TARGET variables: their coefficients are returned by name."""
+        coeffs: Dict[str, Number] = {}; const = self.const; is_linear = True
+        for name, c in self.coeffs.items():
+            value = values[name]
+            if value is TARGET: coeffs[name] = coeffs.get(name, 0) + c
+            elif value is FREE: pass
+            elif value is NONLINEAR: is_linear = False
+            else: const += c * value
+        for m, term in self.terms:
+            term_coeffs, term_const, term_linear = term.evaluate_vector(values)
+            for name, c in term_coeffs.items(): coeffs[name] = coeffs.get(name, 0) + m * c
+            const += m * term_const; is_linear = is_linear and term_linear
+        return coeffs, const, is_linear
+
+class ProductTerm:
+    def __init__(self, left: LinearForm, right: LinearForm):
+        self.left = left; self.right = right
+
+    def names(self) -> FrozenSet[str]:
+        return self.left.names() | self.right.names()
+
+    def evaluate(self, values: Dict[str, Any]) -> Tuple[Number, Number, bool]:
+        left_coeff, left_const, left_linear = self.left.evaluate(values)
+        right_coeff, right_const, right_linear = self.right.evaluate(values)
+        if not (left_linear and right_linear) or (left_coeff != 0 and right_coeff != 0): return 0, 0, False
+        if left_coeff != 0: return left_coeff * right_const, left_const * right_const, True
+        if right_coeff != 0: return right_coeff * left_const, right_const * left_const, True
+        return 0, left_const * right_const, True
+
+    def evaluate_vector(self, values: Dict[str, Any]) -> Tuple[Dict[str, Number], Number, bool]:
+        left_coeffs, left_const, left_linear = self.left.evaluate_vector(values)
+        right_coeffs, right_const, right_linear = self.right.evaluate_vector(values)
+        left_varies = any(left_coeffs.values()); right_varies = any(right_coeffs.values())
+        if not (left_linear and right_linear) or (left_varies and right_varies): return {}, 0, False
+        if left_varies: return {name: c * right_const for name, c in left_coeffs.items()}, left_const * right_const, True
+        if right_varies: return {name: c * left_const for name, c in right_coeffs.items()}, right_const * left_const, True
+        return {}, left_const * right_const, True
+
+class QuotientTerm:
+    def __init__(self, dividend: LinearForm, divisor: LinearForm):
+        self.dividend = dividend; self.divisor = divisor
+
+    def names(self) -> FrozenSet[str]:
+        return self.dividend.names() | self.divisor.names()
+
+    def evaluate(self, values: Dict[str, Any]) -> Tuple[Number, Number, bool]:
+        left_coeff, left_const, left_linear = self.dividend.evaluate(values)
+        right_coeff, right_const, right_linear = self.divisor.evaluate(values)
+        if not (left_linear and right_linear) or right_coeff != 0: return 0, 0, False
+        if right_const == 0: raise ZeroDivisionError(ZERO_DIVISOR_MESSAGE)
+        return exact_quotient(left_coeff, right_const), exact_quotient(left_const, right_const), True
+
+    def evaluate_vector(self, values: Dict[str, Any]) -> Tuple[Dict[str, Number], Number, bool]:
+        left_coeffs, left_const, left_linear = self.dividend.evaluate_vector(values)
+        right_coeffs, right_const, right_linear = self.divisor.evaluate_vector(values)
+        if not (left_linear and right_linear) or any(right_coeffs.values()): return {}, 0, False
+        if right_const == 0: raise ZeroDivisionError(ZERO_DIVISOR_MESSAGE)
+        return {name: exact_quotient(c, right_const) for name, c in left_coeffs.items()}, exact_quotient(left_const, right_const), True
+
+def divide_exactly(dividend: LinearForm, divisor: LinearForm):
+    """dividend / divisor, flattened when the divisor is a non-zero constant; else a quotient term."""
+    if divisor.is_constant() and divisor.const != 0:
+        d = divisor.const
+        return LinearForm({name: exact_quotient(c, d) for name, c in dividend.coeffs.items()}, exact_quotient(dividend.const, d),
+                          [(exact_quotient(m, d), term) for m, term in dividend.terms])
+    return LinearForm(terms=[(1, QuotientTerm(dividend, divisor))])
+
+def multiply(left: LinearForm, right: LinearForm) -> LinearForm:
+    if left.is_constant(): return right.scaled(left.const)
+    if right.is_constant(): return left.scaled(right.const)
+    return LinearForm(terms=[(1, ProductTerm(left, right))])
@@ -0,0 +1,81 @@
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+
+UNIQUE = "unique"
+INFINITE = "infinite"
+INCONSISTENT = "inconsistent"
+
+def bareiss_echelon(rows: List[Dict[int, int]], n_vars: int) -> List[int]:
+    """
+    Brings the augmented rows (column n_vars holds the right-hand side) to row
+    echelon form in place with fraction-free (Bareiss) elimination, and returns
+    the pivot column of each leading row. Every entry stays an integer: after a
+    step with pivot p, each row below is updated as (p * row - a * pivot_row) / prev,
+    where prev is the previous pivot and the division is exact.
+
+    Rows are sparse {column: value} dicts holding only non-zero entries. Pivots
+    are chosen to limit fill-in (sparsest row, then its least shared column), so
+    the pivot columns come in no particular order; rows a step does not
+    eliminate only have their scale factor updated instead of being rewritten.
+    """
+    prev = 1; rank = 0; pivots = []
+    scales = [Fraction(1)] * len(rows) # pending factor of each row, applied the next time the row is used
+    column_counts: Dict[int, int] = {} # remaining rows with an entry in each variable column
+    for row in rows:
+        for c in row:
+            if c != n_vars: column_counts[c] = column_counts.get(c, 0) + 1
+    def materialize(i):
+        if scales[i] != 1:
+            num, den = scales[i].numerator, scales[i].denominator
+            rows[i] = {c: v * num // den for c, v in rows[i].items()}; scales[i] = Fraction(1)
+        return rows[i]
+    while True:
+        # Markowitz-style choice: the sparsest remaining row, and its least shared column.
+        best = None
+        for i in range(rank, len(rows)):
+            size = len(rows[i]) - (n_vars in rows[i])
+            if size and (best is None or size < best_size): best, best_size = i, size
+        if best is None: break
+        col = min((c for c in rows[best] if c != n_vars), key=lambda c: (column_counts[c], c))
+        rows[rank], rows[best] = rows[best], rows[rank]; scales[rank], scales[best] = scales[best], scales[rank]
+        pivot_row = materialize(rank); p = pivot_row[col]
+        for c in pivot_row:
+            if c != n_vars: column_counts[c] -= 1
+        for i in range(rank + 1, len(rows)):
+            if col not in rows[i]:
+                # Bareiss scales every remaining row by p / prev, not only those being eliminated;
+                # that is what keeps the division by prev exact at later steps. It is deferred.
+                if p != prev: scales[i] *= Fraction(p, prev)
+                continue
+            row = materialize(i); a = row[col]
+            new_row = {}
+            for c in row.keys() | pivot_row.keys():
+                if c == col: continue
+                v = (p * row.get(c, 0) - a * pivot_row.get(c, 0)) // prev
+                if v: new_row[c] = v
+            for c in row:
+                if c != n_vars: column_counts[c] -= 1
+            for c in new_row:
+                if c != n_vars: column_counts[c] += 1
+            rows[i] = new_row
+        prev = p; pivots.append(col); rank += 1
+    return pivots
+
+def solve_linear_system(rows: List[Dict[int, int]], n_vars: int) -> Tuple[str, Optional[List[Fraction]]]:
+    """
+    Solves sum(row[j] * x_j for j < n_vars) == row[n_vars] for every row, exactly.
+    Returns (UNIQUE, values), (INFINITE, None) or (INCONSISTENT, None). The rows
+    are consumed.
+    """
+    pivots = bareiss_echelon(rows, n_vars)
+    rank = len(pivots)
+    if any(rows[i].get(n_vars, 0) != 0 for i in range(rank, len(rows))): return INCONSISTENT, None
+    if rank < n_vars: return INFINITE, None
+    values: List[Fraction] = [Fraction(0)] * n_vars
+    for k in range(rank - 1, -1, -1):
+        row = rows[k]; col = pivots[k]
+        total = Fraction(row.get(n_vars, 0))
+        for c, v in row.items():
+            if c != col and c != n_vars: total -= v * values[c]
+        values[col] = total / row[col]
+    return UNIQUE, values
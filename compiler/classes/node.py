@@ -1,25 +1,80 @@
-from dataclasses import dataclass, field
-from typing import List, Any, Set
+from typing import List, Any, Set, FrozenSet, Iterator
 
-@dataclass
 class Node():
-    value : Any
-    children : List[Any] = field(default_factory=list)
+    """
+    Base of every AST node. Generated programs parse to millions of nodes, so no
+    node class has an instance __dict__: each one lists its fields in __slots__.
+    `children` is the uniform, read-only view of the sub-nodes used by generic
+    passes. Leaves share the empty tuple below, fixed-arity nodes (BinOpNode,
+    UnOpNode, IfNode, ...) build it from their named fields, and only nodes with
+    a variable number of sub-nodes (CompositeNode) store a list.
+    """
+    __slots__ = ("value", "_linear_form", "_identifiers")
+    children = ()
+    height = 0 # nesting of BinOpNode/UnOpNode operators, which set their own (see ops.evaluate_expression)
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._linear_form = None # LinearForm of an 'eq' body, built on its first solve (see ops.linear_form_of)
+        self._identifiers = None # frozenset cached by identifiers()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(value={self.value!r})"
 
     def evaluate(self, symbol_table):
         """To be implemented by subclasses."""
         pass
 
     def collect_identifiers(self) -> Set[str]:
+        """All unique identifier names in this subtree, as a new set (see identifiers())."""
+        return set(self.identifiers())
+
+    def identifiers(self) -> FrozenSet[str]:
         """
-        Recursively collects all unique identifier names (strings) from this node's children.
-        Subclasses like IdentifierNode will override this to add their own value.
-        Nodes that don't contain identifiers or whose children don't (e.g., literals)
-        will effectively return an empty set through this base implementation if not overridden.
+        The identifier names in this subtree, computed once per node from the
+        children's sets, so asking again (or asking a parent whose subtrees were
+        already asked) costs no traversal. Only used at run time, once the parser
+        and the optimizer are done rewriting the tree.
+
+        The subtree is walked with an explicit stack, like every pass over
+        expressions, since generated equations can be far deeper than Python's
+        recursion limit. A node whose children's names are all in one child's set
+        shares that frozenset, so a long chain over a few names stays linear.
         """
-        ids: Set[str] = set()
-        for child in self.children:
-            if isinstance(child, Node): 
-                ids.update(child.collect_identifiers())
-            
-        return ids
\ No newline at end of file
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if node._identifiers is not None: stack.pop(); continue
+            children = [child for child in node.children if isinstance(child, Node)]
+            pending = [child for child in children if child._identifiers is None]
+            if pending: stack.extend(reversed(pending)); continue
+            stack.pop()
+            if not children: node._identifiers = node.leaf_identifiers(); continue
+            largest = max((child._identifiers for child in children), key=len)
+            if all(child._identifiers <= largest for child in children): node._identifiers = largest
+            else: node._identifiers = largest.union(*(child._identifiers for child in children))
+        return self._identifiers
+
+    def leaf_identifiers(self) -> FrozenSet[str]:
+        """identifiers() of a node without children."""
+        return frozenset()
+
+def postorder(root: Node) -> Iterator[Node]:
+    """
+    The nodes of root's subtree, each one after its children (left to right),
+    walked with an explicit stack instead of recursion.
+    """
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done: yield node; continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children) if isinstance(child, Node))
+
+class CompositeNode(Node):
+    """A node with a variable number of sub-nodes, kept in a list: blocks, statements, argument lists."""
+    __slots__ = ("children",)
+
+    def __init__(self, value: Any, children: List[Any] = None):
+        super().__init__(value)
+        self.children = children if children is not None else []
@@ -1,7 +1,15 @@
-from classes.node import Node
-from classes.symbol_table import SymbolTable, UNASSIGNED # Ensure UNASSIGNED is imported
-from typing import List, Any, Tuple, Set, Dict, Optional
+from classes.node import Node, CompositeNode
+from classes.symbol_table import SymbolTable, Frame, UNASSIGNED # Ensure UNASSIGNED is imported
+from classes.value_type import *
+from classes.linear_form import LinearForm, TARGET, FREE, NONLINEAR, divide_exactly, multiply, exact_quotient, common_denominator, Number
+from classes.linear_system import solve_linear_system, UNIQUE, INFINITE
+from classes.batch_solve import solve_range, outcome_message
+from classes.output import write_line, write_lines, flush_output
+from classes.input_source import read_int
+from typing import List, Any, Tuple, Set, Dict, Optional, FrozenSet
+from collections import OrderedDict
 from dataclasses import dataclass, field
+import operator
 
 class KhwarizmiRuntimeError(Exception):
     pass
@@ -13,365 +21,628 @@ class KhwarizmiRuntimeError(Exception):
 # Specifically, ast_node_to_string and simplify_arithmetic_ast need to handle UNASSIGNED from get_var.
 #----------------------------------------------------------------------
 
+SUBSTITUTION_MEMO_SIZE = 4096
+INTERNED_NODES_LIMIT = 1 << 16
+substitution_memo: "OrderedDict[tuple, Tuple[Node, Node]]" = OrderedDict() # LRU of substitute_ast results
+interned_nodes: Dict[tuple, Node] = {}
+
+def intern_node(key: tuple, node: Node) -> Node:
+    """
+    Registers node as the one node for key (the node type, its value and the ids
+    of its children, which the node keeps alive): equal subtrees built by
+    substitute_ast are therefore a single object, and must not be modified.
+    The table is simply emptied once it reaches INTERNED_NODES_LIMIT.
+    """
+    if len(interned_nodes) >= INTERNED_NODES_LIMIT: interned_nodes.clear()
+    interned_nodes[key] = node
+    return node
+
 def substitute_ast(node: Optional[Node], substitutions: Dict[str, Any], symbol_table: SymbolTable) -> Optional[Node]:
+    """
+    node with the substituted identifiers replaced by literals. Subtrees that
+    mention none of them are shared with node rather than copied, rebuilt
+    subtrees are hash-consed (see interned), and results are memoized by node and
+    by the substitutions that apply to it, so the result must be treated as read-only.
+    """
     if node is None: return None
     if not isinstance(node, Node):
         raise TypeError(f"substitute_ast expects a Node instance, got {type(node)}")
-    if isinstance(node, IdentifierNode):
-        var_name = node.value
-        if var_name in substitutions:
+    shared = node.identifiers().intersection(substitutions)
+    if not shared: return node
+    key = [id(node)]
+    for name in sorted(shared): value = substitutions[name]; key += (name, type(value), value)
+    key = tuple(key)
+    entry = substitution_memo.get(key)
+    if entry is not None: substitution_memo.move_to_end(key); return entry[1]
+    result = substitute_subtree(node, substitutions)
+    substitution_memo[key] = (node, result) # keeping node alive keeps its id from being reused
+    if len(substitution_memo) > SUBSTITUTION_MEMO_SIZE: substitution_memo.popitem(last=False)
+    return result
+
+BUILD = object() # explicit-stack marker: the node below it on the stack has its children's results ready
+
+def substitute_subtree(root: Node, substitutions: Dict[str, Any]) -> Node:
+    # Every node below a root passed to substitute_ast has its identifier set cached already.
+    results: List[Any] = []; stack: List[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if node is BUILD:
+            node = stack.pop()
+            if isinstance(node, BinOpNode):
+                new_right_child = results.pop(); new_left_child = results.pop()
+                key = (BinOpNode, node.value, id(new_left_child), id(new_right_child))
+                results.append(interned_nodes.get(key) or intern_node(key, BinOpNode(node.value, new_left_child, new_right_child)))
+            elif isinstance(node, UnOpNode):
+                new_operand = results.pop()
+                key = (UnOpNode, node.value, id(new_operand))
+                results.append(interned_nodes.get(key) or intern_node(key, UnOpNode(node.value, new_operand)))
+            elif isinstance(node, EquationNode):
+                new_symbolic_expr = results.pop()
+                key = (EquationNode, id(new_symbolic_expr))
+                results.append(interned_nodes.get(key) or intern_node(key, EquationNode(new_symbolic_expr)))
+            else: # Fallback for other node types
+                new_children = results[len(results) - len(node.children):]; del results[len(results) - len(node.children):]
+                try: results.append(type(node)(node.value, new_children))
+                except TypeError: results.append(node)
+        elif not isinstance(node, Node) or node._identifiers.isdisjoint(substitutions): results.append(node)
+        elif isinstance(node, IdentifierNode):
+            var_name = node.value
             value_to_sub = substitutions[var_name]
-            if isinstance(value_to_sub, int): return IntLiteralNode(value_to_sub)
-            elif isinstance(value_to_sub, bool): return BoolLiteralNode(value_to_sub)
+            key = (type(value_to_sub), value_to_sub)
+            shared = interned_nodes.get(key)
+            if shared is not None: results.append(shared)
+            elif isinstance(value_to_sub, int): results.append(intern_node(key, IntLiteralNode(value_to_sub)))
+            elif isinstance(value_to_sub, bool): results.append(intern_node(key, BoolLiteralNode(value_to_sub)))
             else: raise KhwarizmiRuntimeError(f"Substitution for '{var_name}' has unsupported type: {type(value_to_sub)}. Expected int or bool.")
-        else: return IdentifierNode(node.value) # Return a new instance
-    elif isinstance(node, (IntLiteralNode, BoolLiteralNode)):
-        return type(node)(node.value) # Return a new instance
-    elif isinstance(node, BinOpNode):
-        new_left_child = substitute_ast(node.children[0], substitutions, symbol_table)
-        new_right_child = substitute_ast(node.children[1], substitutions, symbol_table)
-        return BinOpNode(node.value, [new_left_child, new_right_child])
-    elif isinstance(node, UnOpNode):
-        new_operand = substitute_ast(node.children[0], substitutions, symbol_table)
-        return UnOpNode(node.value, [new_operand])
-    elif isinstance(node, EquationNode):
-        new_symbolic_expr = substitute_ast(node.symbolic_expression, substitutions, symbol_table)
-        return EquationNode(new_symbolic_expr)
-    else: # Fallback for other node types
-        new_children = []
-        if hasattr(node, 'children') and isinstance(node.children, list):
-            for child in node.children:
-                if isinstance(child, Node): new_children.append(substitute_ast(child, substitutions, symbol_table))
-                else: new_children.append(child)
-        try:
-            if hasattr(node, 'children'): return type(node)(node.value, new_children)
-            else: return type(node)(node.value)
-        except TypeError: return node
+        elif isinstance(node, BinOpNode): stack += (node, BUILD, node.right, node.left)
+        elif isinstance(node, UnOpNode): stack += (node, BUILD, node.operand)
+        elif isinstance(node, EquationNode): stack += (node, BUILD, node.symbolic_expression)
+        elif isinstance(node.children, list): stack += (node, BUILD, *reversed(node.children))
+        else: results.append(node)
+    return results[0]
 
 def ast_node_to_string(node: Any, symbol_table: SymbolTable, parent_op_precedence: int = 0) -> str:
-    if not isinstance(node, Node):
-        if isinstance(node, bool): return str(node).lower()
-        return str(node)
-    if isinstance(node, IdentifierNode):
-        try:
-            value, type_str = symbol_table.get_var(node.value)
-            if value is UNASSIGNED: # <<< POINT 2: Correctly print name if UNASSIGNED
-                return node.value 
-            if type_str == "eq": return ast_node_to_string(value, symbol_table)
-            elif type_str == "bool": return str(value).lower()
-            if not isinstance(value, Node): return str(value)
-            else: return node.value # Fallback if an AST node was stored for a non-eq var
-        except KeyError: return node.value # Free symbolic variable (not in symbol_table at all)
-    elif isinstance(node, IntLiteralNode): return str(node.value)
-    elif isinstance(node, BoolLiteralNode): return str(node.value).lower()
-    elif isinstance(node, BinOpNode):
-        left_str = ast_node_to_string(node.children[0], symbol_table)
-        right_str = ast_node_to_string(node.children[1], symbol_table)
-        return f"({left_str} {node.value} {right_str})"
-    elif isinstance(node, UnOpNode):
-        operand_str = ast_node_to_string(node.children[0], symbol_table)
-        if isinstance(node.children[0], (IntLiteralNode, IdentifierNode)): return f"{node.value}{operand_str}"
-        else: return f"{node.value}({operand_str})"
-    elif isinstance(node, EquationNode): return ast_node_to_string(node.symbolic_expression, symbol_table)
-    else:
-        val_attr = node.value if hasattr(node, 'value') else type(node).__name__
-        return f"<AST:{type(node).__name__}:{val_attr}>"
-
-def simplify_arithmetic_ast(node: Node, symbol_table: SymbolTable) -> int:
-    if not isinstance(node, Node): raise KhwarizmiRuntimeError(f"Cannot simplify non-Node type: {type(node)}")
-    if isinstance(node, IntLiteralNode): return node.value
-    elif isinstance(node, IdentifierNode):
-        try:
-            value, type_str = symbol_table.get_var(node.value)
-            if value is UNASSIGNED: # <<< POINT 3: Error if UNASSIGNED during simplification
-                raise KhwarizmiRuntimeError(f"Cannot simplify: Variable '{node.value}' is unassigned.")
-            if type_str == "int":
-                if not isinstance(value, int): raise KhwarizmiRuntimeError(f"Var '{node.value}' is 'int' but not int value: {value}")
-                return value
-            else: raise KhwarizmiRuntimeError(f"Cannot simplify: Var '{node.value}' is '{type_str}', not 'int'.")
-        except KeyError: raise KhwarizmiRuntimeError(f"Cannot simplify: Symbolic var '{node.value}' has no value in this context.")
-    elif isinstance(node, BinOpNode):
-        if node.value not in ['+', '-', '*', '/']: raise KhwarizmiRuntimeError(f"Cannot simplify: Non-arithmetic op '{node.value}'.")
-        left_val = simplify_arithmetic_ast(node.children[0], symbol_table)
-        right_val = simplify_arithmetic_ast(node.children[1], symbol_table)
-        if node.value == '+': return left_val + right_val
-        if node.value == '-': return left_val - right_val
-        if node.value == '*': return left_val * right_val
-        if node.value == '/':
-            if right_val == 0: raise ZeroDivisionError("Khwarizmi: Division by zero during simplification.")
-            if left_val % right_val != 0: raise KhwarizmiRuntimeError(f"Cannot simplify: Division {left_val}/{right_val} non-integer for Khwarizmi 'int' type.")
-            return left_val // right_val
-    elif isinstance(node, UnOpNode):
-        if node.value == '-':
-            operand_val = simplify_arithmetic_ast(node.children[0], symbol_table)
-            return -operand_val
-        else: raise KhwarizmiRuntimeError(f"Cannot simplify: Non-arithmetic unary op '{node.value}'.")
-    else: raise KhwarizmiRuntimeError(f"Cannot simplify: Encountered non-arithmetic AST node type '{type(node).__name__}'.")
+    """
+    The text show() and print() display for an expression: BinOps fully
+    parenthesized, 'eq' variables replaced by their bodies. The pieces are
+    emitted left to right from an explicit stack and joined once, so the cost is
+    linear in the output whatever the depth. An 'eq' whose body (transitively)
+    mentions itself would expand forever and is reported instead.
+    """
+    parts: List[str] = []; stack: List[Any] = [node]; expanding: Set[str] = set()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str): parts.append(node); continue
+        if isinstance(node, tuple): expanding.discard(node[0]); continue # end of an 'eq' expansion
+        if not isinstance(node, Node):
+            parts.append(str(node).lower() if isinstance(node, bool) else str(node)); continue
+        if isinstance(node, IdentifierNode):
+            try:
+                value, type_str = symbol_table.get_var(node.value)
+                if value is UNASSIGNED: # <<< POINT 2: Correctly print name if UNASSIGNED
+                    parts.append(node.value)
+                elif type_str == EQ_TYPE:
+                    if node.value in expanding: raise KhwarizmiRuntimeError(f"Equation '{node.value}' is defined in terms of itself.")
+                    expanding.add(node.value); stack += ((node.value,), value)
+                elif type_str == BOOL_TYPE: parts.append(str(value).lower())
+                elif not isinstance(value, Node): parts.append(str(value))
+                else: parts.append(node.value) # Fallback if an AST node was stored for a non-eq var
+            except KeyError: parts.append(node.value) # Free symbolic variable (not in symbol_table at all)
+        elif isinstance(node, IntLiteralNode): parts.append(str(node.value))
+        elif isinstance(node, BoolLiteralNode): parts.append(str(node.value).lower())
+        elif isinstance(node, BinOpNode): parts.append("("); stack += (")", node.right, f" {node.value} ", node.left)
+        elif isinstance(node, UnOpNode):
+            parts.append(node.value)
+            if isinstance(node.operand, (IntLiteralNode, IdentifierNode)): stack.append(node.operand)
+            else: parts.append("("); stack += (")", node.operand)
+        elif isinstance(node, EquationNode): stack.append(node.symbolic_expression)
+        else:
+            val_attr = node.value if hasattr(node, 'value') else type(node).__name__
+            parts.append(f"<AST:{type(node).__name__}:{val_attr}>")
+    return "".join(parts)
+
+def simplify_arithmetic_ast(root: Node, symbol_table: SymbolTable) -> int:
+    results: List[int] = []; stack: List[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if node is BUILD:
+            node = stack.pop()
+            if isinstance(node, UnOpNode): results[-1] = -results[-1]; continue
+            right_val = results.pop(); left_val = results.pop()
+            if node.value == '+': results.append(left_val + right_val)
+            elif node.value == '-': results.append(left_val - right_val)
+            elif node.value == '*': results.append(left_val * right_val)
+            else:
+                if right_val == 0: raise ZeroDivisionError("Khwarizmi: Division by zero during simplification.")
+                if left_val % right_val != 0: raise KhwarizmiRuntimeError(f"Cannot simplify: Division {left_val}/{right_val} non-integer for Khwarizmi 'int' type.")
+                results.append(left_val // right_val)
+        elif not isinstance(node, Node): raise KhwarizmiRuntimeError(f"Cannot simplify non-Node type: {type(node)}")
+        elif isinstance(node, IntLiteralNode): results.append(node.value)
+        elif isinstance(node, IdentifierNode):
+            try:
+                value, type_str = symbol_table.get_var(node.value)
+                if value is UNASSIGNED: # <<< POINT 3: Error if UNASSIGNED during simplification
+                    raise KhwarizmiRuntimeError(f"Cannot simplify: Variable '{node.value}' is unassigned.")
+                if type_str == INT_TYPE:
+                    if not isinstance(value, int): raise KhwarizmiRuntimeError(f"Var '{node.value}' is 'int' but not int value: {value}")
+                    results.append(value)
+                else: raise KhwarizmiRuntimeError(f"Cannot simplify: Var '{node.value}' is '{type_name(type_str)}', not 'int'.")
+            except KeyError: raise KhwarizmiRuntimeError(f"Cannot simplify: Symbolic var '{node.value}' has no value in this context.")
+        elif isinstance(node, BinOpNode):
+            if node.value not in ['+', '-', '*', '/']: raise KhwarizmiRuntimeError(f"Cannot simplify: Non-arithmetic op '{node.value}'.")
+            stack += (node, BUILD, node.right, node.left)
+        elif isinstance(node, UnOpNode):
+            if node.value == '-': stack += (node, BUILD, node.operand)
+            else: raise KhwarizmiRuntimeError(f"Cannot simplify: Non-arithmetic unary op '{node.value}'.")
+        else: raise KhwarizmiRuntimeError(f"Cannot simplify: Encountered non-arithmetic AST node type '{type(node).__name__}'.")
+    return results[0]
 
 @dataclass
 class TermAnalysisResult: # As defined before
-    coeff_sum: int = 0; const_sum: int = 0; is_linear: bool = True
+    coeff_sum: Number = 0; const_sum: Number = 0; is_linear: bool = True
     other_free_vars: Set[str] = field(default_factory=set)
 
-def collect_terms_linear(node: Node, target_var_name: str, eval_scope: SymbolTable) -> TermAnalysisResult:
-    res = TermAnalysisResult()
-    if isinstance(node, IntLiteralNode): res.const_sum = node.value; return res
-    elif isinstance(node, IdentifierNode):
-        if node.value == target_var_name: res.coeff_sum = 1
-        else:
+def collect_terms_linear(root: Node, target_var_name: str, eval_scope: SymbolTable) -> TermAnalysisResult:
+    """
+    coeff * target + const for an equation side, evaluated bottom-up from an
+    explicit stack of per-node (coeff, const, is_linear) results. Every node's
+    free variables end up in its parent's, so they are gathered in one set.
+    Division by a constant is exact, as in LinearForm: one that does not come
+    out even gives Fraction coefficients instead of a non-linear result.
+    """
+    res = TermAnalysisResult(); free = res.other_free_vars
+    results: List[Tuple[Number, Number, bool]] = []; stack: List[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if node is BUILD:
+            node = stack.pop()
+            if isinstance(node, UnOpNode):
+                coeff, const, is_linear = results[-1]; results[-1] = (-coeff, -const, is_linear); continue
+            right_coeff, right_const, right_linear = results.pop(); left_coeff, left_const, left_linear = results.pop()
+            op = node.value; coeff = const = 0; is_linear = left_linear and right_linear
+            if not is_linear: pass
+            elif op == '+': coeff = left_coeff + right_coeff; const = left_const + right_const
+            elif op == '-': coeff = left_coeff - right_coeff; const = left_const - right_const
+            elif op == '*':
+                if left_coeff != 0 and right_coeff != 0: is_linear = False
+                elif left_coeff != 0: coeff = left_coeff * right_const; const = left_const * right_const
+                elif right_coeff != 0: coeff = right_coeff * left_const; const = right_const * left_const
+                else: const = left_const * right_const
+            elif op == '/':
+                if right_coeff != 0: is_linear = False
+                else:
+                    if right_const == 0: raise ZeroDivisionError("Khwarizmi: Division by zero constant in symbolic term collection.")
+                    coeff = exact_quotient(left_coeff, right_const); const = exact_quotient(left_const, right_const)
+            else: is_linear = False; free.update(node.identifiers() - {target_var_name})
+            results.append((coeff, const, is_linear))
+        elif isinstance(node, IntLiteralNode): results.append((0, node.value, True))
+        elif isinstance(node, IdentifierNode):
+            if node.value == target_var_name: results.append((1, 0, True)); continue
             try:
                 val, type_str = eval_scope.get_var(node.value)
                 if val is UNASSIGNED: # <<< POINT 4: Add to other_free_vars if UNASSIGNED
-                    res.is_linear = True # Still linear, but this var is free
-                    res.other_free_vars.add(node.value)
-                elif type_str == "int": res.const_sum = val
-                else: res.is_linear = False; res.other_free_vars.add(node.value)
+                    results.append((0, 0, True)); free.add(node.value) # Still linear, but this var is free
+                elif type_str == INT_TYPE: results.append((0, val, True))
+                else: results.append((0, 0, False)); free.add(node.value)
             except KeyError: # Undeclared in eval_scope means it's free for this analysis
-                res.is_linear = True 
-                res.other_free_vars.add(node.value)
-        return res
-    # ... (rest of collect_terms_linear as in khwarizmi_ops_py_v8_collect_terms) ...
-    elif isinstance(node, UnOpNode):
-        if node.value == '-':
-            op_an = collect_terms_linear(node.children[0], target_var_name, eval_scope)
-            res.coeff_sum = -op_an.coeff_sum; res.const_sum = -op_an.const_sum
-            res.is_linear = op_an.is_linear; res.other_free_vars.update(op_an.other_free_vars)
-        else: res.is_linear = False; res.other_free_vars.update(node.collect_identifiers() - {target_var_name})
-        return res
-    elif isinstance(node, BinOpNode):
-        op = node.value
-        left_an = collect_terms_linear(node.children[0], target_var_name, eval_scope)
-        right_an = collect_terms_linear(node.children[1], target_var_name, eval_scope)
-        res.is_linear = left_an.is_linear and right_an.is_linear
-        res.other_free_vars.update(left_an.other_free_vars); res.other_free_vars.update(right_an.other_free_vars)
-        if not res.is_linear: return res
-        if op == '+':
-            res.coeff_sum = left_an.coeff_sum + right_an.coeff_sum; res.const_sum = left_an.const_sum + right_an.const_sum
-        elif op == '-':
-            res.coeff_sum = left_an.coeff_sum - right_an.coeff_sum; res.const_sum = left_an.const_sum - right_an.const_sum
-        elif op == '*':
-            if left_an.coeff_sum != 0 and right_an.coeff_sum != 0: res.is_linear = False
-            elif left_an.coeff_sum != 0:
-                if right_an.coeff_sum != 0: res.is_linear = False
-                else: res.coeff_sum = left_an.coeff_sum * right_an.const_sum; res.const_sum = left_an.const_sum * right_an.const_sum
-            elif right_an.coeff_sum != 0:
-                if left_an.coeff_sum != 0: res.is_linear = False
-                else: res.coeff_sum = right_an.coeff_sum * left_an.const_sum; res.const_sum = right_an.const_sum * left_an.const_sum
-            else: res.const_sum = left_an.const_sum * right_an.const_sum
-        elif op == '/':
-            if right_an.coeff_sum != 0: res.is_linear = False
-            else:
-                if right_an.const_sum == 0: raise ZeroDivisionError("Khwarizmi: Division by zero constant in symbolic term collection.")
-                if (left_an.coeff_sum % right_an.const_sum != 0) or (left_an.const_sum % right_an.const_sum != 0): res.is_linear = False
-                else: res.coeff_sum = left_an.coeff_sum // right_an.const_sum; res.const_sum = left_an.const_sum // right_an.const_sum
-        else: res.is_linear = False; res.other_free_vars.update(node.collect_identifiers() - {target_var_name})
-        return res
-    else:
-        res.is_linear = False; res.other_free_vars.update(node.collect_identifiers() - {target_var_name})
-        return res
+                results.append((0, 0, True)); free.add(node.value)
+        elif isinstance(node, UnOpNode) and node.value == '-': stack += (node, BUILD, node.operand)
+        elif isinstance(node, BinOpNode): stack += (node, BUILD, node.right, node.left)
+        else: results.append((0, 0, False)); free.update(node.identifiers() - {target_var_name})
+    res.coeff_sum, res.const_sum, res.is_linear = results[0]
+    return res
+
+NOT_LINEAR_FORM = LinearForm() # cached in place of a form for expressions linear_form_of cannot express
+
+def build_linear_form(root: Node) -> Optional[LinearForm]:
+    """
+    LinearForm of an expression, or None if it has a node a form cannot express.
+    Built bottom-up from an explicit stack; each partial form belongs to the one
+    node being built from it, so sums are accumulated in place.
+    """
+    results: List[LinearForm] = []; stack: List[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if node is BUILD:
+            node = stack.pop()
+            if isinstance(node, UnOpNode): results[-1] = results[-1].scaled(-1); continue
+            right = results.pop(); left = results.pop()
+            if node.value == '+': results.append(left.add(right))
+            elif node.value == '-': results.append(left.add(right, -1))
+            elif node.value == '*': results.append(multiply(left, right))
+            else: results.append(divide_exactly(left, right))
+        elif isinstance(node, IntLiteralNode): results.append(LinearForm(const=node.value))
+        elif isinstance(node, IdentifierNode): results.append(LinearForm({node.value: 1}))
+        elif isinstance(node, UnOpNode) and node.value == '-': stack += (node, BUILD, node.operand)
+        elif isinstance(node, BinOpNode) and node.value in ['+', '-', '*', '/']: stack += (node, BUILD, node.right, node.left)
+        else: return None # bool literals, comparisons, '!': left to collect_terms_linear
+    return results[0]
+
+def linear_form_of(equation_ast: Node) -> Optional[LinearForm]:
+    """
+    LinearForm of an 'eq' body, or None if it uses operators outside + - * / and
+    unary minus. Built once and kept on the AST node: assigning an 'eq' variable
+    stores a different node, which is what invalidates the cached form.
+    """
+    form = equation_ast._linear_form
+    if form is None: form = equation_ast._linear_form = build_linear_form(equation_ast) or NOT_LINEAR_FORM
+    return None if form is NOT_LINEAR_FORM else form
+
+def form_values(form: LinearForm, target_var_name: str, substitutions: Dict[str, int], eval_scope: SymbolTable) -> Tuple[Dict[str, Any], Set[str]]:
+    """The value map LinearForm.evaluate takes for the form's names, and the names left free (or non-int)."""
+    values: Dict[str, Any] = {}; other_free_vars: Set[str] = set()
+    for name in form.names():
+        if name in substitutions: values[name] = substitutions[name]
+        elif name == target_var_name: values[name] = TARGET
+        else:
+            try:
+                val, type_str = eval_scope.get_var(name)
+                if val is UNASSIGNED: values[name] = FREE
+                elif type_str == INT_TYPE: values[name] = val
+                else: values[name] = NONLINEAR
+            except KeyError: values[name] = FREE
+            if values[name] is FREE or values[name] is NONLINEAR: other_free_vars.add(name)
+    return values, other_free_vars
+
+def collect_terms_from_form(form: LinearForm, target_value: int, target_var_name: str, substitutions: Dict[str, int], eval_scope: SymbolTable) -> TermAnalysisResult:
+    """
+    collect_terms_linear(substitute_ast(eq - target_value, substitutions), ...)
+    computed on the equation's LinearForm, scaled to int coefficients.
+    """
+    res = TermAnalysisResult(); integral, denominator = form.integral()
+    values, res.other_free_vars = form_values(integral, target_var_name, substitutions, eval_scope)
+    coeff_sum, const_sum, res.is_linear = integral.evaluate(values)
+    res.coeff_sum = exact_quotient(coeff_sum, denominator); res.const_sum = exact_quotient(const_sum, denominator) - target_value
+    return res
+
+def report_runtime_error(e: Exception) -> None:
+    """Prints a runtime error the way every Khwarizmi engine reports it."""
+    if isinstance(e, KhwarizmiRuntimeError): write_line(f"Runtime Error: {e}")
+    elif isinstance(e, KeyError): write_line(f"Runtime Error (NameError): Variable '{e.args[0]}' not found.")
+    elif isinstance(e, TypeError): write_line(f"Runtime Error (TypeError): {e}")
+    elif isinstance(e, ZeroDivisionError): write_line("Runtime Error: Division by zero.")
+    else: write_line(f"Unexpected Runtime Error: {type(e).__name__} - {e}")
+
+def integer_divide(left_val: int, right_val: int) -> int:
+    if right_val == 0: raise ZeroDivisionError("Khwarizmi: Division by zero.")
+    return left_val // right_val
+
+# operator -> {operand type: (function, result type)} for every well-typed concrete
+# operation; both operands must have that type
+BINARY_OPERATIONS: Dict[str, Dict[ValueType, Tuple[Any, ValueType]]] = {
+    "+": {INT_TYPE: (operator.add, INT_TYPE)}, "-": {INT_TYPE: (operator.sub, INT_TYPE)},
+    "*": {INT_TYPE: (operator.mul, INT_TYPE)}, "/": {INT_TYPE: (integer_divide, INT_TYPE)},
+    "&&": {BOOL_TYPE: (lambda a, b: a and b, BOOL_TYPE)}, "||": {BOOL_TYPE: (lambda a, b: a or b, BOOL_TYPE)},
+    "==": {INT_TYPE: (operator.eq, BOOL_TYPE), BOOL_TYPE: (operator.eq, BOOL_TYPE)},
+    "!=": {INT_TYPE: (operator.ne, BOOL_TYPE), BOOL_TYPE: (operator.ne, BOOL_TYPE)},
+    "<": {INT_TYPE: (operator.lt, BOOL_TYPE)}, ">": {INT_TYPE: (operator.gt, BOOL_TYPE)},
+    "<=": {INT_TYPE: (operator.le, BOOL_TYPE)}, ">=": {INT_TYPE: (operator.ge, BOOL_TYPE)},
+}
+
+def apply_binary_operator(op: str, left_val: Any, left_type: ValueType, right_val: Any, right_type: ValueType) -> Tuple[Any, ValueType]:
+    """Applies a binary operator to two concrete (non-symbolic) operands."""
+    if left_type == right_type and op in BINARY_OPERATIONS:
+        operation = BINARY_OPERATIONS[op].get(left_type)
+        if operation is not None: return operation[0](left_val, right_val), operation[1]
+    if op in ['+', '-', '*', '/']: raise KhwarizmiRuntimeError(f"Arithmetic '{op}' needs 'int's, got '{type_name(left_type)}', '{type_name(right_type)}'.")
+    if op in ["&&", "||"]: raise KhwarizmiRuntimeError(f"Logical '{op}' needs 'bool's, got '{type_name(left_type)}', '{type_name(right_type)}'.")
+    if op in ["==", "!=", "<", ">", "<=", ">="]: raise KhwarizmiRuntimeError(f"Comparison '{op}' needs compatible types, got '{type_name(left_type)}', '{type_name(right_type)}'.")
+    raise KhwarizmiRuntimeError(f"Unknown binary operator: {op}")
+
+# operator -> {operand type: (function, result type)}, like BINARY_OPERATIONS
+UNARY_OPERATIONS: Dict[str, Dict[ValueType, Tuple[Any, ValueType]]] = {
+    "-": {INT_TYPE: (operator.neg, INT_TYPE)}, "!": {BOOL_TYPE: (operator.not_, BOOL_TYPE)},
+}
+
+def apply_unary_operator(op: str, val: Any, type_str: ValueType) -> Tuple[Any, ValueType]:
+    """Applies a unary operator to a concrete (non-symbolic) operand."""
+    operation = UNARY_OPERATIONS[op].get(type_str) if op in UNARY_OPERATIONS else None
+    if operation is not None: return operation[0](val), operation[1]
+    if op == '-': raise KhwarizmiRuntimeError(f"Unary minus needs 'int', got '{type_name(type_str)}'.")
+    if op == '!': raise KhwarizmiRuntimeError(f"Logical NOT needs 'bool', got '{type_name(type_str)}'.")
+    raise KhwarizmiRuntimeError(f"Unknown unary operator: {op}")
+
+def read_input_int() -> int:
+    """Reads the next integer from the current input source (stdin by default, see classes/input_source.py)."""
+    try: return read_int()
+    except EOFError: raise KhwarizmiRuntimeError("EOF reached while expecting input.")
+
+def format_print_args(evaluated_args: List[Tuple[Any, ValueType]], symbol_table: SymbolTable) -> str:
+    """Builds the line written by print() from its evaluated (value, type) arguments."""
+    print_values = []
+    for val, type_str in evaluated_args:
+        if type_str == BOOL_TYPE: print_values.append(str(val).lower())
+        elif type_str == EQ_REPR_TYPE: print_values.append(f"<Equation: {ast_node_to_string(val, symbol_table)} >")
+        elif val is UNASSIGNED: print_values.append("<unassigned>") # Print unassigned int/bool
+        else: print_values.append(str(val))
+    return " ".join(print_values)
 
 # --- AST Node Classes ---
 
-class ProgramNode(Node):
+class ProgramNode(CompositeNode):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable):
-        try: return self.children[0].evaluate(symbol_table)
-        except KhwarizmiRuntimeError as e: print(f"Runtime Error: {e}")
-        except KeyError as e: print(f"Runtime Error (NameError): Variable '{e.args[0]}' not found.")
-        except TypeError as e: print(f"Runtime Error (TypeError): {e}")
-        except ZeroDivisionError: print("Runtime Error: Division by zero.")
-        except Exception as e: print(f"Unexpected Runtime Error: {type(e).__name__} - {e}")
-
-class BlockNode(Node):
+        block = self.children[0]
+        # A resolved program keeps its variables in Frames, as in the VM; an unresolved one in SymbolTables.
+        scope = symbol_table if block.layout is None else Frame(block.layout, parent=symbol_table)
+        try: return block.evaluate(scope)
+        except Exception as e: report_runtime_error(e)
+        finally: flush_output()
+
+class BlockNode(CompositeNode):
+    __slots__ = ("layout", "_declares_variables", "_pooled_scope")
+    recycle_scopes = True # Class-wide switch, lets benchmarks compare against a fresh scope per entry
+    def __init__(self, value: Any, children: List[Node] = None):
+        super().__init__(value, children); self.layout = None # ScopeLayout, set by the Resolver
+        self._declares_variables = None; self._pooled_scope = None
     def evaluate(self, symbol_table: SymbolTable):
         last_stmt_val = (None, "void"); 
         for stmt_node in self.children: stmt_node.evaluate(symbol_table)
         return last_stmt_val
+    def declares_variables(self) -> bool:
+        """True if a statement directly in this block is a declaration (nested blocks have their own scope)."""
+        if self._declares_variables is None: self._declares_variables = any(isinstance(stmt, VarDecNode) for stmt in self.children)
+        return self._declares_variables
+    def enter_scope(self, symbol_table: SymbolTable) -> SymbolTable:
+        """
+        Scope for one execution of this nested block. A block that declares nothing would
+        only get an empty scope, so it runs directly in the enclosing one. Otherwise a
+        pooled scope is cleared and re-parented: a block cannot be re-entered while it is
+        running, and nothing keeps a reference to its scope once it finishes. The scope is
+        a Frame of the block's layout once the Resolver has run, else a SymbolTable.
+        """
+        if self.layout is not None:
+            if not BlockNode.recycle_scopes: return Frame(self.layout, parent=symbol_table)
+            scope = self._pooled_scope
+            if scope is None: scope = self._pooled_scope = Frame(self.layout, parent=symbol_table)
+            else: scope.reset(symbol_table)
+            return scope
+        if not BlockNode.recycle_scopes: return SymbolTable(parent=symbol_table)
+        if not self.declares_variables(): return symbol_table
+        scope = self._pooled_scope
+        if scope is None: scope = self._pooled_scope = SymbolTable(parent=symbol_table)
+        else: scope.symbols.clear(); scope.parent = symbol_table
+        return scope
 
 class TypeNode(Node):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable): return self.value
-    def collect_identifiers(self) -> Set[str]: return set()
+
+class StatementNode(CompositeNode):
+    """A statement kept as a list of sub-nodes; position is the (line, column) of its first token, set by the parser."""
+    __slots__ = ("position",)
+    def __init__(self, value: Any, children: List[Any] = None):
+        super().__init__(value, children); self.position = None
 
 class VarDecNode(Node):
-    def __init__(self, type_name_str: str, var_name: str, init_expression: Optional[Node] = None):
-        super().__init__(value=var_name); self.type_name_str = type_name_str; self.var_name = var_name
-        self.init_expression = init_expression; self.children = [self.init_expression] if self.init_expression else []
+    __slots__ = ("type_name_str", "init_expression", "slot", "position", "typed")
+    def __init__(self, type_name_str: ValueType, var_name: str, init_expression: Optional[Node] = None):
+        super().__init__(value=var_name); self.type_name_str = type_name_str
+        self.init_expression = init_expression; self.slot = None # Slot in the enclosing block's ScopeLayout, set by the Resolver
+        self.position = None; self.typed = False # typed: the TypeChecker proved the initializer has the declared type
+    @property
+    def var_name(self) -> str: return self.value
+    @property
+    def children(self) -> Tuple[Node, ...]: return (self.init_expression,) if self.init_expression else ()
     def evaluate(self, symbol_table: SymbolTable):
-        if self.type_name_str == "eq":
+        if self.slot is not None: return self.declare(symbol_table)
+        if self.type_name_str == EQ_TYPE:
             if self.init_expression: symbol_table.create_var(self.var_name, self.type_name_str, self.init_expression)
             else: symbol_table.create_var(self.var_name, self.type_name_str, None) # Store None if eq x;
+        elif self.typed: symbol_table.create_var(self.var_name, self.type_name_str, self.init_expression.evaluate(symbol_table)[0])
         elif self.init_expression:
             init_val, init_type = self.init_expression.evaluate(symbol_table)
             # If init_val itself is an AST node (e.g. from a symbolic expression that became eq_repr)
             # and we are declaring an int/bool, this is a type error.
-            if isinstance(init_val, Node) and init_type == "eq_repr":
+            if isinstance(init_val, Node) and init_type == EQ_REPR_TYPE:
                  raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{self.var_name}'.")
 
-            if self.type_name_str == "int" and init_type != "int": raise KhwarizmiRuntimeError(f"Type mismatch for '{self.var_name}'. Expected 'int', got '{init_type}'.")
-            if self.type_name_str == "bool" and init_type != "bool": raise KhwarizmiRuntimeError(f"Type mismatch for '{self.var_name}'. Expected 'bool', got '{init_type}'.")
+            if self.type_name_str == INT_TYPE and init_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{self.var_name}'. Expected 'int', got '{type_name(init_type)}'.")
+            if self.type_name_str == BOOL_TYPE and init_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{self.var_name}'. Expected 'bool', got '{type_name(init_type)}'.")
             symbol_table.create_var(self.var_name, self.type_name_str, init_val)
         else: # No initializer, SymbolTable.create_var will use UNASSIGNED for int/bool
             symbol_table.create_var(self.var_name, self.type_name_str, None) # Pass None, ST handles UNASSIGNED
         return None, "void"
-    def collect_identifiers(self) -> Set[str]:
-        ids: Set[str] = set(); 
-        if self.init_expression and isinstance(self.init_expression, Node): ids.update(self.init_expression.collect_identifiers())
-        return ids
+    def declare(self, frame: Frame):
+        """evaluate for a resolved declaration: frame is its block's Frame and the variable goes in its slot."""
+        if self.type_name_str == EQ_TYPE or not self.init_expression: frame.declare(self.slot, self.var_name, self.type_name_str, self.init_expression)
+        elif self.typed: frame.declare(self.slot, self.var_name, self.type_name_str, self.init_expression.evaluate(frame)[0])
+        else:
+            init_val, init_type = self.init_expression.evaluate(frame)
+            if isinstance(init_val, Node) and init_type == EQ_REPR_TYPE:
+                 raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{self.var_name}'.")
+            if init_type != self.type_name_str: raise KhwarizmiRuntimeError(f"Type mismatch for '{self.var_name}'. Expected '{type_name(self.type_name_str)}', got '{type_name(init_type)}'.")
+            frame.declare(self.slot, self.var_name, self.type_name_str, init_val)
+        return None, "void"
 
-class AssignmentNode(Node):
+class AssignmentNode(StatementNode):
+    __slots__ = ("typed",)
+    def __init__(self, value: Any, children: List[Any] = None):
+        super().__init__(value, children); self.typed = False # the TypeChecker proved the value has the target's declared type
     def evaluate(self, symbol_table: SymbolTable):
+        target = self.children[0]
+        if target.binding is not None: return self.assign_slot(symbol_table, target)
+        if self.typed:
+            new_value = self.children[1].evaluate(symbol_table)[0]
+            symbol_table.store(target.value, new_value); return new_value, target.declared_type
         var_name = self.children[0].value; _ , declared_type = symbol_table.get_var(var_name)
-        if declared_type == "eq":
+        if declared_type == EQ_TYPE:
             # RHS for 'eq' assignment is the AST itself, not its evaluated value
             new_equation_ast = self.children[1] 
-            symbol_table.set_var(var_name, (new_equation_ast, "eq"))
-            return new_equation_ast, "eq_repr"
+            symbol_table.set_var(var_name, (new_equation_ast, EQ_TYPE))
+            return new_equation_ast, EQ_REPR_TYPE
         else:
             new_value, new_type = self.children[1].evaluate(symbol_table)
-            if isinstance(new_value, Node) and new_type == "eq_repr":
+            if isinstance(new_value, Node) and new_type == EQ_REPR_TYPE:
                  raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{var_name}'.")
-            if declared_type == "int" and new_type != "int": raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'int', got '{new_type}'.")
-            if declared_type == "bool" and new_type != "bool": raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'bool', got '{new_type}'.")
+            if declared_type == INT_TYPE and new_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'int', got '{type_name(new_type)}'.")
+            if declared_type == BOOL_TYPE and new_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{var_name}'. Expected 'bool', got '{type_name(new_type)}'.")
             symbol_table.set_var(var_name, (new_value, declared_type)); return new_value, declared_type
-    def collect_identifiers(self) -> Set[str]:
-        ids: Set[str] = set()
-        if isinstance(self.children[0], Node): ids.update(self.children[0].collect_identifiers())
-        if len(self.children) > 1 and isinstance(self.children[1], Node): ids.update(self.children[1].collect_identifiers())
-        return ids
+    def assign_slot(self, frame: Frame, target: "IdentifierNode"):
+        """evaluate for a resolved target: the value goes straight into its (depth, slot)."""
+        depth, slot = target.binding; declared_type = target.declared_type
+        if declared_type == EQ_TYPE:
+            frame.display[depth][slot] = self.children[1] # RHS for 'eq' assignment is the AST itself
+            return self.children[1], EQ_REPR_TYPE
+        new_value, new_type = self.children[1].evaluate(frame)
+        if not self.typed and new_type != declared_type:
+            if isinstance(new_value, Node) and new_type == EQ_REPR_TYPE:
+                 raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{target.value}'.")
+            raise KhwarizmiRuntimeError(f"Type mismatch for '{target.value}'. Expected '{type_name(declared_type)}', got '{type_name(new_type)}'.")
+        frame.display[depth][slot] = new_value; return new_value, declared_type
+
+RECURSION_HEIGHT = 64 # BinOp/UnOp trees up to this height are evaluated recursively, deeper ones by evaluate_expression
+
+def binary_result(node: Node, left_val: Any, left_type: ValueType, right_val: Any, right_type: ValueType) -> Tuple[Any, ValueType]:
+    """BinOpNode.evaluate once both operands are evaluated."""
+    op = node.value
+    # If any part of the binary operation is symbolic, the whole operation becomes symbolic
+    if left_type == EQ_REPR_TYPE or right_type == EQ_REPR_TYPE:
+        # Exception: for '==' or '!=' comparisons, if one side is eq_repr and other is concrete int/bool,
+        # the comparison itself is symbolic (e.g., myEq == 0)
+        if op in ["==", "!="]:
+            # Ensure the non-eq_repr side is int or bool if it's concrete
+            if left_type != EQ_REPR_TYPE and left_type not in [INT_TYPE, BOOL_TYPE]:
+                raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{type_name(left_type)}' using '{op}'.")
+            if right_type != EQ_REPR_TYPE and right_type not in [INT_TYPE, BOOL_TYPE]:
+                raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{type_name(right_type)}' using '{op}'.")
+        # For other ops like +, -, *, /, &&, ||, if one side is symbolic, the result is symbolic
+        return node, EQ_REPR_TYPE
+    # Both operands are concrete, proceed with normal evaluation
+    return apply_binary_operator(op, left_val, left_type, right_val, right_type)
+
+def unary_result(node: Node, val: Any, type_str: ValueType) -> Tuple[Any, ValueType]:
+    """UnOpNode.evaluate once the operand is evaluated."""
+    if type_str == EQ_REPR_TYPE: return node, EQ_REPR_TYPE # If operand is symbolic, result is symbolic
+    return apply_unary_operator(node.value, val, type_str)
+
+def evaluate_expression(root: Node, symbol_table: SymbolTable) -> Tuple[Any, ValueType]:
+    """
+    Evaluation of a BinOp/UnOp tree too deep to recurse into: operands are
+    evaluated left to right from an explicit stack of (value, type) results.
+    Subtrees of at most RECURSION_HEIGHT evaluate themselves, which is faster.
+    """
+    results: List[Tuple[Any, ValueType]] = []; stack: List[Any] = [root]
+    while stack:
+        node = stack.pop()
+        if node is BUILD:
+            node = stack.pop()
+            if node.__class__ is UnOpNode: results[-1] = unary_result(node, *results[-1])
+            else: right = results.pop(); results[-1] = binary_result(node, *results[-1], *right)
+        elif node.height <= RECURSION_HEIGHT: results.append(node.evaluate(symbol_table))
+        elif node.symbolic: results.append((node, EQ_REPR_TYPE))
+        elif node.__class__ is BinOpNode: stack += (node, BUILD, node.right, node.left)
+        else: stack += (node, BUILD, node.operand)
+    return results[0]
 
 class BinOpNode(Node):
-    def evaluate(self, symbol_table: SymbolTable) -> Tuple[Any, str]:
-        left_child = self.children[0]; right_child = self.children[1]
-        # Evaluate children. If a child is symbolic (e.g. unassigned var), its evaluate will return (AST_Node, "eq_repr")
-        left_val, left_type = left_child.evaluate(symbol_table)
-        right_val, right_type = right_child.evaluate(symbol_table)
-        
-        op = self.value
-
-        # If any part of the binary operation is symbolic, the whole operation becomes symbolic
-        if left_type == "eq_repr" or right_type == "eq_repr":
-            # Exception: for '==' or '!=' comparisons, if one side is eq_repr and other is concrete int/bool,
-            # the comparison itself is symbolic (e.g., myEq == 0)
-            if op in ["==", "!="] and (left_type == "eq_repr" or right_type == "eq_repr"):
-                 # Ensure the non-eq_repr side is int or bool if it's concrete
-                if left_type != "eq_repr" and left_type not in ["int", "bool"]:
-                    raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{left_type}' using '{op}'.")
-                if right_type != "eq_repr" and right_type not in ["int", "bool"]:
-                    raise KhwarizmiRuntimeError(f"Cannot compare symbolic expression with type '{right_type}' using '{op}'.")
-                return self, "eq_repr" # The comparison expression itself is symbolic
-            # For other ops like +, -, *, /, &&, ||, if one side is symbolic, the result is symbolic
-            return self, "eq_repr"
-
-        # Both operands are concrete, proceed with normal evaluation
-        if op in ['+', '-', '*', '/']:
-            if not (left_type == "int" and right_type == "int"): raise KhwarizmiRuntimeError(f"Arithmetic '{op}' needs 'int's, got '{left_type}', '{right_type}'.")
-            if op == '+': return left_val + right_val, "int"
-            if op == '-': return left_val - right_val, "int"
-            if op == '*': return left_val * right_val, "int"
-            if op == '/':
-                if right_val == 0: raise ZeroDivisionError("Khwarizmi: Division by zero.")
-                return left_val // right_val, "int"
-        elif op in ["&&", "||"]:
-            if not (left_type == "bool" and right_type == "bool"): raise KhwarizmiRuntimeError(f"Logical '{op}' needs 'bool's, got '{left_type}', '{right_type}'.")
-            if op == '&&': return left_val and right_val, "bool"
-            if op == '||': return left_val or right_val, "bool"
-        elif op in ["==", "!=", "<", ">", "<=", ">="]:
-            can_compare = (left_type == "int" and right_type == "int") or \
-                          (left_type == "bool" and right_type == "bool" and op in ["==", "!="])
-            if not can_compare: raise KhwarizmiRuntimeError(f"Comparison '{op}' needs compatible types, got '{left_type}', '{right_type}'.")
-            if op == '==': return left_val == right_val, "bool"
-            if op == '!=': return left_val != right_val, "bool"
-            if op == '<': return left_val < right_val, "bool"
-            if op == '>': return left_val > right_val, "bool"
-            if op == '<=': return left_val <= right_val, "bool"
-            if op == '>=': return left_val >= right_val, "bool"
-        else: raise KhwarizmiRuntimeError(f"Unknown binary operator: {op}")
+    __slots__ = ("left", "right", "height", "operation", "symbolic")
+    def __init__(self, value: str, left: Node, right: Node):
+        super().__init__(value); self.left = left; self.right = right
+        self.height = max(left.height, right.height) + 1 # an upper bound once the optimizer has rewritten the operands
+        self.operation = None # (function, result type) once the TypeChecker proved both operands concrete and well-typed
+        self.symbolic = False # the TypeChecker proved the result is always this node and evaluating the operands has no effect
+    @property
+    def children(self) -> Tuple[Node, Node]: return (self.left, self.right)
+    def evaluate(self, symbol_table: SymbolTable) -> Tuple[Any, ValueType]:
+        if self.height > RECURSION_HEIGHT: return evaluate_expression(self, symbol_table)
+        operation = self.operation
+        if operation is not None: return operation[0](self.left.evaluate(symbol_table)[0], self.right.evaluate(symbol_table)[0]), operation[1]
+        if self.symbolic: return self, EQ_REPR_TYPE
+        # Evaluate children. If a child is symbolic (e.g. unassigned var), its evaluate will return (AST_Node, EQ_REPR_TYPE)
+        left_val, left_type = self.left.evaluate(symbol_table)
+        right_val, right_type = self.right.evaluate(symbol_table)
+        if left_type == EQ_REPR_TYPE or right_type == EQ_REPR_TYPE: return binary_result(self, left_val, left_type, right_val, right_type)
+        return apply_binary_operator(self.value, left_val, left_type, right_val, right_type)
 
 
 class UnOpNode(Node):
-    def evaluate(self, symbol_table: SymbolTable) -> Tuple[Any, str]:
-        operand_child = self.children[0]; op = self.value
-        val, type_str = operand_child.evaluate(symbol_table) # Evaluate operand first
-
-        if type_str == "eq_repr": # If operand is symbolic, result is symbolic
-            return self, "eq_repr"
-            
-        if op == '-':
-            if type_str != "int":
-                raise KhwarizmiRuntimeError(f"Unary minus needs 'int', got '{type_str}'.")
-            return -val, "int"
-        
-        elif op == '!':
-            if type_str != "bool":
-                raise KhwarizmiRuntimeError(f"Logical NOT needs 'bool', got '{type_str}'.")
-            return not val, "bool"
-        else: raise KhwarizmiRuntimeError(f"Unknown unary operator: {op}")
+    __slots__ = ("operand", "height", "operation", "symbolic")
+    def __init__(self, value: str, operand: Node):
+        super().__init__(value); self.operand = operand; self.height = operand.height + 1
+        self.operation = None; self.symbolic = False # as in BinOpNode
+    @property
+    def children(self) -> Tuple[Node]: return (self.operand,)
+    def evaluate(self, symbol_table: SymbolTable) -> Tuple[Any, ValueType]:
+        if self.height > RECURSION_HEIGHT: return evaluate_expression(self, symbol_table)
+        if self.operation is not None: return self.operation[0](self.operand.evaluate(symbol_table)[0]), self.operation[1]
+        if self.symbolic: return self, EQ_REPR_TYPE
+        val, type_str = self.operand.evaluate(symbol_table) # Evaluate operand first
+        return unary_result(self, val, type_str)
 
 
 class IntLiteralNode(Node):
-    def evaluate(self, symbol_table: SymbolTable): return self.value, "int"
-    def collect_identifiers(self) -> Set[str]: return set()
+    __slots__ = ()
+    def evaluate(self, symbol_table: SymbolTable): return self.value, INT_TYPE
 
 
 class BoolLiteralNode(Node):
-    def evaluate(self, symbol_table: SymbolTable): return self.value, "bool"
-    def collect_identifiers(self) -> Set[str]: return set()
+    __slots__ = ()
+    def evaluate(self, symbol_table: SymbolTable): return self.value, BOOL_TYPE
 
 
 class IdentifierNode(Node):
+    __slots__ = ("binding", "declared_type", "always_assigned")
+    def __init__(self, value: str):
+        super().__init__(value)
+        self.binding = None; self.declared_type = None; self.always_assigned = False # (depth, slot), declared type and initializer presence, set by the Resolver
     def evaluate(self, symbol_table: SymbolTable):
+        binding = self.binding
+        if binding is not None: # resolved: read the slot in symbol_table's Frame display
+            value = symbol_table.display[binding[0]][binding[1]]
+            if value is UNASSIGNED: return self, EQ_REPR_TYPE
+            if self.declared_type == EQ_TYPE: return value, EQ_REPR_TYPE
+            return value, self.declared_type
         try:
             value, type_str = symbol_table.get_var(self.value)
-            if value is UNASSIGNED: # <<< POINT 1: Correctly return (self, "eq_repr")
-                return self, "eq_repr" 
-            if type_str == "eq": 
-                return value, "eq_repr" # 'value' is the AST of the equation
+            if value is UNASSIGNED: # <<< POINT 1: Correctly return (self, EQ_REPR_TYPE)
+                return self, EQ_REPR_TYPE 
+            if type_str == EQ_TYPE: 
+                return value, EQ_REPR_TYPE # 'value' is the AST of the equation
             return value, type_str 
         except KeyError:
             # If truly undeclared, it's an error unless this evaluate is in a special symbolic context
             # For now, this implies an undeclared variable error if reached.
             # The BinOp/UnOp evaluate methods will catch this KeyError for their children
-            # and then return (self, "eq_repr") if a child was undeclared.
+            # and then return (self, EQ_REPR_TYPE) if a child was undeclared.
             raise KhwarizmiRuntimeError(f"Undeclared identifier '{self.value}' used.")
             # To allow undeclared IDs to be symbolic everywhere:
-            # return self, "eq_repr" 
-    def collect_identifiers(self) -> Set[str]: return {self.value}
+            # return self, EQ_REPR_TYPE 
+    def leaf_identifiers(self) -> FrozenSet[str]: return frozenset((self.value,))
 
 
 class InputNode(Node):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable):
-        while True:
-            try: val_str = input(); return int(val_str), "int"
-            except ValueError: print("Invalid input. Please enter an integer.")
-            except EOFError: raise KhwarizmiRuntimeError("EOF reached while expecting input.")
-    def collect_identifiers(self) -> Set[str]: return set()
+        return read_input_int(), INT_TYPE
 
 
 class EquationNode(Node):
-    def __init__(self, symbolic_expression_node: Node): super().__init__(value="equation_wrapper"); self.symbolic_expression = symbolic_expression_node; self.children = [symbolic_expression_node]
-    def evaluate(self, symbol_table: SymbolTable): return self.symbolic_expression, "eq_repr"
+    __slots__ = ("symbolic_expression",)
+    def __init__(self, symbolic_expression_node: Node): super().__init__(value="equation_wrapper"); self.symbolic_expression = symbolic_expression_node
+    @property
+    def children(self) -> Tuple[Node]: return (self.symbolic_expression,)
+    def evaluate(self, symbol_table: SymbolTable): return self.symbolic_expression, EQ_REPR_TYPE
     def get_symbolic_expr(self) -> Node: return self.symbolic_expression
 
 
-class ArgumentListNode(Node):
-    def evaluate(self, symbol_table: SymbolTable) -> List[Tuple[Any, str]]:
+class ArgumentListNode(CompositeNode):
+    __slots__ = ()
+    def evaluate(self, symbol_table: SymbolTable) -> List[Tuple[Any, ValueType]]:
         evaluated_args = []; 
         for arg_node in self.children: val, type_str = arg_node.evaluate(symbol_table); evaluated_args.append((val, type_str))
         return evaluated_args
     
 
-class PrintCmdNode(Node):
+class PrintCmdNode(StatementNode):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable):
         arg_list_node = self.children[0]; evaluated_args = arg_list_node.evaluate(symbol_table)
-        print_values = []
-        for val, type_str in evaluated_args:
-            if type_str == "bool": print_values.append(str(val).lower())
-            elif type_str == "eq_repr": print_values.append(f"<Equation: {ast_node_to_string(val, symbol_table)} >")
-            elif val is UNASSIGNED: print_values.append("<unassigned>") # Print unassigned int/bool
-            else: print_values.append(str(val))
-        print(" ".join(print_values)); return None, "void"
+        write_line(format_print_args(evaluated_args, symbol_table)); return None, "void"
 
 
-class ShowCmdNode(Node):
+class ShowCmdNode(StatementNode):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable):
         arg_list_node = self.children[0]
         if not arg_list_node.children: raise KhwarizmiRuntimeError("show() command requires at least one argument.")
@@ -380,42 +651,38 @@ class ShowCmdNode(Node):
         # Evaluate the first argument to determine its nature (is it an 'eq' var, a comparison, or other symbolic expr?)
         val_or_ast_of_first_arg, type_of_first_arg = first_arg_node.evaluate(symbol_table)
 
-        if type_of_first_arg == "eq_repr": # This means it's symbolic (an eq var, an unassigned var, or a symbolic BinOp)
+        if type_of_first_arg == EQ_REPR_TYPE: # This means it's symbolic (an eq var, an unassigned var, or a symbolic BinOp)
             effective_ast_to_display = val_or_ast_of_first_arg # This is already the AST node
             if isinstance(first_arg_node, IdentifierNode): # If show(myEq), where myEq is 'eq' or unassigned
                 original_eq_name_for_print = first_arg_node.value
-        # Removed: elif type_of_first_arg == "bool" and isinstance(first_arg_node, BinOpNode) ...
-        # The above "eq_repr" check for BinOpNode should cover comparisons like `myEq == 0` or `x > 5`
-        # because their .evaluate() will return (self, "eq_repr") if they contain symbolic parts.
+        # Removed: elif type_of_first_arg == BOOL_TYPE and isinstance(first_arg_node, BinOpNode) ...
+        # The above EQ_REPR_TYPE check for BinOpNode should cover comparisons like `myEq == 0` or `x > 5`
+        # because their .evaluate() will return (self, EQ_REPR_TYPE) if they contain symbolic parts.
         else: 
             # If the first argument evaluated to a concrete int/bool, it's not what 'show' is for.
-            raise KhwarizmiRuntimeError(f"First argument to show() must resolve to a symbolic equation or expression. Got concrete type '{type_of_first_arg}'.")
+            raise KhwarizmiRuntimeError(f"First argument to show() must resolve to a symbolic equation or expression. Got concrete type '{type_name(type_of_first_arg)}'.")
         
         substitutions_map: Dict[str, int] = {}
         for subst_arg_node in arg_list_node.children[1:]:
-            if not (isinstance(subst_arg_node, BinOpNode) and subst_arg_node.value == "==" and isinstance(subst_arg_node.children[0], IdentifierNode)):
+            if not (isinstance(subst_arg_node, BinOpNode) and subst_arg_node.value == "==" and isinstance(subst_arg_node.left, IdentifierNode)):
                 raise KhwarizmiRuntimeError("Invalid substitution format in show(). Expected 'IDENTIFIER == integer_expression'.")
-            var_to_sub_name = subst_arg_node.children[0].value; val_expr_node = subst_arg_node.children[1]
+            var_to_sub_name = subst_arg_node.left.value; val_expr_node = subst_arg_node.right
             sub_val, sub_type = val_expr_node.evaluate(symbol_table)
-            if sub_type != "int": raise KhwarizmiRuntimeError(f"Substitution value for '{var_to_sub_name}' in show() must be an integer, got {sub_type}.")
+            if sub_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Substitution value for '{var_to_sub_name}' in show() must be an integer, got {type_name(sub_type)}.")
             substitutions_map[var_to_sub_name] = sub_val
         
         ast_after_direct_substitutions = substitute_ast(effective_ast_to_display, substitutions_map, symbol_table)
         
-        potential_free_vars_in_final_ast = ast_after_direct_substitutions.collect_identifiers() if ast_after_direct_substitutions else set()
+        # Cached identifier set: only the nodes substitute_ast rebuilt have to be visited, once.
+        potential_free_vars_in_final_ast = ast_after_direct_substitutions.identifiers() if ast_after_direct_substitutions else frozenset()
         actual_free_vars_for_show = set()
-        
-        # Scope for checking freeness: includes program vars and explicit 'show' substitutions
-        scope_for_freeness_check = SymbolTable(parent=symbol_table)
-        for var_name, val in substitutions_map.items():
-            scope_for_freeness_check.create_var(var_name, "int", val) # Add substitutions
 
         for var_name in potential_free_vars_in_final_ast:
             try:
-                value, _type = scope_for_freeness_check.get_var(var_name) # Check in combined scope
+                value, _type = symbol_table.get_var(var_name) # Substituted names were all replaced, so no need for the substitution scope
                 if value is UNASSIGNED: # <<< POINT 5 (Free Var Counting)
                     actual_free_vars_for_show.add(var_name)
-                elif _type == "eq": # An 'eq' variable is symbolic unless its content is fully resolved elsewhere
+                elif _type == EQ_TYPE: # An 'eq' variable is symbolic unless its content is fully resolved elsewhere
                     # To be truly free, its *content* must contain free vars after considering this scope
                     # For simplicity now, if it's an 'eq' type, and not substituted away, treat its name as a placeholder
                     # A deeper check would be: ast_content = value; if ast_content.collect_identifiers() - scope_for_freeness_check.symbols.keys(): actual_free_vars_for_show.add(var_name)
@@ -426,6 +693,12 @@ class ShowCmdNode(Node):
         
         num_free_vars = len(actual_free_vars_for_show)
         output_string = ""
+
+        # Scope for evaluating and printing: program vars plus the explicit 'show' substitutions,
+        # which 'eq' variables inside the result may still mention
+        scope_for_freeness_check = SymbolTable(parent=symbol_table)
+        for var_name, val in substitutions_map.items():
+            scope_for_freeness_check.create_var(var_name, INT_TYPE, val) # Add substitutions
         
         if num_free_vars > 2:
             raise KhwarizmiRuntimeError("Too many free variables for show(). Please provide more substitutions to reduce to 2D or 1D.")
@@ -442,7 +715,7 @@ class ShowCmdNode(Node):
                 # Or, evaluate in scope_for_freeness_check which has them.
                 result_val, result_type = ast_after_direct_substitutions.evaluate(scope_for_freeness_check) # <<< POINT 6
                 
-                if result_type == "bool":
+                if result_type == BOOL_TYPE:
                     output_string = str(result_val).lower()
                 else: 
                     # This means it didn't evaluate to bool, e.g. if it became `5` due to `show(myEq, all_subs)`
@@ -459,88 +732,203 @@ class ShowCmdNode(Node):
             else: 
                 output_string = equation_str
         
-        print(output_string)
+        write_line(output_string)
         return None, "void"
 
-class SolveCmdNode(Node): # ... (Assume SolveCmdNode is as in khwarizmi_ops_py_v9_solvecmd) ...
+class SolveCmdNode(StatementNode): # ... (Assume SolveCmdNode is as in khwarizmi_ops_py_v9_solvecmd) ...
+    __slots__ = ()
+    use_linear_forms = True # Class-wide switch, lets benchmarks compare against the AST walk
     def evaluate(self, symbol_table: SymbolTable):
         arg_list_node = self.children[0]
         if len(arg_list_node.children) < 2: raise KhwarizmiRuntimeError("solve() needs at least: solve(eqName == int_val, solveForVar).")
+        args = arg_list_node.children; n_equations = 1
+        while n_equations < len(args) and SolveCmdNode.is_equation_arg(args[n_equations], symbol_table): n_equations += 1
+        n_unknowns = 0
+        while n_equations + n_unknowns < len(args) and isinstance(args[n_equations + n_unknowns], IdentifierNode): n_unknowns += 1
+        if n_unknowns == 0 and n_equations < len(args) and isinstance(args[n_equations], BinOpNode) and args[n_equations].value == "==":
+            raise KhwarizmiRuntimeError(f"Argument {n_equations + 1} of solve() must be an equation (eqName == int_val, eqName an 'eq' variable) or the variable to solve for.")
+        substitution_args = args[n_equations + n_unknowns:]
+        range_args = [arg for arg in substitution_args if isinstance(arg, RangeNode)]
+        if range_args:
+            if len(range_args) > 1: raise KhwarizmiRuntimeError("solve() takes at most one range substitution (name in low..high).")
+            if n_equations > 1 or n_unknowns > 1: raise KhwarizmiRuntimeError("Range substitutions in solve() need a single equation and variable.")
+            substitution_args = [arg for arg in substitution_args if arg is not range_args[0]]
+        if n_equations > 1 or n_unknowns > 1: return self.solve_system(args[:n_equations], args[n_equations:n_equations + n_unknowns], substitution_args, symbol_table)
         eq_comparison_node = arg_list_node.children[0]
         if not (isinstance(eq_comparison_node, BinOpNode) and eq_comparison_node.value == "=="): raise KhwarizmiRuntimeError("First arg to solve() must be eqName == int_val.")
-        eq_var_node = eq_comparison_node.children[0] 
-        target_value_node = eq_comparison_node.children[1] 
+        eq_var_node = eq_comparison_node.left 
+        target_value_node = eq_comparison_node.right 
         if not isinstance(eq_var_node, IdentifierNode): raise KhwarizmiRuntimeError("LHS of eq comparison in solve() must be an eq variable.")
         equation_ast_from_st, eq_type = symbol_table.get_var(eq_var_node.value)
-        if eq_type != "eq" or not isinstance(equation_ast_from_st, Node): raise KhwarizmiRuntimeError(f"'{eq_var_node.value}' is not a valid equation variable.")
+        if eq_type != EQ_TYPE or not isinstance(equation_ast_from_st, Node): raise KhwarizmiRuntimeError(f"'{eq_var_node.value}' is not a valid equation variable.")
         target_value, target_type = target_value_node.evaluate(symbol_table)
-        if target_type != "int": raise KhwarizmiRuntimeError("RHS of eq comparison in solve() must be an integer.")
+        if target_type != INT_TYPE: raise KhwarizmiRuntimeError("RHS of eq comparison in solve() must be an integer.")
         var_to_solve_for_node = arg_list_node.children[1]
         if not isinstance(var_to_solve_for_node, IdentifierNode): raise KhwarizmiRuntimeError("Second arg to solve() must be the variable name.")
         solve_for_var_name = var_to_solve_for_node.value
+        substitutions_for_solve = SolveCmdNode.evaluate_substitutions(substitution_args, symbol_table)
+        form = linear_form_of(equation_ast_from_st) if SolveCmdNode.use_linear_forms else None
+        if range_args: return self.solve_range(range_args[0], form, equation_ast_from_st, target_value, solve_for_var_name, substitutions_for_solve, symbol_table)
+        write_line(SolveCmdNode.solve_once(form, equation_ast_from_st, target_value, solve_for_var_name, substitutions_for_solve, symbol_table))
+        return None, "void"
+    @staticmethod
+    def solve_once(form: Optional[LinearForm], equation_ast: Node, target_value: int, solve_for_var_name: str, substitutions_for_solve: Dict[str, int], symbol_table: SymbolTable) -> str:
+        """The line solve() prints for one set of substitutions."""
+        try:
+            if form is not None: analysis_result = collect_terms_from_form(form, target_value, solve_for_var_name, substitutions_for_solve, symbol_table)
+            else: analysis_result = SolveCmdNode.collect_terms_from_ast(equation_ast, target_value, solve_for_var_name, substitutions_for_solve, symbol_table)
+        except KhwarizmiRuntimeError as e: return f"Error during symbolic analysis for solve: {e}"
+        except ZeroDivisionError as e: return f"Error: {e}"
+        analysis_result.other_free_vars.discard(solve_for_var_name)
+        return outcome_message(solve_for_var_name, analysis_result.coeff_sum, analysis_result.const_sum, analysis_result.is_linear, analysis_result.other_free_vars)
+
+    def solve_range(self, range_node: "RangeNode", form: Optional[LinearForm], equation_ast: Node, target_value: int, solve_for_var_name: str, substitutions_for_solve: Dict[str, int], symbol_table: SymbolTable):
+        """
+        solve(eqName == v, x, ..., name in low..high): prints what solve(eqName == v, x, ..., name == i)
+        prints for every i from low to high, in order. Equations with a LinearForm are
+        solved in batches (classes/batch_solve.py), the others one value at a time.
+        """
+        range_name = range_node.children[0].value
+        if range_name in substitutions_for_solve: raise KhwarizmiRuntimeError(f"'{range_name}' is substituted more than once in solve().")
+        low, low_type = range_node.children[1].evaluate(symbol_table)
+        high, high_type = range_node.children[2].evaluate(symbol_table)
+        if low_type != INT_TYPE or high_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Range bounds for '{range_name}' in solve() must be integers.")
+        if form is None:
+            for value in range(low, high + 1): write_line(SolveCmdNode.solve_once(None, equation_ast, target_value, solve_for_var_name, {**substitutions_for_solve, range_name: value}, symbol_table))
+            return None, "void"
+        values, other_free_vars = form_values(form, solve_for_var_name, {**substitutions_for_solve, range_name: low}, symbol_table)
+        other_free_vars.discard(solve_for_var_name)
+        for lines in solve_range(form, values, other_free_vars, target_value, solve_for_var_name, range_name, low, high): write_lines(lines)
+        return None, "void"
+
+    @staticmethod
+    def is_equation_arg(node: Node, symbol_table: SymbolTable) -> bool:
+        """True for `eqName == value` where eqName is an 'eq' variable: another equation of a system."""
+        if not (isinstance(node, BinOpNode) and node.value == "==" and isinstance(node.left, IdentifierNode)): return False
+        try: return symbol_table.get_var(node.left.value)[1] == EQ_TYPE
+        except KeyError: return False
+
+    def solve_system(self, equation_args: List[Node], unknown_args: List[IdentifierNode], substitution_args: List[Node], symbol_table: SymbolTable):
+        """
+        solve(eq1 == v1, eq2 == v2, ..., x, y, ..., name == value, ...): solves the
+        equations simultaneously for the listed variables, exactly (classes/linear_system.py).
+        Prints one `name = value` line per variable for a unique integer solution.
+        """
+        if not unknown_args: raise KhwarizmiRuntimeError("solve() with several equations needs the variables to solve for after them.")
+        equations = []
+        for eq_comparison_node in equation_args:
+            eq_var_node = eq_comparison_node.left
+            equation_ast_from_st, _ = symbol_table.get_var(eq_var_node.value)
+            if not isinstance(equation_ast_from_st, Node): raise KhwarizmiRuntimeError(f"'{eq_var_node.value}' is not a valid equation variable.")
+            target_value, target_type = eq_comparison_node.right.evaluate(symbol_table)
+            if target_type != INT_TYPE: raise KhwarizmiRuntimeError("RHS of eq comparison in solve() must be an integer.")
+            equations.append((eq_var_node.value, equation_ast_from_st, target_value))
+        unknowns = list(dict.fromkeys(node.value for node in unknown_args))
+        substitutions_for_solve = SolveCmdNode.evaluate_substitutions(substitution_args, symbol_table)
+        for name in unknowns:
+            if name in substitutions_for_solve: raise KhwarizmiRuntimeError(f"'{name}' is both solved for and substituted in solve().")
+
+        index = {name: i for i, name in enumerate(unknowns)}; rows = []
+        for eq_name, equation_ast, target_value in equations:
+            form = linear_form_of(equation_ast)
+            if form is None: write_line(f"Error: Equation '{eq_name}' is not linear with respect to {', '.join(unknowns)} after substitutions."); return None, "void"
+            values: Dict[str, Any] = {}; other_free_vars: Set[str] = set()
+            for name in form.names():
+                if name in substitutions_for_solve: values[name] = substitutions_for_solve[name]
+                elif name in index: values[name] = TARGET
+                else:
+                    try:
+                        val, type_str = symbol_table.get_var(name)
+                        values[name] = FREE if val is UNASSIGNED else val if type_str == INT_TYPE else NONLINEAR
+                    except KeyError: values[name] = FREE
+                    if values[name] is FREE: other_free_vars.add(name)
+            try: coeffs, const, is_linear = form.evaluate_vector(values)
+            except ZeroDivisionError as e: write_line(f"Error: {e}"); return None, "void"
+            if not is_linear: write_line(f"Error: Equation '{eq_name}' is not linear with respect to {', '.join(unknowns)} after substitutions."); return None, "void"
+            if other_free_vars: write_line(f"Error: Cannot solve. Equation has other unresolved symbolic variables: {other_free_vars}."); return None, "void"
+            scale = common_denominator([*coeffs.values(), const]) # Bareiss works on int rows: clear Fraction coefficients
+            row = {index[name]: int(c * scale) for name, c in coeffs.items() if c}
+            if target_value - const: row[len(unknowns)] = int((target_value - const) * scale)
+            rows.append(row)
+
+        outcome, solution = solve_linear_system(rows, len(unknowns))
+        if outcome == INFINITE: write_line("Infinite solutions")
+        elif outcome != UNIQUE: write_line("No solution")
+        else:
+            for name, value in zip(unknowns, solution):
+                if value.denominator == 1: write_line(f"{name} = {value.numerator}")
+                else: write_line(f"No integer solution for {name} (result is {value.numerator}/{value.denominator}).")
+        return None, "void"
+
+    @staticmethod
+    def evaluate_substitutions(substitution_args: List[Node], symbol_table: SymbolTable) -> Dict[str, int]:
         substitutions_for_solve: Dict[str, int] = {} 
-        for subst_arg_node in arg_list_node.children[2:]:
-            if isinstance(subst_arg_node, BinOpNode) and subst_arg_node.value == "==" and isinstance(subst_arg_node.children[0], IdentifierNode):
-                var_name = subst_arg_node.children[0].value; val_node = subst_arg_node.children[1]
+        for subst_arg_node in substitution_args:
+            if isinstance(subst_arg_node, BinOpNode) and subst_arg_node.value == "==" and isinstance(subst_arg_node.left, IdentifierNode):
+                var_name = subst_arg_node.left.value; val_node = subst_arg_node.right
                 sub_val, sub_val_type = val_node.evaluate(symbol_table) 
-                if sub_val_type != "int": raise KhwarizmiRuntimeError(f"Substitution for '{var_name}' in solve() must be int, got {sub_val_type}.")
+                if sub_val_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Substitution for '{var_name}' in solve() must be int, got {type_name(sub_val_type)}.")
                 substitutions_for_solve[var_name] = sub_val
             else: raise KhwarizmiRuntimeError("Invalid substitution in solve(): Expected 'IDENTIFIER == integer_value_or_int_var'.")
-        effective_equation_ast = BinOpNode("-", [equation_ast_from_st, IntLiteralNode(target_value)])
-        substituted_eq_ast = substitute_ast(effective_equation_ast, substitutions_for_solve, symbol_table)
-        if substituted_eq_ast is None: print("Error: Equation became null after substitution during solve."); return None, "void"
+        return substitutions_for_solve
+
+    @staticmethod
+    def collect_terms_from_ast(equation_ast: Node, target_value: int, solve_for_var_name: str, substitutions_for_solve: Dict[str, int], symbol_table: SymbolTable) -> TermAnalysisResult:
+        """Term collection by walking a substituted copy of the AST, for equations without a LinearForm."""
+        # Substituting into the stored equation, not a fresh `equation - target` node, lets substitute_ast's memo hit.
+        substituted_eq_ast = BinOpNode("-", substitute_ast(equation_ast, substitutions_for_solve, symbol_table), IntLiteralNode(target_value))
         eval_scope_for_terms = SymbolTable(parent=symbol_table) 
         for var, val in substitutions_for_solve.items(): 
-            if eval_scope_for_terms.is_declared_locally(var): eval_scope_for_terms.set_var(var, (val, "int"))
-            else: eval_scope_for_terms.create_var(var, "int", val)
-        try:
-            analysis_result = collect_terms_linear(substituted_eq_ast, solve_for_var_name, eval_scope_for_terms)
-        except KhwarizmiRuntimeError as e: print(f"Error during symbolic analysis for solve: {e}"); return None, "void"
-        except ZeroDivisionError as e: print(f"Error: {e}"); return None, "void"
-        if not analysis_result.is_linear: print(f"Error: Equation is not linear with respect to '{solve_for_var_name}' after substitutions."); return None, "void"
-        analysis_result.other_free_vars.discard(solve_for_var_name) 
-        if analysis_result.other_free_vars: print(f"Error: Cannot solve. Equation has other unresolved symbolic variables: {analysis_result.other_free_vars}."); return None, "void"
-        coeff = analysis_result.coeff_sum; const = analysis_result.const_sum
-        if coeff == 0:
-            if const == 0: print("Infinite solutions")
-            else: print("No solution")
-        else:
-            if (-const % coeff) != 0: print(f"No integer solution for {solve_for_var_name} (result is {-const}/{coeff}).")
-            else: solution = -const // coeff; print(f"{solve_for_var_name} = {solution}")
-        return None, "void"
+            if eval_scope_for_terms.is_declared_locally(var): eval_scope_for_terms.set_var(var, (val, INT_TYPE))
+            else: eval_scope_for_terms.create_var(var, INT_TYPE, val)
+        return collect_terms_linear(substituted_eq_ast, solve_for_var_name, eval_scope_for_terms)
+
+class RangeNode(CompositeNode):
+    """`name in low..high` among the arguments of solve(); children: IdentifierNode, low, high."""
+    __slots__ = ()
+    def evaluate(self, symbol_table: SymbolTable): raise KhwarizmiRuntimeError("A range (name in low..high) is only allowed as a solve() substitution.")
 
 class IfNode(Node):
+    # condition_message is the error for a non-bool first condition: the Optimizer turns an elif into
+    # the first branch when it drops the branches before it, and the elif keeps its message.
+    __slots__ = ("condition", "if_block", "elif_clauses", "else_block", "position", "condition_message")
     def __init__(self, condition: Node, if_block: BlockNode, elif_clauses: List[Any] = None, else_block: Optional[BlockNode] = None):
         super().__init__(value="if"); self.condition = condition; self.if_block = if_block
-        self.elif_clauses = elif_clauses if elif_clauses else []; self.else_block = else_block
-        self.children = [self.condition, self.if_block] + self.elif_clauses + ([self.else_block] if self.else_block else [])
+        self.elif_clauses = elif_clauses if elif_clauses else []; self.else_block = else_block; self.position = None
+        self.condition_message = "If condition must be boolean."
+    @property
+    def children(self) -> Tuple[Node, ...]: return (self.condition, self.if_block, *self.elif_clauses) + ((self.else_block,) if self.else_block else ())
     def evaluate(self, symbol_table: SymbolTable):
         cond_val, cond_type = self.condition.evaluate(symbol_table)
-        if cond_type != "bool": raise KhwarizmiRuntimeError("If condition must be boolean.")
+        if cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError(self.condition_message)
         executed_block = False
         if cond_val:
-            if_scope = SymbolTable(parent=symbol_table); self.if_block.evaluate(if_scope); executed_block = True
+            self.if_block.evaluate(self.if_block.enter_scope(symbol_table)); executed_block = True
         else:
             for elif_node in self.elif_clauses:
                 elif_cond_val, elif_cond_type = elif_node.condition.evaluate(symbol_table) 
-                if elif_cond_type != "bool": raise KhwarizmiRuntimeError("Elif condition must be boolean.")
+                if elif_cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError("Elif condition must be boolean.")
                 if elif_cond_val:
-                    actual_elif_scope = SymbolTable(parent=symbol_table); elif_node.block.evaluate(actual_elif_scope)
+                    elif_node.block.evaluate(elif_node.block.enter_scope(symbol_table))
                     executed_block = True; break
             if not executed_block and self.else_block:
-                else_scope = SymbolTable(parent=symbol_table); self.else_block.evaluate(else_scope)
+                self.else_block.evaluate(self.else_block.enter_scope(symbol_table))
         return None, "void"
 
 class ElifNode(Node):
+    __slots__ = ("condition", "block", "position")
     def __init__(self, condition: Node, block: BlockNode):
-        super().__init__(value="elif"); self.condition = condition; self.block = block
-        self.children = [self.condition, self.block]
+        super().__init__(value="elif"); self.condition = condition; self.block = block; self.position = None
+    @property
+    def children(self) -> Tuple[Node, Node]: return (self.condition, self.block)
 
-class WhileNode(Node): 
+class WhileNode(StatementNode):
+    __slots__ = ()
     def evaluate(self, symbol_table: SymbolTable):
+        condition, body = self.children
         while True:
-            cond_val, cond_type = self.children[0].evaluate(symbol_table)
-            if cond_type != "bool": raise KhwarizmiRuntimeError("While condition must be boolean.")
+            cond_val, cond_type = condition.evaluate(symbol_table)
+            if cond_type != BOOL_TYPE: raise KhwarizmiRuntimeError("While condition must be boolean.")
             if not cond_val: break
-            while_block_scope = SymbolTable(parent=symbol_table); self.children[1].evaluate(while_block_scope)
+            body.evaluate(body.enter_scope(symbol_table))
         return None, "void"
\ No newline at end of file
@@ -0,0 +1,189 @@
+from classes.ops import *
+from classes.node import Node, postorder
+from classes.resolver import Resolver
+from typing import List, Dict, Optional
+
+class Optimizer:
+    """
+    AST pass run between parsing and execution (tree-walker or VM).
+
+    Rewrites, counted in `stats`:
+      constant_folds   literal-only BinOpNode/UnOpNode subtrees -> one literal
+      identities       x + 0, 0 + x, x - 0, x * 1, 1 * x, x / 1,
+                       b && true, true && b, b || false, false || b  -> x / b
+      double_negations -(-x), !(!b) -> x / b
+      dead_branches    if/elif branches whose condition is a bool literal
+
+    Khwarizmi expressions are symbolic whenever they touch an unassigned or 'eq'
+    variable, and a symbolic value is printed as its AST, so even `x + (2 * 3)`
+    must keep its shape if x may be free. Expressions are therefore only rewritten
+    when static_type proves the whole expression concrete. That also keeps every
+    type error where it was: no rewrite applies to an operand of the wrong type,
+    and a fold that would raise (1 / 0, true + 1) is left for run time. 'eq'
+    bodies and show/solve arguments are never touched.
+    """
+    ARITHMETIC = ("+", "-", "*", "/")
+    COMPARISONS = ("==", "!=", "<", ">", "<=", ">=")
+    LOGICAL = ("&&", "||")
+
+    def __init__(self):
+        self.stats: Dict[str, int] = {"constant_folds": 0, "identities": 0, "double_negations": 0, "dead_branches": 0}
+
+    # --- Static typing ---
+
+    @staticmethod
+    def static_type(root: Node) -> Optional[ValueType]:
+        """'int' or 'bool' if root always evaluates to a concrete value of that type (or raises), else None."""
+        types: List[Optional[ValueType]] = []
+        for node in postorder(root):
+            if isinstance(node, BinOpNode): right_type = types.pop(); types[-1] = Optimizer.binary_static_type(node.value, types[-1], right_type)
+            elif isinstance(node, UnOpNode): types[-1] = Optimizer.unary_static_type(node.value, types[-1])
+            else:
+                del types[len(types) - len(node.children):] # operands of a node static typing knows nothing about
+                types.append(Optimizer.leaf_static_type(node))
+        return types[0]
+
+    @staticmethod
+    def leaf_static_type(node: Node) -> Optional[ValueType]:
+        if isinstance(node, IntLiteralNode) or isinstance(node, InputNode): return INT_TYPE
+        if isinstance(node, BoolLiteralNode): return BOOL_TYPE
+        if isinstance(node, IdentifierNode):
+            if node.binding is not None and node.always_assigned and node.declared_type in (INT_TYPE, BOOL_TYPE): return node.declared_type
+        return None
+
+    @staticmethod
+    def binary_static_type(op: str, left_type: Optional[ValueType], right_type: Optional[ValueType]) -> Optional[ValueType]:
+        if left_type is None: return None
+        if op in Optimizer.ARITHMETIC: return INT_TYPE if left_type == right_type == INT_TYPE else None
+        if op in Optimizer.LOGICAL: return BOOL_TYPE if left_type == right_type == BOOL_TYPE else None
+        if op in ("==", "!="): return BOOL_TYPE if left_type == right_type else None
+        if op in Optimizer.COMPARISONS: return BOOL_TYPE if left_type == right_type == INT_TYPE else None
+        return None
+
+    @staticmethod
+    def unary_static_type(op: str, operand_type: Optional[ValueType]) -> Optional[ValueType]:
+        if op == "-": return INT_TYPE if operand_type == INT_TYPE else None
+        if op == "!": return BOOL_TYPE if operand_type == BOOL_TYPE else None
+        return None
+
+    # --- Statements ---
+
+    def optimize_block(self, block: BlockNode) -> None:
+        statements = []
+        for stmt_node in block.children: statements += self.optimize_statement(stmt_node)
+        block.children = statements
+
+    def optimize_statement(self, node: Node) -> List[Node]:
+        """Returns the statements replacing node: itself, nothing, or the body of a branch that is always taken."""
+        if isinstance(node, VarDecNode):
+            if node.type_name_str != EQ_TYPE and node.init_expression:
+                node.init_expression = self.optimize_root(node.init_expression)
+        elif isinstance(node, AssignmentNode):
+            target = node.children[0]
+            if target.binding is not None and target.declared_type != EQ_TYPE: node.children[1] = self.optimize_root(node.children[1])
+        elif isinstance(node, PrintCmdNode):
+            arg_nodes = node.children[0].children
+            for i, arg_node in enumerate(arg_nodes): arg_nodes[i] = self.optimize_root(arg_node)
+        elif isinstance(node, IfNode):
+            return self.optimize_if(node)
+        elif isinstance(node, WhileNode):
+            node.children[0] = self.optimize_root(node.children[0]); self.optimize_block(node.children[1])
+        return [node]
+
+    def optimize_if(self, node: IfNode) -> List[Node]:
+        branches = [(self.optimize_root(node.condition), node.if_block, node.position, node.condition_message)]
+        branches += [(self.optimize_root(elif_node.condition), elif_node.block, elif_node.position, "Elif condition must be boolean.")
+                     for elif_node in node.elif_clauses]
+        live = []; else_block = node.else_block
+        for condition, block, position, message in branches:
+            if isinstance(condition, BoolLiteralNode):
+                self.stats["dead_branches"] += 1
+                if condition.value: else_block = block; break # always taken: later branches are dead
+                continue # never taken
+            live.append((condition, block, position, message))
+        for _, block, _, _ in live: self.optimize_block(block)
+        if else_block is not None: self.optimize_block(else_block)
+
+        if not live:
+            if else_block is None: return []
+            # Only the else (or an always-true branch) is left. A block that declares nothing runs
+            # in the enclosing scope anyway, so its statements can take the if's place.
+            if not else_block.declares_variables(): return else_block.children
+            live = [(BoolLiteralNode(True), else_block, node.position, node.condition_message)]; else_block = None
+        if len(live) == len(branches) and else_block is node.else_block:
+            node.condition = live[0][0]
+            for elif_node, (condition, _, _, _) in zip(node.elif_clauses, live[1:]): elif_node.condition = condition
+            return [node]
+        (condition, if_block, position, message), elif_branches = live[0], live[1:]
+        rebuilt = IfNode(condition, if_block, [ElifNode(c, b) for c, b, _, _ in elif_branches], else_block)
+        rebuilt.position = position; rebuilt.condition_message = message # an elif promoted to the first branch keeps its message
+        for elif_node, (_, _, elif_position, _) in zip(rebuilt.elif_clauses, elif_branches): elif_node.position = elif_position
+        return [rebuilt]
+
+    # --- Expressions ---
+
+    def optimize_root(self, node: Node) -> Node:
+        """Rewrites a statement-level expression, if it is provably concrete."""
+        if self.static_type(node) is None: return node
+        return self.optimize_expression(node)
+
+    def optimize_expression(self, root: Node) -> Node:
+        """root rewritten bottom-up: each node once its operands are (see static_type for the walk)."""
+        results: List[Node] = []
+        for node in postorder(root):
+            if isinstance(node, BinOpNode):
+                node.right = results.pop(); node.left = results[-1]; results[-1] = self.optimize_binary(node)
+            elif isinstance(node, UnOpNode):
+                node.operand = results[-1]; results[-1] = self.optimize_unary(node)
+            else: results.append(node)
+        return results[0]
+
+    def optimize_binary(self, node: BinOpNode) -> Node:
+        left = node.left; right = node.right
+        if self.is_literal(left) and self.is_literal(right):
+            folded = self.fold(lambda: apply_binary_operator(node.value, left.value, self.static_type(left), right.value, self.static_type(right)))
+            if folded is not None: return folded
+        kept = self.identity_operand(node.value, left, right)
+        if kept is not None: self.stats["identities"] += 1; return kept
+        return node
+
+    def optimize_unary(self, node: UnOpNode) -> Node:
+        operand = node.operand
+        if self.is_literal(operand):
+            folded = self.fold(lambda: apply_unary_operator(node.value, operand.value, self.static_type(operand)))
+            if folded is not None: return folded
+        if isinstance(operand, UnOpNode) and operand.value == node.value:
+            self.stats["double_negations"] += 1
+            return operand.operand
+        return node
+
+    @staticmethod
+    def is_literal(node: Node) -> bool:
+        return isinstance(node, (IntLiteralNode, BoolLiteralNode))
+
+    def fold(self, compute) -> Optional[Node]:
+        """Literal for the (value, type) compute() returns, or None if evaluating it raises."""
+        try: value, type_str = compute()
+        except (KhwarizmiRuntimeError, ZeroDivisionError): return None # reported when the program reaches it
+        self.stats["constant_folds"] += 1
+        return IntLiteralNode(value) if type_str == INT_TYPE else BoolLiteralNode(value)
+
+    @staticmethod
+    def identity_operand(op: str, left: Node, right: Node) -> Optional[Node]:
+        """The operand `left <op> right` always equals, if one side is op's identity element."""
+        def is_value(node, value): return Optimizer.is_literal(node) and type(node.value) is type(value) and node.value == value
+        if op == "+": return left if is_value(right, 0) else right if is_value(left, 0) else None
+        if op == "-": return left if is_value(right, 0) else None
+        if op == "*": return left if is_value(right, 1) else right if is_value(left, 1) else None
+        if op == "/": return left if is_value(right, 1) else None
+        if op == "&&": return left if is_value(right, True) else right if is_value(left, True) else None
+        if op == "||": return left if is_value(right, False) else right if is_value(left, False) else None
+        return None
+
+    @staticmethod
+    def run(program: ProgramNode) -> Dict[str, int]:
+        """Optimizes program in place and returns the rewrite counts."""
+        Resolver.run(program)
+        optimizer = Optimizer()
+        optimizer.optimize_block(program.children[0])
+        return optimizer.stats
@@ -0,0 +1,86 @@
+import sys
+from typing import List, Optional, TextIO, Iterable
+
+BUFFER_SIZE = 1 << 16 # characters a StreamSink buffers before writing them out
+
+class OutputSink:
+    """Destination of the lines a Khwarizmi program prints (print, show, solve and runtime errors)."""
+    def write_line(self, line: str) -> None:
+        raise NotImplementedError
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines: self.write_line(line)
+    def flush(self) -> None:
+        pass
+    def close(self) -> None:
+        self.flush()
+
+
+class StreamSink(OutputSink):
+    """
+    Buffers lines and writes them to a text stream in chunks of about
+    buffer_size characters, instead of one write per line. Without a stream,
+    lines go to whatever sys.stdout is when they are written out, so
+    contextlib.redirect_stdout around a run still captures them.
+    """
+    def __init__(self, stream: Optional[TextIO] = None, buffer_size: int = BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.lines: List[str] = []; self.size = 0
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line); self.size += len(line)
+        if self.size >= self.buffer_size: self.write_buffer()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines: self.lines.append(line); self.size += len(line)
+        if self.size >= self.buffer_size: self.write_buffer()
+
+    def write_buffer(self) -> None:
+        if not self.lines: return
+        self.lines.append(""); text = "\n".join(self.lines)
+        self.lines.clear(); self.size = 0
+        (self.stream or sys.stdout).write(text)
+
+    def flush(self) -> None:
+        self.write_buffer(); (self.stream or sys.stdout).flush()
+
+
+class FileSink(StreamSink):
+    """StreamSink writing to a file, which close() closes."""
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE):
+        super().__init__(open(path, "w", encoding="utf-8"), buffer_size)
+
+    def close(self) -> None:
+        self.flush(); self.stream.close()
+
+
+class ListSink(OutputSink):
+    """Collects the lines in memory, for embedders that want the output of a run as data."""
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line)
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        self.lines.extend(lines)
+
+
+# The sink every engine writes to; replaced with set_sink.
+sink: OutputSink = StreamSink()
+
+def set_sink(new_sink: OutputSink) -> OutputSink:
+    """Makes new_sink receive all program output; returns the previous sink, flushed."""
+    global sink
+    previous = sink; previous.flush(); sink = new_sink
+    return previous
+
+def write_line(line: str) -> None:
+    sink.write_line(line)
+
+def write_lines(lines: Iterable[str]) -> None:
+    sink.write_lines(lines)
+
+def flush_output() -> None:
+    """Writes out buffered lines: before a program reads input and when it stops."""
+    sink.flush()
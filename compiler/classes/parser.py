@@ -1,156 +1,174 @@
+from classes.token_ import *
 from classes.tokenizer import Tokenizer
+from classes.regex_tokenizer import RegexTokenizer
+from classes.stream_tokenizer import StreamTokenizer
 from classes.ops import *
 from typing import Any
 from classes.node import Node
-from classes.prepro import PrePro
 import sys
 
+class NodeBuilder:
+    """
+    Makes the parser's nodes. This one builds the Node tree; FlatBuilder
+    (classes/flat_ast.py) has the same methods and builds a FlatAST instead, so a
+    node handle is whatever the builder returns and the parser never looks inside.
+    """
+    def program(self, block): return ProgramNode(value="Program", children=[block])
+    def block(self, statements): return BlockNode(value="Block", children=statements)
+    def var_dec(self, type_name, var_name, init_expression): return VarDecNode(type_name_str=type_name, var_name=var_name, init_expression=init_expression)
+    def assignment(self, var_name, expression): return AssignmentNode(value="=", children=[IdentifierNode(var_name), expression])
+    def if_statement(self, condition, if_block, elif_clauses, else_block): return IfNode(condition=condition, if_block=if_block, elif_clauses=elif_clauses, else_block=else_block)
+    def elif_clause(self, condition, block): return ElifNode(condition=condition, block=block)
+    def while_loop(self, condition, block): return WhileNode(value="while", children=[condition, block])
+    def argument_list(self, args): return ArgumentListNode(value="args", children=args)
+    def print_command(self, arg_list): return PrintCmdNode(value="print", children=[arg_list])
+    def show_command(self, arg_list): return ShowCmdNode(value="show", children=[arg_list])
+    def solve_command(self, arg_list): return SolveCmdNode(value="solve", children=[arg_list])
+    def range_argument(self, name, low, high): return RangeNode(value="in", children=[name, low, high])
+    def binary(self, op, left, right): return BinOpNode(op, left, right)
+    def unary(self, op, operand): return UnOpNode(op, operand)
+    def int_literal(self, value): return IntLiteralNode(value)
+    def bool_literal(self, value): return BoolLiteralNode(value)
+    def identifier(self, name): return IdentifierNode(name)
+    def input_call(self): return InputNode("input")
+    def is_identifier(self, node) -> bool: return isinstance(node, IdentifierNode)
+    def type_name(self, node) -> str: return type(node).__name__
+    def locate(self, statement, token):
+        """Records where a statement starts, for errors reported before the program runs (see TypeChecker)."""
+        statement.position = (token.line, token.column); return statement
+    def finish(self, program): return program
+
 class Parser:
     tokenizer: Tokenizer
 
-    def __init__(self, tokenizer: Tokenizer):
+    def __init__(self, tokenizer: Tokenizer, builder: NodeBuilder = None):
         self.tokenizer = tokenizer
+        self.build = builder or NodeBuilder()
         
         
         self.precedence = {
-            "OPERATOR_OR": 1,    
-            "OPERATOR_AND": 2,   
-            "OPERATOR_EQ": 3,    
-            "OPERATOR_NEQ": 3,   
-            "OPERATOR_LT": 4,    
-            "OPERATOR_GT": 4,    
-            "OPERATOR_LTE": 4,   
-            "OPERATOR_GTE": 4,   
-            "OPERATOR_PLUS": 5,  
-            "OPERATOR_MINUS": 5, 
-            "OPERATOR_MULT": 6,  
-            "OPERATOR_DIV": 6
+            OPERATOR_OR: 1,
+            OPERATOR_AND: 2,
+            OPERATOR_EQ: 3,
+            OPERATOR_NEQ: 3,
+            OPERATOR_LT: 4,
+            OPERATOR_GT: 4,
+            OPERATOR_LTE: 4,
+            OPERATOR_GTE: 4,
+            OPERATOR_PLUS: 5,
+            OPERATOR_MINUS: 5,
+            OPERATOR_MULT: 6,
+            OPERATOR_DIV: 6
+        }
+        self.statement_parsers = {
+            TYPE_INT: self.parse_variable_declaration,
+            TYPE_BOOL: self.parse_variable_declaration,
+            TYPE_EQ: self.parse_variable_declaration,
+            IDENTIFIER: self.parse_assignment_statement,
+            IF_KEYWORD: self.parse_if_statement,
+            WHILE_KEYWORD: self.parse_while_statement,
+            PRINT_CMD: self.parse_print_command,
+            SHOW_CMD: self.parse_show_command,
+            SOLVE_CMD: self.parse_solve_command,
         }
 
-    def consume(self, expected_type: str, expected_value: Any = None):
+    def consume(self, expected_type: TokenType, expected_value: Any = None):
         """Consumes the current token if it matches expected_type and optionally expected_value."""
         token = self.tokenizer.next
         if token.ttype == expected_type:
             if expected_value is not None and token.value != expected_value:
-                raise SyntaxError(f"Parser Error: Expected token value '{expected_value}' for type '{expected_type}', but got '{token.value}'")
+                raise SyntaxError(f"Parser Error: Expected token value '{expected_value}' for type '{token_name(expected_type)}', but got '{token.value}'")
             self.tokenizer.select_next()
             return token
         else:
-            raise SyntaxError(f"Parser Error: Expected token type '{expected_type}', but got '{token.ttype}' (value: '{token.value}')")
+            raise SyntaxError(f"Parser Error: Expected token type '{token_name(expected_type)}', but got '{token_name(token.ttype)}' (value: '{token.value}')")
 
     def parse_program(self) -> ProgramNode:
         """ Parses the entire Khwarizmi program: BEGIN lista_declaracoes END """
-        self.consume("BEGIN_KEYWORD", "BEGIN")
+        self.consume_optional_newlines() # blank or comment-only lines before BEGIN
+        self.consume(BEGIN_KEYWORD, "BEGIN")
         self.consume_optional_newlines()
         
         
         main_block_node = self.parse_block_content(is_program_root=True)
         
-        self.consume("END_KEYWORD", "END")
+        self.consume(END_KEYWORD, "END")
         self.consume_optional_newlines() 
-        self.consume("EOF") 
-        return ProgramNode(value="Program", children=[main_block_node])
+        self.consume(EOF) 
+        return self.build.program(main_block_node)
 
     def parse_block_content(self, is_program_root: bool = False) -> BlockNode:
         """ Parses the content of a block: a list of declarations until END or an outer block's end. """
         statements = []
         
         
-        while self.tokenizer.next.ttype != "END_KEYWORD":
+        while self.tokenizer.next.ttype != END_KEYWORD:
             statements.append(self.parse_declaration_or_statement())
-            if self.tokenizer.next.ttype == "NEWLINE":
-                 self.consume("NEWLINE")
+            if self.tokenizer.next.ttype == NEWLINE:
+                 self.consume(NEWLINE)
                  self.consume_optional_newlines() 
-            elif self.tokenizer.next.ttype == "END_KEYWORD": 
+            elif self.tokenizer.next.ttype == END_KEYWORD: 
                 break
-            elif self.tokenizer.next.ttype == "EOF" and is_program_root: 
+            elif self.tokenizer.next.ttype == EOF and is_program_root: 
                 break
-            elif self.tokenizer.next.ttype == "EOF" and not is_program_root:
+            elif self.tokenizer.next.ttype == EOF and not is_program_root:
                 raise SyntaxError("Parser Error: Unexpected EOF inside a nested block. Missing END?")
             else:                   
                   pass
 
 
-        return BlockNode(value="Block", children=statements)
+        return self.build.block(statements)
 
     def parse_block(self) -> BlockNode:
         """ Parses a nested block: BEGIN lista_declaracoes END """
-        self.consume("BEGIN_KEYWORD", "BEGIN")
+        self.consume(BEGIN_KEYWORD, "BEGIN")
         self.consume_optional_newlines()
         block_node = self.parse_block_content()
-        self.consume("END_KEYWORD", "END")
+        self.consume(END_KEYWORD, "END")
         return block_node
         
     def consume_optional_newlines(self):
         """Consumes one or more consecutive NEWLINE tokens."""
-        while self.tokenizer.next.ttype == "NEWLINE":
-            self.consume("NEWLINE")
+        while self.tokenizer.next.ttype == NEWLINE:
+            self.consume(NEWLINE)
 
     def parse_declaration_or_statement(self) -> Node:
-        """ Parses a single declaration or statement. """
+        """ Parses a single declaration or statement, dispatching on its first token. """
+        while self.tokenizer.next.ttype == NEWLINE: self.consume(NEWLINE)
         token = self.tokenizer.next
-        node = None
+        parse = self.statement_parsers.get(token.ttype)
+        if parse is None: raise SyntaxError(f"Parser Error: Unexpected token at start of statement: {token_name(token.ttype)} ('{token.value}')")
+        return self.build.locate(parse(), token)
 
-        if token.ttype in ["TYPE_INT", "TYPE_BOOL", "TYPE_EQ"]:
-            node = self.parse_variable_declaration()
-        elif token.ttype == "IDENTIFIER":
-            
-            node = self.parse_assignment_statement()
-        elif token.ttype == "IF_KEYWORD":
-            node = self.parse_if_statement()
-        elif token.ttype == "WHILE_KEYWORD":
-            node = self.parse_while_statement()
-        elif token.ttype == "PRINT_CMD":
-            node = self.parse_print_command()
-        elif token.ttype == "SHOW_CMD":
-            node = self.parse_show_command()
-        elif token.ttype == "SOLVE_CMD":
-            node = self.parse_solve_command()
-        elif token.ttype == "NEWLINE": 
-            self.consume("NEWLINE") 
-            
-            return self.parse_declaration_or_statement() 
-        else:
-            raise SyntaxError(f"Parser Error: Unexpected token at start of statement: {token.ttype} ('{token.value}')")
-        
-        return node
+    DECLARED_TYPES = {TYPE_INT: INT_TYPE, TYPE_BOOL: BOOL_TYPE, TYPE_EQ: EQ_TYPE}
 
     def parse_type(self) -> TypeNode:
         token = self.tokenizer.next
-        if token.ttype == "TYPE_INT":
-            self.consume("TYPE_INT")
-            return TypeNode("int")
-        elif token.ttype == "TYPE_BOOL":
-            self.consume("TYPE_BOOL")
-            return TypeNode("bool")
-        elif token.ttype == "TYPE_EQ":
-            self.consume("TYPE_EQ")
-            return TypeNode("eq")
-        else:
-            raise SyntaxError(f"Parser Error: Expected type (int, bool, eq), got {token.ttype}")
+        declared_type = self.DECLARED_TYPES.get(token.ttype)
+        if declared_type is None: raise SyntaxError(f"Parser Error: Expected type (int, bool, eq), got {token_name(token.ttype)}")
+        self.consume(token.ttype)
+        return TypeNode(declared_type)
 
     def parse_variable_declaration(self) -> VarDecNode:
         type_node = self.parse_type()
-        identifier_token = self.consume("IDENTIFIER")
+        identifier_token = self.consume(IDENTIFIER)
         init_expr_node = None
-        if self.tokenizer.next.ttype == "OPERATOR_ASSIGN":
-            self.consume("OPERATOR_ASSIGN", "=")
+        if self.tokenizer.next.ttype == OPERATOR_ASSIGN:
+            self.consume(OPERATOR_ASSIGN, "=")
             init_expr_node = self.parse_expression()
         
         
-        return VarDecNode(type_name_str=type_node.value,
-                          var_name=identifier_token.value,
-                          init_expression=init_expr_node)
+        return self.build.var_dec(type_node.value, identifier_token.value, init_expr_node)
 
     def parse_assignment_statement(self) -> AssignmentNode:
-        identifier_node = IdentifierNode(self.consume("IDENTIFIER").value)
-        self.consume("OPERATOR_ASSIGN", "=")
+        var_name = self.consume(IDENTIFIER).value
+        self.consume(OPERATOR_ASSIGN, "=")
         expr_node = self.parse_expression()
-        
-        return AssignmentNode(value="=", children=[identifier_node, expr_node])
+
+        return self.build.assignment(var_name, expr_node)
 
     def parse_if_statement(self) -> IfNode:
-        self.consume("IF_KEYWORD")
+        self.consume(IF_KEYWORD)
         condition_expr = self.parse_expression()
         self.consume_optional_newlines()
         # first IF block
@@ -158,136 +176,152 @@ class Parser:
         self.consume_optional_newlines()
         
         elif_clauses = []
-        while self.tokenizer.next.ttype == "ELIF_KEYWORD":
-            self.consume("ELIF_KEYWORD")
+        while self.tokenizer.next.ttype == ELIF_KEYWORD:
+            elif_token = self.consume(ELIF_KEYWORD)
             elif_condition_expr = self.parse_expression()
             self.consume_optional_newlines()
             elif_block = self.parse_block()
-            elif_clauses.append(ElifNode(condition=elif_condition_expr, block=elif_block))
+            elif_clauses.append(self.build.locate(self.build.elif_clause(elif_condition_expr, elif_block), elif_token))
             self.consume_optional_newlines()
 
         else_block_node = None
-        if self.tokenizer.next.ttype == "ELSE_KEYWORD":
-            self.consume("ELSE_KEYWORD")
+        if self.tokenizer.next.ttype == ELSE_KEYWORD:
+            self.consume(ELSE_KEYWORD)
             self.consume_optional_newlines()
             self.consume_optional_newlines()
             else_block_node = self.parse_block()
             
-        return IfNode(condition=condition_expr, if_block=if_block,
-                      elif_clauses=elif_clauses, else_block=else_block_node)
+        return self.build.if_statement(condition_expr, if_block, elif_clauses, else_block_node)
 
     def parse_while_statement(self) -> WhileNode:
-        self.consume("WHILE_KEYWORD")
+        self.consume(WHILE_KEYWORD)
         condition_expr = self.parse_expression()
         self.consume_optional_newlines() 
         loop_block = self.parse_block()
-        return WhileNode(value="while", children=[condition_expr, loop_block])
+        return self.build.while_loop(condition_expr, loop_block)
 
-    def parse_argument_list(self) -> ArgumentListNode:
+    def parse_argument_list(self, parse_argument=None) -> ArgumentListNode:
+        parse_argument = parse_argument or self.parse_expression
         args = []
-        if self.tokenizer.next.ttype != "RPAREN": 
-            args.append(self.parse_expression())
-            while self.tokenizer.next.ttype == "COMMA":
-                self.consume("COMMA")
-                args.append(self.parse_expression())
-        return ArgumentListNode(value="args", children=args)
+        if self.tokenizer.next.ttype != RPAREN: 
+            args.append(parse_argument())
+            while self.tokenizer.next.ttype == COMMA:
+                self.consume(COMMA)
+                args.append(parse_argument())
+        return self.build.argument_list(args)
 
     def parse_print_command(self) -> PrintCmdNode:
-        self.consume("PRINT_CMD")
-        self.consume("LPAREN", "(")
+        self.consume(PRINT_CMD)
+        self.consume(LPAREN, "(")
         arg_list_node = self.parse_argument_list()
-        self.consume("RPAREN", ")")
-        return PrintCmdNode(value="print", children=[arg_list_node])
+        self.consume(RPAREN, ")")
+        return self.build.print_command(arg_list_node)
 
     def parse_show_command(self) -> ShowCmdNode:
-        self.consume("SHOW_CMD")
-        self.consume("LPAREN", "(")
+        self.consume(SHOW_CMD)
+        self.consume(LPAREN, "(")
         arg_list_node = self.parse_argument_list()
-        self.consume("RPAREN", ")")
-        return ShowCmdNode(value="show", children=[arg_list_node])
+        self.consume(RPAREN, ")")
+        return self.build.show_command(arg_list_node)
 
     def parse_solve_command(self) -> SolveCmdNode:
-        self.consume("SOLVE_CMD")
-        self.consume("LPAREN", "(")
-        arg_list_node = self.parse_argument_list()
-        self.consume("RPAREN", ")")
-        return SolveCmdNode(value="solve", children=[arg_list_node])
+        self.consume(SOLVE_CMD)
+        self.consume(LPAREN, "(")
+        arg_list_node = self.parse_argument_list(self.parse_solve_argument)
+        self.consume(RPAREN, ")")
+        return self.build.solve_command(arg_list_node)
+
+    def parse_solve_argument(self) -> Node:
+        """
+        An expression, or a range substitution `name in low..high` (both bounds included).
+        `in` is not reserved: it is only read as the range keyword here, right after an
+        expression, where a plain identifier could not follow, so it stays a valid name.
+        """
+        arg = self.parse_expression()
+        token = self.tokenizer.next
+        if token.ttype != IDENTIFIER or token.value != "in": return arg
+        if not self.build.is_identifier(arg): raise SyntaxError(f"Parser Error: Expected a variable name before 'in' in solve(), got {self.build.type_name(arg)}")
+        self.consume(IDENTIFIER, "in")
+        low = self.parse_expression()
+        self.consume(OPERATOR_RANGE, "..")
+        high = self.parse_expression()
+        return self.build.range_argument(arg, low, high)
 
     
-    def parse_expression(self, min_precedence=1) -> Node:
-        """ Parses a Khwarizmi expression using precedence climbing. """
-        
-        lhs = self.parse_factor()
+    UNARY_OPERATORS = {OPERATOR_MINUS: "-", OPERATOR_LOGICAL_NOT: "!"}
+    OPEN_PAREN = (0, "(")  # pending entry of an open parenthesis; binary operators have precedence >= 1
+    UNARY = -1             # precedence of a pending prefix operator
 
+    def parse_expression(self) -> Node:
+        """
+        Parses a Khwarizmi expression using precedence climbing. Binary operators
+        are left-associative, and a prefix '-' or '!' applies to the factor right
+        after it. Operators, prefixes and parentheses waiting for their operands
+        are kept on explicit stacks rather than in recursive calls, so an
+        expression may nest deeper than Python's recursion limit.
+        """
+        operands = [] # left operands of the pending binary operators
+        pending = []  # (precedence, operator value) of binary operators, prefixes (UNARY) and OPEN_PAREN
         while True:
-            op_token = self.tokenizer.next
-            op_type = op_token.ttype
-            
-            if op_type not in self.precedence or self.precedence[op_type] < min_precedence:
-                break
-
-            op_prec = self.precedence[op_type]
-            op_val = op_token.value 
-            self.consume(op_type) 
-
-            rhs = self.parse_expression(op_prec + 1)
-            if hasattr(lhs, 'is_equation_context') and lhs.is_equation_context:
-                 
-                 lhs = BinOpNode(value=op_val, children=[lhs, rhs]) 
-            else:
-                 lhs = BinOpNode(value=op_val, children=[lhs, rhs])
-        
-        return lhs
-
+            token = self.tokenizer.next
+            if token.ttype in self.UNARY_OPERATORS:
+                self.consume(token.ttype); pending.append((self.UNARY, self.UNARY_OPERATORS[token.ttype])); continue
+            if token.ttype == LPAREN:
+                self.consume(LPAREN); pending.append(self.OPEN_PAREN); continue
+            operand = self.parse_factor()
+            while True:
+                # A complete factor: apply the prefixes right before it, innermost first.
+                while pending and pending[-1][0] == self.UNARY: operand = self.build.unary(pending.pop()[1], operand)
+                op_type = self.tokenizer.next.ttype
+                if op_type in self.precedence:
+                    op_prec = self.precedence[op_type]
+                    while pending and pending[-1][0] >= op_prec: operand = self.build.binary(pending.pop()[1], operands.pop(), operand)
+                    op_val = self.consume(op_type).value
+                    operands.append(operand); pending.append((op_prec, op_val))
+                    break
+                # End of the (parenthesized) expression.
+                while pending and pending[-1][0] > 0: operand = self.build.binary(pending.pop()[1], operands.pop(), operand)
+                if not pending: return operand
+                self.consume(RPAREN); pending.pop() # the parenthesized expression is itself a factor
 
     def parse_factor(self) -> Node:
-        """ Parses the most tightly bound parts of expressions: literals, identifiers, (expr), input, unary ops. """
+        """ Parses the operands of expressions: literals, identifiers and input(). """
         token = self.tokenizer.next
 
-        if token.ttype == "OPERATOR_MINUS": 
-            self.consume("OPERATOR_MINUS")
-            
-            operand = self.parse_factor() 
-            return UnOpNode(value="-", children=[operand])
-        elif token.ttype == "OPERATOR_LOGICAL_NOT":
-            self.consume("OPERATOR_LOGICAL_NOT")
-            operand = self.parse_factor()
-            return UnOpNode(value="!", children=[operand])
-        elif token.ttype == "INT_LITERAL":
-            self.consume("INT_LITERAL")
-            return IntLiteralNode(token.value)
-        elif token.ttype == "BOOL_LITERAL": 
-            self.consume("BOOL_LITERAL")
-            return BoolLiteralNode(token.value)
-        elif token.ttype == "IDENTIFIER":
-            self.consume("IDENTIFIER")
-            return IdentifierNode(token.value)
-        elif token.ttype == "LPAREN":
-            self.consume("LPAREN")
-            expr_node = self.parse_expression() 
-            self.consume("RPAREN")
-            return expr_node
-        elif token.ttype == "INPUT_CMD": 
-            self.consume("INPUT_CMD")
-            self.consume("LPAREN")
-            self.consume("RPAREN")
-            return InputNode("input")
+        if token.ttype == INT_LITERAL:
+            self.consume(INT_LITERAL)
+            return self.build.int_literal(token.value)
+        elif token.ttype == BOOL_LITERAL: 
+            self.consume(BOOL_LITERAL)
+            return self.build.bool_literal(token.value)
+        elif token.ttype == IDENTIFIER:
+            self.consume(IDENTIFIER)
+            return self.build.identifier(token.value)
+        elif token.ttype == INPUT_CMD: 
+            self.consume(INPUT_CMD)
+            self.consume(LPAREN)
+            self.consume(RPAREN)
+            return self.build.input_call()
         else:
-            raise SyntaxError(f"Parser Error: Unexpected token in factor: {token.ttype} ('{token.value}')")
+            raise SyntaxError(f"Parser Error: Unexpected token in factor: {token_name(token.ttype)} ('{token.value}')")
+
+    @staticmethod
+    def run(code: str, tokenizer_class: type = RegexTokenizer, builder: NodeBuilder = None) -> ProgramNode:
+        """Parses a whole program; `//` comments are skipped by the lexer, up to but not including the newline."""
+        return Parser.parse_tokens(tokenizer_class(code), builder)
 
     @staticmethod
-    def run(code: str) -> ProgramNode:
+    def run_stream(stream: Any, chunk_size: int = StreamTokenizer.DEFAULT_CHUNK_SIZE, builder: NodeBuilder = None) -> ProgramNode:
+        """Parses a program read lazily from a text/binary file handle or an mmap."""
+        return Parser.parse_tokens(StreamTokenizer(stream, chunk_size), builder)
 
-        try:
-            processed_code = PrePro.filter(code)
-        except Exception as e:
-            print(f"Error during preprocessing: {e}")
-            sys.exit(1)
-        tokenizer = Tokenizer(processed_code)
-        parser = Parser(tokenizer)
+    @staticmethod
+    def parse_tokens(tokenizer: Tokenizer, builder: NodeBuilder = None) -> ProgramNode:
+        """The parsed program: a ProgramNode, or whatever builder.finish makes of it (a FlatAST for FlatBuilder)."""
+        parser = Parser(tokenizer, builder)
         program_ast = parser.parse_program()
         
-        if parser.tokenizer.next.ttype != "EOF": 
-            raise SyntaxError(f"Parser Error: Expected EOF after program, but found {parser.tokenizer.next.ttype}")
-            
-        return program_ast
\ No newline at end of file
+        if parser.tokenizer.next.ttype != EOF: 
+            raise SyntaxError(f"Parser Error: Expected EOF after program, but found {token_name(parser.tokenizer.next.ttype)}")
+
+        return parser.build.finish(program_ast)
\ No newline at end of file
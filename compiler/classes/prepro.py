@@ -1,5 +0,0 @@
-import re
-
-class PrePro():
-    def filter(code):
-        return re.subn(r'//(.*?)\n|//(.*?)$', '', code)[0]
\ No newline at end of file
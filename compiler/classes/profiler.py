@@ -0,0 +1,89 @@
+from classes.ops import VarDecNode, AssignmentNode, PrintCmdNode, ShowCmdNode, SolveCmdNode, IfNode, WhileNode
+from classes.node import Node
+from typing import Dict, List, Tuple, Any, Callable
+from time import perf_counter
+
+# Statement classes whose evaluate the Profiler times, and how the report names them
+PROFILED_STATEMENTS = {
+    VarDecNode: "declare", AssignmentNode: "assign", PrintCmdNode: "print", ShowCmdNode: "show",
+    SolveCmdNode: "solve", IfNode: "if", WhileNode: "while",
+}
+
+class Profiler:
+    """
+    Execution counts and wall time of every statement the tree-walker runs.
+
+    Nothing in the engines checks whether profiling is on: install() replaces
+    the evaluate method of each profiled statement class with a timed wrapper,
+    and uninstall() puts the original back, so a run without the profiler
+    executes exactly the code it always did.
+
+    Times are inclusive (`total`: the statement and everything it ran, such as
+    a while loop's body) and exclusive (`self`: minus the profiled statements
+    it ran). Self time is also kept per stack of enclosing statements, for a
+    collapsed-stack file (one `frame;frame;frame count` line per stack) that
+    flamegraph tools read.
+    """
+    def __init__(self):
+        self.records: Dict[int, List[Any]] = {} # id(node) -> [node, count, total, self]
+        self.stacks: Dict[Tuple[int, ...], float] = {} # ids of the enclosing statements, innermost last -> self time
+        self.stack: Tuple[int, ...] = ()
+        self.children_time = 0.0 # time of the profiled statements run so far by the current one
+        self.originals: Dict[type, Callable] = {}
+
+    def wrap(self, evaluate: Callable) -> Callable:
+        profiler = self
+        def profiled_evaluate(node: Node, symbol_table: Any):
+            outer_stack = profiler.stack; outer_children_time = profiler.children_time
+            stack = profiler.stack = outer_stack + (id(node),); profiler.children_time = 0.0
+            start = perf_counter()
+            try: return evaluate(node, symbol_table)
+            finally:
+                elapsed = perf_counter() - start; self_time = elapsed - profiler.children_time
+                record = profiler.records.get(stack[-1])
+                if record is None: record = profiler.records[stack[-1]] = [node, 0, 0.0, 0.0]
+                record[1] += 1; record[2] += elapsed; record[3] += self_time
+                profiler.stacks[stack] = profiler.stacks.get(stack, 0.0) + self_time
+                profiler.stack = outer_stack; profiler.children_time = outer_children_time + elapsed
+        return profiled_evaluate
+
+    def install(self) -> None:
+        for node_class in PROFILED_STATEMENTS:
+            self.originals[node_class] = node_class.__dict__["evaluate"]
+            node_class.evaluate = self.wrap(self.originals[node_class])
+
+    def uninstall(self) -> None:
+        for node_class, evaluate in self.originals.items(): node_class.evaluate = evaluate
+        self.originals.clear()
+
+    @staticmethod
+    def name(node: Node) -> str:
+        """Statement kind, and the variable it declares or assigns."""
+        kind = PROFILED_STATEMENTS[type(node)]
+        if isinstance(node, VarDecNode): return f"{kind} {node.var_name}"
+        if isinstance(node, AssignmentNode): return f"{kind} {node.children[0].value}"
+        return kind
+
+    @staticmethod
+    def label(node: Node) -> str:
+        """name() and the source position (lost when the program went through the array-backed AST)."""
+        position = node.position
+        return f"{Profiler.name(node)} ({position[0]}:{position[1]})" if position else Profiler.name(node)
+
+    def report(self, limit: int = 20) -> str:
+        """Table of the `limit` statements with the most self time, hottest first."""
+        records = sorted(self.records.values(), key=lambda record: record[3], reverse=True)
+        run_time = sum(record[3] for record in records) or 1.0
+        lines = [f"Profile: {len(records)} statements, {sum(record[1] for record in records)} executions, {run_time:.3f} s in statements",
+                 f"{'line':>6} {'statement':<28} {'count':>10} {'total (ms)':>11} {'self (ms)':>10} {'self %':>7}"]
+        for node, count, total, self_time in records[:limit]:
+            line = node.position[0] if node.position else "?"
+            lines.append(f"{line:>6} {Profiler.name(node)[:28]:<28} {count:>10} {1000 * total:>11.3f} {1000 * self_time:>10.3f} {100 * self_time / run_time:>6.1f}%")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path: str) -> None:
+        """Writes the collapsed stacks, with self time in microseconds as the count."""
+        labels = {node_id: Profiler.label(record[0]).replace(";", ",") for node_id, record in self.records.items()}
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, self_time in self.stacks.items():
+                file.write(";".join(["program"] + [labels[node_id] for node_id in stack]) + f" {round(self_time * 1e6)}\n")
@@ -0,0 +1,67 @@
+import re
+import sys
+from classes.token_ import *
+from classes.tokenizer import Tokenizer
+
+class RegexTokenizer(Tokenizer):
+    """
+    Fast lexer backend producing the same Token stream as Tokenizer.
+
+    Every token is recognised by one match of a master regex with named groups,
+    so identifiers and numbers are sliced out of the source in a single step
+    instead of being built character by character. The pattern only covers
+    ASCII input; anything it does not recognise (non-ASCII letters, digits or
+    whitespace, and invalid characters) is handed to Tokenizer.scan for that one
+    token, which keeps the Unicode behaviour and error messages identical. The
+    lookaheads stop a number or name from matching only the ASCII prefix of a
+    longer token (e.g. `abé`), and from backtracking into a shorter match.
+    """
+    MASTER_PATTERN = re.compile(r"""
+        # Whitespace and comments before the token, matched atomically (lookahead + backreference)
+        # so a failed token match cannot backtrack into a shorter skip, e.g. half a comment.
+        (?=(?P<SKIPPED>(?:[ \t\r\x0b\x0c\x1c-\x1f]+|//[^\n]*)*))(?P=SKIPPED)
+        (?:
+            (?P<NEWLINE>\n(?:[ \t\r\x0b\x0c\x1c-\x1f]*(?://[^\n]*)?\n)*) # with the blank/comment-only lines after it
+          | (?P<OPERATOR>==|!=|<=|>=|&&|\|\||\.\.|[=!<>+\-*/(),])
+          | (?P<INT_LITERAL>[0-9]+)(?![0-9]|[^\x00-\x7f])
+          | (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)(?![A-Za-z0-9_]|[^\x00-\x7f])
+        )
+    """, re.VERBOSE)
+
+    # Skips only whitespace and comments, to find where the slow path has to take over.
+    SKIP_PATTERN = re.compile(r"(?:[ \t\r\x0b\x0c\x1c-\x1f]+|//[^\n]*)*")
+
+    line_end = sys.maxsize # the whole line after self.pos is in self.source; see StreamTokenizer
+
+    def fill_line(self) -> None:
+        pass
+
+    def select_next(self) -> None:
+        previous = self.next
+        while True:
+            if self.pos > self.line_end: self.fill_line()
+            match = self.MASTER_PATTERN.match(self.source, self.pos)
+            if match is None:
+                self.pos = self.SKIP_PATTERN.match(self.source, self.pos).end()
+                Tokenizer.select_next(self) # EOF, or a token outside the ASCII fast path
+                if self.next.ttype == NEWLINE and previous is not None and previous.ttype == NEWLINE:
+                    self.next = previous; continue
+                return
+
+            kind = match.lastgroup; text = match.group(kind); start = match.start(kind)
+            if kind == "IDENTIFIER":
+                token_type = Tokenizer.RESERVED_KEYWORDS.get(text)
+                if token_type is None: token = Token(IDENTIFIER, text, self.line, start - self.line_start + 1)
+                elif token_type == BOOL_LITERAL: token = Token(token_type, text == "true", self.line, start - self.line_start + 1)
+                else: token = Token(token_type, text, self.line, start - self.line_start + 1)
+            elif kind == "OPERATOR": token = Token(self.OPERATORS[text], text, self.line, start - self.line_start + 1)
+            elif kind == "INT_LITERAL": token = Token(INT_LITERAL, int(text), self.line, start - self.line_start + 1)
+            else:
+                token = Token(NEWLINE, "\n", self.line, start - self.line_start + 1)
+                self.line += text.count("\n"); self.line_start = match.end()
+                if previous is not None and previous.ttype == NEWLINE:
+                    # The run of line breaks was split by a non-ASCII blank line or a buffer boundary.
+                    self.pos = match.end(); continue
+
+            self.pos = match.end(); self.token_start = start; self.next = token
+            return
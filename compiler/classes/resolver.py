@@ -0,0 +1,81 @@
+from classes.ops import *
+from classes.node import Node, postorder
+from classes.symbol_table import ScopeLayout
+from typing import List, Dict, Optional, Tuple
+
+class Resolver:
+    """
+    Static pass binding variable accesses to (depth, slot) pairs.
+
+    depth is the lexical nesting level of the declaring block (0 = program block)
+    and slot its index in that block's ScopeLayout. A name resolves to the innermost
+    declaration that has already been reached in program order, which is exactly
+    what SymbolTable's parent walk finds at run time: an inner block only shadows
+    an outer variable from its own declaration onwards.
+
+    Results are stored on the nodes:
+      BlockNode.layout       -> ScopeLayout of the block (None if it declares nothing)
+      VarDecNode.slot        -> slot in the enclosing block's layout
+      IdentifierNode.binding -> (depth, slot), or None when no declaration is visible
+      IdentifierNode.declared_type -> type of the bound declaration
+      IdentifierNode.always_assigned -> the bound declaration has an initializer, so
+                               the variable never holds UNASSIGNED (and an int/bool
+                               one is never symbolic)
+    'eq' bodies and show/solve arguments are left unresolved: they are looked up by
+    name whenever they are displayed or solved.
+    """
+    def __init__(self):
+        self.layouts: List[ScopeLayout] = []
+        self.visible: List[Dict[str, VarDecNode]] = [] # declarations reached so far, per open block
+
+    def lookup(self, name: str) -> Optional[Tuple[int, VarDecNode]]:
+        for depth in range(len(self.visible) - 1, -1, -1):
+            declaration = self.visible[depth].get(name)
+            if declaration is not None: return depth, declaration
+        return None
+
+    def resolve_block(self, block: BlockNode, is_program_root: bool = False) -> None:
+        if not is_program_root and not block.declares_variables():
+            # Nothing to put in a frame: the block runs in the enclosing one and adds no depth.
+            block.layout = None
+            for stmt_node in block.children: self.resolve_statement(stmt_node)
+            return
+        block.layout = ScopeLayout()
+        self.layouts.append(block.layout); self.visible.append({})
+        for stmt_node in block.children: self.resolve_statement(stmt_node)
+        self.layouts.pop(); self.visible.pop()
+
+    def resolve_statement(self, node: Node) -> None:
+        if isinstance(node, VarDecNode):
+            if node.type_name_str != EQ_TYPE and node.init_expression: self.resolve_expression(node.init_expression)
+            # A re-declaration in the same block reuses the slot; Frame.declare reports it at run time.
+            node.slot = self.layouts[-1].add(node.var_name, node.type_name_str)
+            self.visible[-1][node.var_name] = node
+        elif isinstance(node, AssignmentNode):
+            self.bind(node.children[0])
+            if node.children[0].declared_type != EQ_TYPE: self.resolve_expression(node.children[1])
+        elif isinstance(node, PrintCmdNode):
+            for arg_node in node.children[0].children: self.resolve_expression(arg_node)
+        elif isinstance(node, IfNode):
+            self.resolve_expression(node.condition); self.resolve_block(node.if_block)
+            for elif_node in node.elif_clauses:
+                self.resolve_expression(elif_node.condition); self.resolve_block(elif_node.block)
+            if node.else_block: self.resolve_block(node.else_block)
+        elif isinstance(node, WhileNode):
+            self.resolve_expression(node.children[0]); self.resolve_block(node.children[1])
+
+    def bind(self, node: IdentifierNode) -> None:
+        found = self.lookup(node.value)
+        if found is None: node.binding = None; return
+        depth, declaration = found
+        node.binding = (depth, declaration.slot); node.declared_type = self.layouts[depth].types[declaration.slot]
+        node.always_assigned = declaration.init_expression is not None
+
+    def resolve_expression(self, node: Node) -> None:
+        for sub_node in postorder(node):
+            if isinstance(sub_node, IdentifierNode): self.bind(sub_node)
+
+    @staticmethod
+    def run(program: ProgramNode) -> ProgramNode:
+        Resolver().resolve_block(program.children[0], is_program_root=True)
+        return program
@@ -0,0 +1,52 @@
+import codecs
+import sys
+from typing import Any
+from classes.regex_tokenizer import RegexTokenizer
+
+class StreamTokenizer(RegexTokenizer):
+    """
+    RegexTokenizer that pulls its source from a file-like object in chunks
+    instead of holding the whole program in memory.
+
+    `stream` may be a text handle (anything whose read(n) returns str) or a
+    byte source such as a binary file or an mmap, which is decoded as UTF-8
+    incrementally. The buffer only has to cover the rest of the current line,
+    since no token spans a newline, so memory stays bounded by the chunk size
+    (plus the longest line) however large the file is.
+    """
+    DEFAULT_CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: Any, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = None  # incremental UTF-8 decoder, created for byte sources
+        self.eof = False
+        self.line_end = -1   # index in the buffer of the newline ending the current line
+        super().__init__("")
+
+    def read_chunk(self) -> str:
+        while True:
+            data = self.stream.read(self.chunk_size)
+            if isinstance(data, str): return data
+            if self.decoder is None: self.decoder = codecs.getincrementaldecoder("utf-8")()
+            text = self.decoder.decode(data, final=not data)
+            if text or not data: return text # an empty decode may just be a split multi-byte character
+
+    def refill(self) -> None:
+        """Drops the consumed part of the buffer and appends the next chunk."""
+        chunk = self.read_chunk()
+        if not chunk: self.eof = True
+        shift = self.pos
+        self.source = self.source[shift:] + chunk
+        self.pos = 0; self.offset += shift
+        self.line_start -= shift; self.token_start -= shift
+
+    def fill_line(self) -> None:
+        """Makes sure the buffer holds the rest of the current line; called by select_next once pos passes line_end."""
+        search_from = self.pos
+        while True:
+            newline = self.source.find("\n", search_from)
+            if newline != -1: self.line_end = newline; return
+            if self.eof: self.line_end = sys.maxsize; return
+            search_from = len(self.source) - self.pos
+            self.refill()
@@ -1,15 +1,37 @@
 from dataclasses import dataclass, field
-from typing import Tuple, Any, Optional
+from typing import Tuple, Any, Optional, Dict, List
+from classes.node import Node
+from classes.value_type import *
 
 # Special marker for unassigned variables
 UNASSIGNED = object() 
 
+# Special marker for frame slots whose declaration has not executed yet
+UNDECLARED = object()
+
+def check_assignment_type(key: str, declared_type: ValueType, new_value: Any) -> None:
+    """Type Checking for assignment against the variable's declared type."""
+    if declared_type == INT_TYPE and not isinstance(new_value, int): # Check actual Python type
+        raise TypeError(f"Type mismatch for variable '{key}'. Expected 'int', got {type(new_value).__name__}.")
+    if declared_type == BOOL_TYPE and not isinstance(new_value, bool): # Check actual Python type
+        raise TypeError(f"Type mismatch for variable '{key}'. Expected 'bool', got {type(new_value).__name__}.")
+    if declared_type == EQ_TYPE:
+        if not isinstance(new_value, Node): # Value for 'eq' must be an AST Node
+             raise TypeError(f"Assigning non-AST to 'eq' variable '{key}'. Value was {new_value}")
+
+def initial_value_for(var_type: ValueType, value: Any) -> Any:
+    """Value stored by a declaration: UNASSIGNED for int/bool without initializer, None for a bare 'eq'."""
+    if value is None:
+        if var_type == INT_TYPE or var_type == BOOL_TYPE: return UNASSIGNED
+        return None # 'eq' declared like 'eq myEquation;'
+    return value
+
 @dataclass
 class SymbolTable:
     symbols: dict = field(default_factory=dict)
     parent: Optional['SymbolTable'] = None 
 
-    def create_var(self, key: str, var_type: str, value: Any = None) -> None:
+    def create_var(self, key: str, var_type: ValueType, value: Any = None) -> None:
         """
         Creates a new variable in the current scope.
         For 'eq' type, the 'value' is expected to be the AST Node representing the equation.
@@ -26,11 +48,11 @@ class SymbolTable:
         # without an init_expression. If an init_expression evaluated to Python's None,
         # that would be different, but Khwarizmi types (int, bool) don't naturally yield None.
         if value is None and self.init_expression is None if hasattr(self, 'init_expression') else value is None : # Check if it was called due to no initializer
-            if var_type == "int":
+            if var_type == INT_TYPE:
                 initial_value = UNASSIGNED 
-            elif var_type == "bool":
+            elif var_type == BOOL_TYPE:
                 initial_value = UNASSIGNED 
-            elif var_type == "eq":
+            elif var_type == EQ_TYPE:
                 # 'eq' type variables are declared and their "value" is their AST definition,
                 # or None if declared like 'eq myEquation;'
                 initial_value = None # Explicitly None if no AST provided yet
@@ -38,7 +60,7 @@ class SymbolTable:
         self.symbols[key] = (initial_value, var_type)
 
 
-    def set_var(self, key: str, value_tuple: Tuple[Any, str]) -> None:
+    def set_var(self, key: str, value_tuple: Tuple[Any, ValueType]) -> None:
         """
         Sets the value of an existing variable.
         Traverses to parent scope if not found locally.
@@ -48,18 +70,11 @@ class SymbolTable:
         
         table_to_update = self
         while table_to_update is not None:
+            if not isinstance(table_to_update, SymbolTable): # A slot-based Frame further up the chain
+                return table_to_update.set_var(key, value_tuple)
             if key in table_to_update.symbols:
                 _ , declared_type = table_to_update.symbols[key] # Get the originally declared type
-                
-                # Type Checking for assignment
-                if declared_type == "int" and not isinstance(new_value, int): # Check actual Python type
-                    raise TypeError(f"Type mismatch for variable '{key}'. Expected 'int', got {type(new_value).__name__}.")
-                if declared_type == "bool" and not isinstance(new_value, bool): # Check actual Python type
-                    raise TypeError(f"Type mismatch for variable '{key}'. Expected 'bool', got {type(new_value).__name__}.")
-                if declared_type == "eq":
-                    if not isinstance(new_value, Node): # Value for 'eq' must be an AST Node
-                         raise TypeError(f"Assigning non-AST to 'eq' variable '{key}'. Value was {new_value}")
-                
+                check_assignment_type(key, declared_type, new_value)
                 # Store the new value, but keep the original declared_type
                 table_to_update.symbols[key] = (new_value, declared_type) 
                 return
@@ -67,14 +82,26 @@ class SymbolTable:
         
         raise KeyError(f"Variable '{key}' not found in any accessible scope for assignment.")
 
+    def store(self, key: str, new_value: Any) -> None:
+        """set_var without the type check, for assignments the TypeChecker has already proven well-typed."""
+        table_to_update = self
+        while table_to_update is not None:
+            if not isinstance(table_to_update, SymbolTable): return table_to_update.store(key, new_value)
+            symbols = table_to_update.symbols
+            if key in symbols: symbols[key] = (new_value, symbols[key][1]); return
+            table_to_update = table_to_update.parent
+        raise KeyError(f"Variable '{key}' not found in any accessible scope for assignment.")
+
 
-    def get_var(self, key: str) -> Tuple[Any, str]:
+    def get_var(self, key: str) -> Tuple[Any, ValueType]:
         """
         Gets the value and type of a variable.
         Traverses up the scope chain if not found locally.
         """
         current_scope = self
         while current_scope is not None:
+            if not isinstance(current_scope, SymbolTable): # A slot-based Frame further up the chain
+                return current_scope.get_var(key)
             if key in current_scope.symbols:
                 return current_scope.symbols[key]  # Returns (stored_value, declared_type_string)
             current_scope = current_scope.parent
@@ -83,4 +110,89 @@ class SymbolTable:
 
     def is_declared_locally(self, key: str) -> bool:
         """Checks if a variable is declared in the *current* (local) scope."""
-        return key in self.symbols
\ No newline at end of file
+        return key in self.symbols
+
+
+class ScopeLayout:
+    """
+    Static shape of one block scope, computed by the Resolver: the slot of every
+    variable the block declares and the type it was declared with.
+    """
+    def __init__(self):
+        self.names: Dict[str, int] = {}
+        self.types: List[str] = []
+
+    def add(self, key: str, var_type: ValueType) -> int:
+        """Returns the slot for key, allocating one on first declaration."""
+        slot = self.names.get(key)
+        if slot is None:
+            slot = len(self.types); self.names[key] = slot; self.types.append(var_type)
+        return slot
+
+    @property
+    def size(self) -> int:
+        return len(self.types)
+
+    def __repr__(self) -> str:
+        return f"ScopeLayout({list(self.names)})"
+
+
+class Frame:
+    """
+    Array-backed runtime scope. Resolved accesses index `values` directly; the
+    name-based SymbolTable interface is kept for show/solve and symbolic printing,
+    which look variables up by name at run time.
+
+    `display` lists the values of this frame and of the frames enclosing it,
+    indexed by lexical depth, so the tree-walker reads a (depth, slot) binding
+    with two list indexings (the VM keeps its own display as it pushes scopes).
+    """
+    def __init__(self, layout: ScopeLayout, parent: Optional[Any] = None):
+        self.layout = layout
+        self.blank: List[Any] = [UNDECLARED] * layout.size
+        self.values: List[Any] = self.blank[:]
+        self.parent = parent
+        self.display: List[List[Any]] = (parent.display if parent.__class__ is Frame else []) + [self.values]
+
+    def reset(self, parent: Optional[Any]) -> None:
+        """Empties the frame in place so it can be reused for another run of its block."""
+        self.values[:] = self.blank
+        self.parent = parent
+        self.display = (parent.display if parent.__class__ is Frame else []) + [self.values]
+
+    def declare(self, slot: int, key: str, var_type: ValueType, value: Any = None) -> None:
+        if self.values[slot] is not UNDECLARED:
+            raise KeyError(f"Variable '{key}' already declared in this scope.")
+        self.values[slot] = initial_value_for(var_type, value)
+
+    def create_var(self, key: str, var_type: ValueType, value: Any = None) -> None:
+        self.declare(self.layout.names[key], key, var_type, value)
+
+    def set_var(self, key: str, value_tuple: Tuple[Any, ValueType]) -> None:
+        slot = self.layout.names.get(key)
+        if slot is not None and self.values[slot] is not UNDECLARED:
+            new_value = value_tuple[0]
+            check_assignment_type(key, self.layout.types[slot], new_value)
+            self.values[slot] = new_value
+            return
+        if self.parent is not None:
+            return self.parent.set_var(key, value_tuple)
+        raise KeyError(f"Variable '{key}' not found in any accessible scope for assignment.")
+
+    def store(self, key: str, new_value: Any) -> None:
+        slot = self.layout.names.get(key)
+        if slot is not None and self.values[slot] is not UNDECLARED: self.values[slot] = new_value; return
+        if self.parent is not None: return self.parent.store(key, new_value)
+        raise KeyError(f"Variable '{key}' not found in any accessible scope for assignment.")
+
+    def get_var(self, key: str) -> Tuple[Any, ValueType]:
+        slot = self.layout.names.get(key)
+        if slot is not None and self.values[slot] is not UNDECLARED:
+            return self.values[slot], self.layout.types[slot]
+        if self.parent is not None:
+            return self.parent.get_var(key)
+        raise KeyError(f"Variable '{key}' not found in any accessible scope.")
+
+    def is_declared_locally(self, key: str) -> bool:
+        slot = self.layout.names.get(key)
+        return slot is not None and self.values[slot] is not UNDECLARED
@@ -1,6 +1,56 @@
 from dataclasses import dataclass
+from enum import IntEnum
+
+class TokenType(IntEnum):
+    """Kinds of token. Token.ttype holds the plain int code; token_name() gives the name parser errors print."""
+    EOF = 0
+    NEWLINE = 1
+    IDENTIFIER = 2
+    INT_LITERAL = 3
+    BOOL_LITERAL = 4
+    BEGIN_KEYWORD = 5
+    END_KEYWORD = 6
+    TYPE_INT = 7
+    TYPE_BOOL = 8
+    TYPE_EQ = 9
+    IF_KEYWORD = 10
+    ELIF_KEYWORD = 11
+    ELSE_KEYWORD = 12
+    WHILE_KEYWORD = 13
+    PRINT_CMD = 14
+    SHOW_CMD = 15
+    SOLVE_CMD = 16
+    INPUT_CMD = 17
+    OPERATOR_ASSIGN = 18
+    OPERATOR_PLUS = 19
+    OPERATOR_MINUS = 20
+    OPERATOR_MULT = 21
+    OPERATOR_DIV = 22
+    OPERATOR_EQ = 23
+    OPERATOR_NEQ = 24
+    OPERATOR_LT = 25
+    OPERATOR_GT = 26
+    OPERATOR_LTE = 27
+    OPERATOR_GTE = 28
+    OPERATOR_AND = 29
+    OPERATOR_OR = 30
+    OPERATOR_LOGICAL_NOT = 31
+    OPERATOR_RANGE = 32
+    LPAREN = 33
+    RPAREN = 34
+    COMMA = 35
+
+# Every kind as a module-level int (EOF, IDENTIFIER, ...): reading a global is
+# several times faster than TokenType.IDENTIFIER, and exact ints compare and hash
+# on CPython's fast path, where IntEnum members do not.
+globals().update({name: member.value for name, member in TokenType.__members__.items()})
+
+def token_name(ttype: int) -> str:
+    return TokenType(ttype).name
 
 @dataclass
 class Token:
-    ttype : str
-    value : str
\ No newline at end of file
+    ttype : TokenType
+    value : str
+    line : int = 0   # 1-based line of the token's first character
+    column : int = 0 # 1-based column of the token's first character
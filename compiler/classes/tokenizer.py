@@ -1,42 +1,89 @@
-from classes.token_ import Token 
+from classes.token_ import *
 
 class Tokenizer:
     source: str
     pos: int
     next: Token 
+    offset: int = 0 # absolute position of source[0]; non-zero only for buffered (streaming) subclasses
 
     RESERVED_KEYWORDS = {
-        "BEGIN": "BEGIN_KEYWORD",
-        "END": "END_KEYWORD",
-        "int": "TYPE_INT",
-        "bool": "TYPE_BOOL",
-        "eq": "TYPE_EQ",
-        "if": "IF_KEYWORD",
-        "elif": "ELIF_KEYWORD",
-        "else": "ELSE_KEYWORD",
-        "while": "WHILE_KEYWORD",
-        "print": "PRINT_CMD",
-        "show": "SHOW_CMD",
-        "solve": "SOLVE_CMD",
-        "input": "INPUT_CMD", 
-        "true": "BOOL_LITERAL", 
-        "false": "BOOL_LITERAL", 
+        "BEGIN": BEGIN_KEYWORD,
+        "END": END_KEYWORD,
+        "int": TYPE_INT,
+        "bool": TYPE_BOOL,
+        "eq": TYPE_EQ,
+        "if": IF_KEYWORD,
+        "elif": ELIF_KEYWORD,
+        "else": ELSE_KEYWORD,
+        "while": WHILE_KEYWORD,
+        "print": PRINT_CMD,
+        "show": SHOW_CMD,
+        "solve": SOLVE_CMD,
+        "input": INPUT_CMD, 
+        "true": BOOL_LITERAL, 
+        "false": BOOL_LITERAL, 
+    }
+
+    OPERATORS = {
+        "==": OPERATOR_EQ, "!=": OPERATOR_NEQ, "<=": OPERATOR_LTE, ">=": OPERATOR_GTE,
+        "&&": OPERATOR_AND, "||": OPERATOR_OR, "..": OPERATOR_RANGE, "=": OPERATOR_ASSIGN, "!": OPERATOR_LOGICAL_NOT,
+        "<": OPERATOR_LT, ">": OPERATOR_GT, "+": OPERATOR_PLUS, "-": OPERATOR_MINUS,
+        "*": OPERATOR_MULT, "/": OPERATOR_DIV, "(": LPAREN, ")": RPAREN, ",": COMMA,
     }
 
     def __init__(self, source: str): 
         self.source = source
         self.pos = 0 
         self.next = None 
+        self.line = 1        # line of self.pos
+        self.line_start = 0  # offset where that line starts
+        self.token_start = 0 # offset of the token being scanned
         self.select_next() 
 
 
+    def __iter__(self):
+        """Yields the remaining tokens lazily, ending with EOF."""
+        while True:
+            yield self.next
+            if self.next.ttype == EOF: return
+            self.select_next()
+
     def select_next(self) -> None:
+        self.scan()
+        self.stamp_position(self.next)
+
+    def stamp_position(self, token: Token) -> None:
+        """Records where token starts and advances the line counter past NEWLINE tokens."""
+        token.line = self.line; token.column = self.token_start - self.line_start + 1
+        if token.ttype == NEWLINE:
+            self.line += self.source.count("\n", self.token_start, self.pos)
+            self.line_start = self.source.rindex("\n", self.token_start, self.pos) + 1
+
+    def skip_blank_lines(self, pos: int) -> int:
+        """
+        Returns the end of the blank or comment-only lines starting at pos. They
+        belong to the NEWLINE token before them: the parser treats a run of line
+        breaks like a single one, so there is no point in a token per line.
+        """
+        end = pos
+        while pos < len(self.source):
+            char = self.source[pos]
+            if char == '\n': pos += 1; end = pos
+            elif char.isspace(): pos += 1
+            elif self.source.startswith("//", pos):
+                pos = self.source.find('\n', pos)
+                if pos == -1: break
+            else: break
+        return end
+
+    def scan(self) -> None:
         while self.pos < len(self.source):
+            self.token_start = self.pos
             char = self.source[self.pos]
 
             if char == '\n':
-                self.next = Token("NEWLINE", "\n")
-                self.pos += 1
+                self.next = Token(NEWLINE, "\n")
+                self.pos = self.skip_blank_lines(self.pos + 1)
                 return
 
             if char.isspace(): 
@@ -49,70 +96,13 @@ class Tokenizer:
                     self.pos += 1
                 continue 
             
-            if self.pos + 1 < len(self.source):
-                two_char_op = self.source[self.pos : self.pos + 2]
-                if two_char_op == "==":
-                    self.next = Token("OPERATOR_EQ", "==")
-                    self.pos += 2
-                    return
-                if two_char_op == "!=": # This is NOT EQUAL comparison
-                    self.next = Token("OPERATOR_NEQ", "!=")
-                    self.pos += 2
-                    return
-                if two_char_op == "<=":
-                    self.next = Token("OPERATOR_LTE", "<=")
-                    self.pos += 2
-                    return
-                if two_char_op == ">=":
-                    self.next = Token("OPERATOR_GTE", ">=")
-                    self.pos += 2
-                    return
-                if two_char_op == "&&":
-                    self.next = Token("OPERATOR_AND", "&&")
-                    self.pos += 2
-                    return
-                if two_char_op == "||":
-                    self.next = Token("OPERATOR_OR", "||")
-                    self.pos += 2
-                    return
-
-            # Single-character operators and delimiters
-            if char == '=': # This is ASSIGNMENT
-                self.next = Token("OPERATOR_ASSIGN", "=")
-                self.pos += 1
-                return
-            if char == '!': # <<< NEW: Logical NOT operator
-                self.next = Token("OPERATOR_LOGICAL_NOT", "!")
-                self.pos += 1
-                return
-            if char == '<':
-                self.next = Token("OPERATOR_LT", "<")
-                self.pos += 1
-                return
-            if char == '>':
-                self.next = Token("OPERATOR_GT", ">")
-                self.pos += 1
-                return
-            if char in ['+', '-', '*', '/']:
-                op_type = ""
-                if char == '+': op_type = "OPERATOR_PLUS"
-                elif char == '-': op_type = "OPERATOR_MINUS" # Could be unary or binary
-                elif char == '*': op_type = "OPERATOR_MULT"
-                elif char == '/': op_type = "OPERATOR_DIV"
-                self.next = Token(op_type, char)
-                self.pos += 1
-                return
-            if char == '(':
-                self.next = Token("LPAREN", "(")
-                self.pos += 1
-                return
-            if char == ')':
-                self.next = Token("RPAREN", ")")
-                self.pos += 1
-                return
-            if char == ',':
-                self.next = Token("COMMA", ",")
-                self.pos += 1
+            # Operators and delimiters: two-character ones first, so '==' is not read as '=' '='
+            text = self.source[self.pos:self.pos + 2]
+            if text not in self.OPERATORS: text = char
+            token_type = self.OPERATORS.get(text)
+            if token_type is not None:
+                self.next = Token(token_type, text)
+                self.pos += len(text)
                 return
             
             if char.isdigit():
@@ -120,7 +110,7 @@ class Tokenizer:
                 while self.pos < len(self.source) and self.source[self.pos].isdigit():
                     num_str += self.source[self.pos]
                     self.pos += 1
-                self.next = Token("INT_LITERAL", int(num_str))
+                self.next = Token(INT_LITERAL, int(num_str))
                 return
             
             if char.isalpha() or char == '_': 
@@ -130,15 +120,16 @@ class Tokenizer:
                     ident_str += self.source[self.pos]
                     self.pos += 1
                 token_type = Tokenizer.RESERVED_KEYWORDS.get(ident_str)
-                if token_type:
-                    if token_type == "BOOL_LITERAL":
+                if token_type is not None:
+                    if token_type == BOOL_LITERAL:
                         self.next = Token(token_type, True if ident_str == "true" else False)
                     else:
                         self.next = Token(token_type, ident_str) 
                 else:
-                    self.next = Token("IDENTIFIER", ident_str)
+                    self.next = Token(IDENTIFIER, ident_str)
                 return
             
-            raise ValueError(f"Lexical Error: Unexpected character '{char}' at position {self.pos}")
+            raise ValueError(f"Lexical Error: Unexpected character '{char}' at position {self.offset + self.pos}")
 
-        self.next = Token("EOF", "") 
\ No newline at end of file
+        self.token_start = self.pos
+        self.next = Token(EOF, "") 
\ No newline at end of file
@@ -0,0 +1,165 @@
+from classes.ops import *
+from classes.node import Node, postorder
+from classes.resolver import Resolver
+from typing import List, Optional, Tuple
+
+class KhwarizmiTypeError(Exception):
+    """Type errors found before the program runs; `errors` holds one message per error, in program order."""
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors)); self.errors = errors
+
+class TypeChecker:
+    """
+    Static type inference over a resolved program, run before the Optimizer so
+    that branches it drops are checked too. The Optimizer only replaces
+    subtrees with literals or with one of their own operands, which keep their
+    annotations, so the results below stay valid on the optimized program.
+
+    The static type of an expression is INT_TYPE or BOOL_TYPE when it always
+    evaluates to a concrete value of that type, EQ_REPR_TYPE when it is always
+    symbolic (it reads an 'eq' variable), and None when that is only known at run
+    time: an int/bool variable declared without an initializer stays symbolic
+    until it is assigned, and unresolved names are looked up by name.
+
+    Operations the program would certainly reject once it reaches them (1 + true,
+    int x = true, while 3, assigning an 'eq' to an int, ...) are reported with the
+    line and column of their statement, all together, as a KhwarizmiTypeError
+    raised before anything runs. Their messages are the run-time ones.
+
+    Results are stored on the nodes, for the unchecked paths of the tree-walker
+    and the bytecode compiler:
+      BinOpNode.operation, UnOpNode.operation -> (function, result type) from
+                          BINARY_OPERATIONS/UNARY_OPERATIONS, when the operands are
+                          statically concrete and of the operator's type
+      BinOpNode.symbolic, UnOpNode.symbolic -> the operator is always symbolic, so it
+                          evaluates to itself, and its operands are pure (see
+                          static_type): they need not be evaluated at all
+      VarDecNode.typed, AssignmentNode.typed -> the int/bool value always has the
+                          declared type, so storing it needs no check
+    'eq' bodies and show/solve arguments are left alone, as in the Resolver.
+    """
+    def __init__(self):
+        self.errors: List[str] = []
+        self.position: Optional[Tuple[int, int]] = None # of the statement being checked
+
+    def report(self, message: str) -> None:
+        if self.position is None: self.errors.append(message)
+        else: self.errors.append(f"line {self.position[0]}, column {self.position[1]}: {message}")
+
+    # --- Statements ---
+
+    def check_block(self, block: BlockNode) -> None:
+        for stmt_node in block.children: self.check_statement(stmt_node)
+
+    def check_statement(self, node: Node) -> None:
+        self.position = getattr(node, "position", None)
+        if isinstance(node, VarDecNode):
+            if node.type_name_str != EQ_TYPE and node.init_expression:
+                node.typed = self.check_value(node.var_name, node.type_name_str, node.init_expression)
+        elif isinstance(node, AssignmentNode):
+            target = node.children[0]
+            if target.binding is not None and target.declared_type != EQ_TYPE:
+                node.typed = self.check_value(target.value, target.declared_type, node.children[1])
+        elif isinstance(node, PrintCmdNode):
+            for arg_node in node.children[0].children: self.static_type(arg_node)
+        elif isinstance(node, IfNode):
+            self.check_condition(node.condition, node.condition_message); self.check_block(node.if_block)
+            for elif_node in node.elif_clauses:
+                self.position = elif_node.position
+                self.check_condition(elif_node.condition, "Elif condition must be boolean."); self.check_block(elif_node.block)
+            if node.else_block: self.check_block(node.else_block)
+        elif isinstance(node, WhileNode):
+            self.check_condition(node.children[0], "While condition must be boolean."); self.check_block(node.children[1])
+        elif isinstance(node, BlockNode):
+            self.check_block(node)
+
+    def check_value(self, name: str, declared_type: ValueType, expression: Node) -> bool:
+        """Checks a value stored in an int/bool variable; True if it always has the declared type."""
+        value_type = self.static_type(expression)
+        if value_type == EQ_REPR_TYPE: self.report(f"Cannot assign symbolic expression to non-eq variable '{name}'.")
+        elif value_type is not None and value_type != declared_type:
+            self.report(f"Type mismatch for '{name}'. Expected '{type_name(declared_type)}', got '{type_name(value_type)}'.")
+        return value_type == declared_type
+
+    def check_condition(self, condition: Node, message: str) -> None:
+        condition_type = self.static_type(condition)
+        if condition_type is not None and condition_type != BOOL_TYPE: self.report(message)
+
+    # --- Expressions ---
+
+    def static_type(self, root: Node) -> Optional[ValueType]:
+        """
+        root's static type, annotating its operators on the way (post-order, as
+        Optimizer.static_type). Alongside each type it tracks whether the subtree
+        is pure: evaluating it reads no input and cannot fail. An always-symbolic
+        operator over pure operands is marked symbolic; one over an input() or a
+        division that may fail still evaluates them, for their effect.
+        """
+        types: List[Optional[ValueType]] = []; pure: List[bool] = []
+        for node in postorder(root):
+            if isinstance(node, BinOpNode):
+                right_type = types.pop(); right_pure = pure.pop()
+                types[-1] = self.binary_type(node, types[-1], right_type)
+                pure[-1] = self.mark_symbolic(node, types[-1], pure[-1] and right_pure)
+            elif isinstance(node, UnOpNode):
+                types[-1] = self.unary_type(node, types[-1])
+                pure[-1] = self.mark_symbolic(node, types[-1], pure[-1])
+            else:
+                del types[len(types) - len(node.children):]; del pure[len(pure) - len(node.children):] # operands of a node typed as a whole
+                types.append(self.leaf_type(node))
+                pure.append(not isinstance(node, InputNode) and not (isinstance(node, IdentifierNode) and node.binding is None))
+        return types[0]
+
+    @staticmethod
+    def mark_symbolic(node: Node, node_type: Optional[ValueType], operands_pure: bool) -> bool:
+        """Sets node.symbolic when it applies; returns whether node itself is pure."""
+        if node_type == EQ_REPR_TYPE: node.symbolic = operands_pure; return operands_pure # symbolic operators never compute
+        if node.operation is None or not operands_pure: return False # may raise a type error at run time
+        return node.value != "/" or (isinstance(node.right, IntLiteralNode) and node.right.value != 0)
+
+    @staticmethod
+    def leaf_type(node: Node) -> Optional[ValueType]:
+        if isinstance(node, IntLiteralNode) or isinstance(node, InputNode): return INT_TYPE
+        if isinstance(node, BoolLiteralNode): return BOOL_TYPE
+        if isinstance(node, EquationNode): return EQ_REPR_TYPE
+        if isinstance(node, IdentifierNode) and node.binding is not None:
+            if node.declared_type == EQ_TYPE: return EQ_REPR_TYPE
+            if node.always_assigned: return node.declared_type
+        return None
+
+    @staticmethod
+    def annotated_type(node: Node) -> Optional[ValueType]:
+        """Concrete static type of an already checked expression, read off its root; None if not proven concrete."""
+        if isinstance(node, (BinOpNode, UnOpNode)): return node.operation[1] if node.operation is not None else None
+        leaf_type = TypeChecker.leaf_type(node)
+        return None if leaf_type == EQ_REPR_TYPE else leaf_type
+
+    def binary_type(self, node: BinOpNode, left_type: Optional[ValueType], right_type: Optional[ValueType]) -> Optional[ValueType]:
+        if left_type == EQ_REPR_TYPE or right_type == EQ_REPR_TYPE: return EQ_REPR_TYPE # symbolic whatever the other side is
+        if left_type is None or right_type is None: return None
+        operation = BINARY_OPERATIONS[node.value].get(left_type) if left_type == right_type and node.value in BINARY_OPERATIONS else None
+        if operation is None:
+            try: apply_binary_operator(node.value, None, left_type, None, right_type) # raises the run-time message
+            except KhwarizmiRuntimeError as e: self.report(str(e))
+            return None
+        node.operation = operation
+        return operation[1]
+
+    def unary_type(self, node: UnOpNode, operand_type: Optional[ValueType]) -> Optional[ValueType]:
+        if operand_type is None or operand_type == EQ_REPR_TYPE: return operand_type
+        operation = UNARY_OPERATIONS[node.value].get(operand_type) if node.value in UNARY_OPERATIONS else None
+        if operation is None:
+            try: apply_unary_operator(node.value, None, operand_type)
+            except KhwarizmiRuntimeError as e: self.report(str(e))
+            return None
+        node.operation = operation
+        return operation[1]
+
+    @staticmethod
+    def run(program: ProgramNode) -> ProgramNode:
+        """Checks and annotates program in place; raises KhwarizmiTypeError listing every error found."""
+        Resolver.run(program)
+        checker = TypeChecker()
+        checker.check_block(program.children[0])
+        if checker.errors: raise KhwarizmiTypeError(checker.errors)
+        return program
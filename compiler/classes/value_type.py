@@ -0,0 +1,26 @@
+from enum import IntEnum
+
+class ValueType(IntEnum):
+    """
+    Type of a runtime value, as evaluate() returns it next to the value, and the
+    declared type of a variable (INT, BOOL or EQ). EQ_REPR marks a symbolic
+    value: the value is then an AST, e.g. an 'eq' body or an unassigned name.
+    """
+    INT = 0
+    BOOL = 1
+    EQ = 2
+    EQ_REPR = 3
+
+# The evaluators pass these codes around as plain ints: CPython compares and
+# hashes an exact int on its fast path, an IntEnum member through the slower
+# int-subclass route. type_name() turns a code back into the language's name.
+INT_TYPE = ValueType.INT.value
+BOOL_TYPE = ValueType.BOOL.value
+EQ_TYPE = ValueType.EQ.value
+EQ_REPR_TYPE = ValueType.EQ_REPR.value
+
+TYPE_NAMES = tuple(member.name.lower() for member in ValueType)
+
+def type_name(value_type: int) -> str:
+    """'int', 'bool', 'eq' or 'eq_repr', as error messages show a type."""
+    return TYPE_NAMES[value_type]
@@ -0,0 +1,187 @@
+from classes.bytecode import *
+from classes.ops import (KhwarizmiRuntimeError, apply_binary_operator, apply_unary_operator, read_input_int,
+                         format_print_args, report_runtime_error)
+from classes.output import write_line, flush_output
+from classes.symbol_table import SymbolTable, Frame, UNASSIGNED
+from classes.node import Node
+from typing import Any
+
+# The VM stack holds raw Python values instead of (value, "type") tuples.
+# The Khwarizmi type is recovered from the value itself: bool -> BOOL_TYPE, int -> INT_TYPE,
+# anything else (an AST Node, or None for an uninitialised 'eq') -> EQ_REPR_TYPE.
+
+def value_type(value: Any) -> ValueType:
+    if value.__class__ is bool: return BOOL_TYPE
+    if value.__class__ is int: return INT_TYPE
+    return EQ_REPR_TYPE
+
+
+def binary_slow_path(node: Node, left_val: Any, right_val: Any) -> Any:
+    """Mirrors BinOpNode.evaluate for operands that are not both plain ints."""
+    left_type = value_type(left_val); right_type = value_type(right_val)
+    if left_type == EQ_REPR_TYPE or right_type == EQ_REPR_TYPE: return node
+    return apply_binary_operator(node.value, left_val, left_type, right_val, right_type)[0]
+
+
+def unary_slow_path(node: Node, val: Any) -> Any:
+    """Mirrors UnOpNode.evaluate for operands of an unexpected type."""
+    type_str = value_type(val)
+    if type_str == EQ_REPR_TYPE: return node
+    return apply_unary_operator(node.value, val, type_str)[0]
+
+
+class VM:
+    """Stack-based interpreter for Bytecode produced by classes.bytecode.Compiler."""
+    recycle_frames = True # Reuse one Frame per block layout instead of allocating one per block entry
+
+    def __init__(self, bytecode: Bytecode):
+        self.bytecode = bytecode
+
+    def run(self, symbol_table: SymbolTable) -> None:
+        try: self.execute(symbol_table)
+        except Exception as e: report_runtime_error(e)
+        finally: flush_output()
+
+    def execute(self, symbol_table: SymbolTable) -> None:
+        code = self.bytecode.instructions
+        stack = []; push = stack.append; pop = stack.pop
+        # Resolved variables live in array-backed Frames; display[depth] is the value list of the
+        # innermost frame at that lexical depth, so a (depth, slot) access is two list indexings.
+        scope = Frame(self.bytecode.layout, parent=symbol_table)
+        display = [scope.values]
+        # Blocks are never re-entered while running (no calls/recursion), so one Frame per layout suffices.
+        frame_pool = {}; recycle_frames = self.recycle_frames
+        # Opcodes bound to locals: module globals would cost a dict lookup per comparison.
+        (LOAD_VAR_, LOAD_CONST_, ADD_, SUB_, MUL_, DIV_, EQ_, NEQ_, LT_, GT_, LTE_, GTE_, AND_, OR_, NEG_, NOT_,
+         JUMP_, JUMP_IF_FALSE_, PUSH_SCOPE_, POP_SCOPE_, ASSIGN_BEGIN_, STORE_, PRINT_, INPUT_,
+         DECLARE_, DECLARE_INIT_, DECLARE_EQ_, EXEC_NODE_, BINARY_CONST_, HALT_, LOAD_SLOT_, STORE_SLOT_, STORE_EQ_SLOT_,
+         BINARY_TYPED_, BINARY_CONST_TYPED_, UNARY_TYPED_, LOAD_SLOT_TYPED_, STORE_SLOT_TYPED_, DECLARE_TYPED_, JUMP_IF_FALSE_TYPED_) = \
+            (LOAD_VAR, LOAD_CONST, ADD, SUB, MUL, DIV, EQ, NEQ, LT, GT, LTE, GTE, AND, OR, NEG, NOT,
+             JUMP, JUMP_IF_FALSE, PUSH_SCOPE, POP_SCOPE, ASSIGN_BEGIN, STORE, PRINT, INPUT,
+             DECLARE, DECLARE_INIT, DECLARE_EQ, EXEC_NODE, BINARY_CONST, HALT, LOAD_SLOT, STORE_SLOT, STORE_EQ_SLOT,
+             BINARY_TYPED, BINARY_CONST_TYPED, UNARY_TYPED, LOAD_SLOT_TYPED, STORE_SLOT_TYPED, DECLARE_TYPED, JUMP_IF_FALSE_TYPED)
+        pc = 0
+        while True:
+            opcode, arg = code[pc]
+            pc += 1
+            # Type-checked code first: the operand types are known, so these only compute.
+            if opcode == LOAD_SLOT_TYPED_:
+                push(display[arg[0]][arg[1]])
+            elif opcode == BINARY_CONST_TYPED_:
+                stack[-1] = arg[0](stack[-1], arg[1])
+            elif opcode == BINARY_TYPED_:
+                right = pop(); stack[-1] = arg(stack[-1], right)
+            elif opcode == JUMP_IF_FALSE_TYPED_:
+                if not pop(): pc = arg
+            elif opcode == STORE_SLOT_TYPED_:
+                display[arg[0]][arg[1]] = pop()
+            elif opcode == UNARY_TYPED_:
+                stack[-1] = arg(stack[-1])
+            elif opcode == DECLARE_TYPED_:
+                scope.declare(arg[0], arg[1], arg[2], pop())
+            elif opcode == LOAD_SLOT_:
+                value = display[arg[0]][arg[1]]
+                push(arg[2] if value is UNASSIGNED else value)
+            elif opcode == LOAD_VAR_:
+                try: value, _ = scope.get_var(arg[0])
+                except KeyError: raise KhwarizmiRuntimeError(f"Undeclared identifier '{arg[0]}' used.")
+                push(arg[1] if value is UNASSIGNED else value)
+            elif opcode == LOAD_CONST_:
+                push(arg)
+            elif opcode == BINARY_CONST_:
+                left = stack[-1]
+                if left.__class__ is int: stack[-1] = arg[0](left, arg[2])
+                else: stack[-1] = binary_slow_path(arg[1], left, arg[2])
+            elif opcode <= DIV_:
+                right = pop(); left = stack[-1]
+                if left.__class__ is int and right.__class__ is int:
+                    if opcode == ADD_: stack[-1] = left + right
+                    elif opcode == SUB_: stack[-1] = left - right
+                    elif opcode == MUL_: stack[-1] = left * right
+                    else:
+                        if right == 0: raise ZeroDivisionError("Khwarizmi: Division by zero.")
+                        stack[-1] = left // right
+                else: stack[-1] = binary_slow_path(arg, left, right)
+            elif opcode <= GTE_:
+                right = pop(); left = stack[-1]
+                if left.__class__ is int and right.__class__ is int:
+                    if opcode == LT_: stack[-1] = left < right
+                    elif opcode == LTE_: stack[-1] = left <= right
+                    elif opcode == GT_: stack[-1] = left > right
+                    elif opcode == GTE_: stack[-1] = left >= right
+                    elif opcode == EQ_: stack[-1] = left == right
+                    else: stack[-1] = left != right
+                else: stack[-1] = binary_slow_path(arg, left, right)
+            elif opcode == JUMP_IF_FALSE_:
+                condition = pop()
+                if condition.__class__ is not bool: raise KhwarizmiRuntimeError(arg[1])
+                if not condition: pc = arg[0]
+            elif opcode == JUMP_:
+                pc = arg
+            elif opcode == STORE_SLOT_:
+                depth, slot, name, declared_type = arg
+                new_value = pop(); new_type = value_type(new_value)
+                if declared_type != new_type:
+                    if isinstance(new_value, Node) and new_type == EQ_REPR_TYPE:
+                        raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{name}'.")
+                    raise KhwarizmiRuntimeError(f"Type mismatch for '{name}'. Expected '{type_name(declared_type)}', got '{type_name(new_type)}'.")
+                display[depth][slot] = new_value
+            elif opcode == PUSH_SCOPE_:
+                frame = frame_pool.get(arg) if recycle_frames else None
+                if frame is None: frame = frame_pool[arg] = Frame(arg, parent=scope)
+                else: frame.reset(scope)
+                scope = frame; display.append(frame.values)
+            elif opcode == POP_SCOPE_:
+                scope = scope.parent; display.pop()
+            elif opcode == STORE_EQ_SLOT_:
+                # RHS for 'eq' assignment is the AST itself, not its evaluated value
+                display[arg[0]][arg[1]] = arg[2]
+            elif opcode == ASSIGN_BEGIN_:
+                name, rhs_ast, skip_target = arg
+                _, declared_type = scope.get_var(name)
+                if declared_type == EQ_TYPE:
+                    # RHS for 'eq' assignment is the AST itself, not its evaluated value
+                    scope.set_var(name, (rhs_ast, EQ_TYPE)); pc = skip_target
+                else: push(declared_type)
+            elif opcode == STORE_:
+                new_value = pop(); declared_type = pop(); new_type = value_type(new_value)
+                if isinstance(new_value, Node) and new_type == EQ_REPR_TYPE:
+                    raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{arg}'.")
+                if declared_type == INT_TYPE and new_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{arg}'. Expected 'int', got '{type_name(new_type)}'.")
+                if declared_type == BOOL_TYPE and new_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{arg}'. Expected 'bool', got '{type_name(new_type)}'.")
+                scope.set_var(arg, (new_value, declared_type))
+            elif opcode == AND_ or opcode == OR_:
+                right = pop(); left = stack[-1]
+                if left.__class__ is bool and right.__class__ is bool:
+                    stack[-1] = (left and right) if opcode == AND_ else (left or right)
+                else: stack[-1] = binary_slow_path(arg, left, right)
+            elif opcode == NEG_:
+                operand = stack[-1]
+                stack[-1] = -operand if operand.__class__ is int else unary_slow_path(arg, operand)
+            elif opcode == NOT_:
+                operand = stack[-1]
+                stack[-1] = (not operand) if operand.__class__ is bool else unary_slow_path(arg, operand)
+            elif opcode == PRINT_:
+                values = stack[len(stack) - arg:] if arg else []
+                if arg: del stack[len(stack) - arg:]
+                write_line(format_print_args([(value, value_type(value)) for value in values], scope))
+            elif opcode == INPUT_:
+                push(read_input_int())
+            elif opcode == DECLARE_INIT_:
+                slot, name, type_str = arg
+                init_val = pop(); init_type = value_type(init_val)
+                if isinstance(init_val, Node) and init_type == EQ_REPR_TYPE:
+                    raise KhwarizmiRuntimeError(f"Cannot assign symbolic expression to non-eq variable '{name}'.")
+                if type_str == INT_TYPE and init_type != INT_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{name}'. Expected 'int', got '{type_name(init_type)}'.")
+                if type_str == BOOL_TYPE and init_type != BOOL_TYPE: raise KhwarizmiRuntimeError(f"Type mismatch for '{name}'. Expected 'bool', got '{type_name(init_type)}'.")
+                scope.declare(slot, name, type_str, init_val)
+            elif opcode == DECLARE_:
+                scope.declare(arg[0], arg[1], arg[2], None)
+            elif opcode == DECLARE_EQ_:
+                scope.declare(arg[0], arg[1], EQ_TYPE, arg[2])
+            elif opcode == EXEC_NODE_:
+                arg.evaluate(scope)
+            elif opcode == HALT_:
+                return
+            else:
+                raise KhwarizmiRuntimeError(f"VM: unknown opcode {opcode}.")
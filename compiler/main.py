@@ -1,7 +1,20 @@
+import io
 import sys
+import argparse
+from typing import Union
 from classes.parser import Parser
+from classes.flat_ast import FlatAST, FlatBuilder
 from classes.symbol_table import SymbolTable
 from classes.ops import ProgramNode
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.codegen import CodeGenerator
+from classes.output import FileSink, set_sink
+from classes.input_source import FileSource, set_input_source
+from classes.profiler import Profiler
+from classes.ast_cache import ASTCache
+from classes.optimizer import Optimizer
+from classes.type_checker import TypeChecker, KhwarizmiTypeError
 
 def main() -> None:
     if len(sys.argv) < 2:
@@ -9,10 +22,25 @@ def main() -> None:
         print("Usage: python main.py <filepath.kh>")
         sys.exit(1)
 
-    filepath = sys.argv[1]
+    arg_parser = argparse.ArgumentParser(prog="main.py", description="Khwarizmi Language Compiler")
+    arg_parser.add_argument("filepath", help="Khwarizmi source file (.kh)")
+    engine = arg_parser.add_mutually_exclusive_group()
+    engine.add_argument("--vm", action="store_true", help="compile to bytecode and run it on the stack VM")
+    engine.add_argument("--codegen", action="store_true", help="compile to a Python function and run it natively")
+    engine.add_argument("--profile", action="store_true", help="run on the tree-walker and report execution counts and time per statement (on stderr)")
+    arg_parser.add_argument("--profile-stacks", metavar="PATH", help="with --profile, also write the time per statement stack to PATH, in flamegraph's collapsed format")
+    arg_parser.add_argument("--flat-ast", action="store_true", help="run on the array-backed AST, for very large programs (cached as a memory-mapped file; the Node tree is only built while the program is checked)")
+    arg_parser.add_argument("--input-file", metavar="PATH", help="read input() values from PATH, one per line, instead of stdin")
+    arg_parser.add_argument("--output", metavar="PATH", help="write the program's output to PATH instead of stdout")
+    arg_parser.add_argument("--opt-stats", action="store_true", help="report what the AST optimizer rewrote (on stderr)")
+    arg_parser.add_argument("--no-cache", action="store_true", help="always parse the source; do not read or write the AST cache")
+    arg_parser.add_argument("--cache-dir", help=f"AST cache directory (default: {ASTCache.DEFAULT_DIR_NAME}/ next to the source file)")
+    args = arg_parser.parse_args()
+    if args.profile_stacks and not args.profile: arg_parser.error("--profile-stacks requires --profile")
+
+    filepath = args.filepath
     try:
-        with open(filepath, 'r') as f:
-            source_code = f.read()
+        source_file = open(filepath, 'rb')
     except FileNotFoundError:
         print(f"Error: Source file not found at '{filepath}'")
         sys.exit(1)
@@ -20,9 +48,19 @@ def main() -> None:
         print(f"Error reading file '{filepath}': {e}")
         sys.exit(1)
 
-    ast_root: ProgramNode
+    ast_root: Union[ProgramNode, FlatAST]
     try:
-        ast_root = Parser.run(source_code)
+        cache = None if args.no_cache else ASTCache(args.cache_dir or ASTCache.default_dir(filepath))
+        with source_file:
+            source_hash = ASTCache.source_hash(source_file) if cache else None
+            ast_root = (cache.load_flat if args.flat_ast else cache.load)(source_hash) if cache else None
+            if ast_root is None:
+                # The source is lexed in chunks as the parser consumes it
+                ast_root = Parser.run_stream(io.TextIOWrapper(source_file), builder=FlatBuilder() if args.flat_ast else None)
+                if cache: (cache.store_flat if args.flat_ast else cache.store)(source_hash, ast_root)
+    except UnicodeDecodeError as e:
+        print(f"Error reading file '{filepath}': {e}")
+        sys.exit(1)
     except SyntaxError as e: 
         print(f"Syntax Error: {e}")
         sys.exit(1)
@@ -32,15 +70,53 @@ def main() -> None:
     except Exception as e:
         print(f"Error during parsing/tokenization: {e}")
         sys.exit(1)
+    if isinstance(ast_root, FlatAST) and (args.vm or args.codegen or args.profile): ast_root = ast_root.to_program() # the compilers and the profiler work on Node trees
+    # Type errors are reported before anything runs; well-typed operations then run unchecked.
+    # The checker sees the program as written, branches the optimizer would drop included.
+    program = ast_root if isinstance(ast_root, ProgramNode) else ast_root.to_program()
+    try: TypeChecker.run(program)
+    except KhwarizmiTypeError as e:
+        for message in e.errors: print(f"Type Error: {message}")
+        sys.exit(1)
+    opt_stats = Optimizer.run(program)
+    # The array-backed AST runs the checked, optimized program, flattened again so the Node tree can go.
+    ast_root = program if isinstance(ast_root, ProgramNode) else FlatAST.from_program(program)
+    del program
+    if args.opt_stats:
+        print("Optimizer: " + ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in opt_stats.items()), file=sys.stderr)
     global_symbol_table = SymbolTable(parent=None) 
+    if args.input_file:
+        try: set_input_source(FileSource(args.input_file))
+        except OSError as e:
+            print(f"Error reading input file '{args.input_file}': {e}")
+            sys.exit(1)
+    if args.output:
+        try: output_sink = FileSink(args.output)
+        except OSError as e:
+            print(f"Error opening output file '{args.output}': {e}")
+            sys.exit(1)
+        set_sink(output_sink)
 
     try:
-        ast_root.evaluate(global_symbol_table)
+        if args.vm:
+            VM(Compiler.run(ast_root)).run(global_symbol_table)
+        elif args.codegen:
+            CodeGenerator.run(ast_root).run(global_symbol_table)
+        elif args.profile:
+            profiler = Profiler(); profiler.install()
+            try: ast_root.evaluate(global_symbol_table)
+            finally: profiler.uninstall()
+            print(profiler.report(), file=sys.stderr)
+            if args.profile_stacks: profiler.write_collapsed(args.profile_stacks)
+        else:
+            ast_root.evaluate(global_symbol_table)
     except Exception as e: 
         print(f"\n!! RUNTIME ERROR !!")
         print(f"Error Type: {type(e).__name__}")
         print(f"Message: {e}")
         sys.exit(1)
+    finally:
+        if args.output: output_sink.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Differential checks for the lexers, shared by tests/test_lexer.py and
+bench/lexer.py: Tokenizer and RegexTokenizer must produce the same token
+streams (type, value, line, column) or lexical errors, and so must
+RegexTokenizer and StreamTokenizer fed through tiny chunks. check() and
+check_stream() print each mismatch and return how many there were.
+"""
+import glob
+import io
+import os
+import random
+
+from classes.token_ import EOF
+from classes.tokenizer import Tokenizer
+from classes.regex_tokenizer import RegexTokenizer
+from classes.stream_tokenizer import StreamTokenizer
+
+TESTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "testes")
+
+FUZZ_FRAGMENTS = [
+    "BEGIN", "END", "int", "bool", "eq", "if", "elif", "else", "while", "print", "show", "solve", "input", "in",
+    "true", "false", "x", "y1", "_tmp", "valA", "truex", "BEGINS", "0", "7", "42", "007", "123456789012345678901234567890",
+    "==", "!=", "<=", ">=", "&&", "||", "=", "!", "<", ">", "+", "-", "*", "/", "(", ")", ",", "..",
+    " ", "  ", "\t", "\r", "\n", "\n\n", "\x0b", "\x0c", "\x1f", "// comment", "//", "/ /", "&", "|",
+    "é", "ção", " ", " ", "²", "٣", "Ⅳ", "$", "#", ";", ".", "{",
+]
+
+def token_stream(tokenizer_class, source):
+    """All tokens of source as tuples, or the lexical error it raises."""
+    try:
+        tokenizer = tokenizer_class(source); tokens = []
+        while True:
+            token = tokenizer.next
+            tokens.append((token.ttype, token.value, token.line, token.column))
+            if token.ttype == EOF: return tokens
+            tokenizer.select_next()
+    except ValueError as e: return f"{type(e).__name__}: {e}"
+
+def check_stream(sources, chunk_size: int = 3) -> int:
+    failures = 0
+    for name, source in sources:
+        expected = token_stream(RegexTokenizer, source)
+        actual = token_stream(lambda text: StreamTokenizer(io.StringIO(text), chunk_size), source)
+        if expected != actual:
+            failures += 1
+            print(f"STREAM MISMATCH in {name}: {source!r}\n  RegexTokenizer:  {expected}\n  StreamTokenizer: {actual}")
+    return failures
+
+def fuzz_source(rng: random.Random) -> str:
+    return "".join(rng.choice(FUZZ_FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+def check(sources) -> int:
+    failures = 0
+    for name, source in sources:
+        expected = token_stream(Tokenizer, source); actual = token_stream(RegexTokenizer, source)
+        if expected != actual:
+            failures += 1
+            print(f"MISMATCH in {name}: {source!r}\n  Tokenizer:      {expected}\n  RegexTokenizer: {actual}")
+    return failures
+
+def sources(fuzz_cases: int, seed: int = 1234):
+    """(name, source) for every program in testes/, then fuzz_cases random inputs."""
+    found = []
+    for path in sorted(glob.glob(os.path.join(TESTES_DIR, "**", "*.kh"), recursive=True)):
+        with open(path, "r") as f: found.append((os.path.relpath(path, TESTES_DIR), f.read()))
+    rng = random.Random(seed)
+    return found + [(f"fuzz #{i}", fuzz_source(rng)) for i in range(fuzz_cases)]
@@ -0,0 +1,25 @@
+"""
+Generated equations of many `c * v / d` terms over int variables, with their
+expected solve() output computed with fractions.Fraction; shared by
+tests/test_rational.py and bench/rational_terms.py.
+"""
+import math
+import random
+from fractions import Fraction
+
+X_COEFF = Fraction(7, 3)
+
+def equation(terms: int, exact: bool, rng: random.Random):
+    """Declarations and body of the equation, and its constant term as a Fraction."""
+    lines = []; parts = ["7 * x / 3"]; total = Fraction(0)
+    for i in range(terms):
+        value = rng.randint(-40, 40); d = rng.choice([2, 3, 4, 5, 6, 7, 9, 11]); c = rng.randint(1, 9) * (d if exact else 1)
+        lines.append(f"int v{i} = {value}"); parts.append(f"{c} * v{i} / {d}"); total += Fraction(c * value, d)
+    return lines, " + ".join(parts), total
+
+def expected_line(const: Fraction) -> str:
+    solution = -const / X_COEFF
+    if solution.denominator == 1: return f"x = {solution.numerator}"
+    # outcome_message prints -const/coeff over the common denominator of the two, unreduced
+    scale = X_COEFF.denominator * const.denominator // math.gcd(X_COEFF.denominator, const.denominator)
+    return f"No integer solution for x (result is {-const * scale}/{X_COEFF * scale})."
@@ -0,0 +1,85 @@
+"""
+Tests for the AST cache: entries round-trip every program in testes/ for both
+the tree-walker and --flat-ast, are never unpickled (a pickle planted under an
+entry's name is discarded without running), damaged entries are misses, and
+the compiler version follows the contents of classes/, not their mtimes.
+bench/ast_cache.py times cold and warm runs.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import glob
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import classes.ast_cache as ast_cache
+from classes.ast_cache import ASTCache, compiler_version
+from classes.parser import Parser
+from classes.flat_ast import FlatAST, FlatBuilder
+from classes.node import postorder
+
+TESTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "testes")
+
+def shape(program):
+    return [(type(node).__name__, node.value, getattr(node, "position", None)) for node in postorder(program)]
+
+class Planted:
+    """Unpickling this calls Planted.run: it must never happen."""
+    ran = False
+    @staticmethod
+    def run(): Planted.ran = True
+    def __reduce__(self): return Planted.run, ()
+
+class ASTCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory(); self.cache = ASTCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for path in sorted(glob.glob(os.path.join(TESTES_DIR, "**", "*.kh"), recursive=True)):
+            with open(path, "rb") as f: source_hash = ASTCache.source_hash(f); source = f.read().decode()
+            program = Parser.run(source)
+            self.cache.store(source_hash, program)
+            self.assertEqual(shape(self.cache.load(source_hash)), shape(program), path)
+            self.assertEqual(shape(self.cache.load_flat(source_hash).to_program()), shape(program), path)
+            self.cache.store_flat(source_hash, Parser.run(source, builder=FlatBuilder()))
+            self.assertEqual(shape(self.cache.load(source_hash)), shape(program), path)
+
+    def test_planted_pickle_is_not_run(self):
+        source_hash = "0" * 64; path = self.cache.entry_path(source_hash)
+        for data in (pickle.dumps(Planted()), b"KHC1" + pickle.dumps(Planted())):
+            with open(path, "wb") as entry: entry.write(data)
+            self.assertIsNone(self.cache.load(source_hash))
+            self.assertFalse(os.path.exists(path))
+        self.assertFalse(Planted.ran)
+
+    def test_damaged_entries_are_misses(self):
+        program = Parser.run("BEGIN\nint a = 1\nwhile a < 3\nBEGIN\na = a + 1\nEND\nprint(a)\nEND\n")
+        source_hash = "1" * 64; path = self.cache.entry_path(source_hash)
+        self.cache.store(source_hash, program)
+        with open(path, "rb") as entry: data = entry.read()
+        header_size = FlatAST.HEADER.size
+        for damaged in (data[:header_size + 5], data[:header_size] + b"\xff" * (len(data) - header_size), data + b"x"):
+            with open(path, "wb") as entry: entry.write(damaged)
+            self.assertIsNone(self.cache.load(source_hash))
+            self.assertFalse(os.path.exists(path))
+
+    def test_version_follows_module_contents(self):
+        with tempfile.TemporaryDirectory() as classes_dir, mock.patch.object(ast_cache, "CLASSES_DIR", classes_dir):
+            module = os.path.join(classes_dir, "ops.py")
+            def version(text: bytes) -> str:
+                with open(module, "wb") as f: f.write(text)
+                os.utime(module, ns=(0, 0)) # same size and mtime for every edit
+                compiler_version.cache_clear(); return compiler_version()
+            try: self.assertNotEqual(version(b"x = 1\n"), version(b"x = 2\n"))
+            finally: compiler_version.cache_clear()
+
+if __name__ == "__main__":
+    unittest.main()
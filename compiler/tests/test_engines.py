@@ -0,0 +1,162 @@
+"""
+Differential tests for the engines: the VM (--vm), the generated Python
+function (--codegen) and the array-backed AST (--flat-ast) must print exactly
+what the tree-walker prints, type errors and run-time errors included, on
+every program in testes/, on random programs and on programs past the nesting
+and expression-height limits where codegen falls back to the tree-walker. bench/codegen.py times the three engines.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import glob
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.node import postorder
+from classes.flat_ast import FlatAST, FlatBuilder
+from classes.type_checker import TypeChecker, KhwarizmiTypeError
+from classes.optimizer import Optimizer
+from classes.symbol_table import SymbolTable
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.codegen import CodeGenerator, MAX_NESTING, MAX_LOOP_NESTING
+from classes.ops import RECURSION_HEIGHT
+from classes.output import ListSink, set_sink
+from classes.input_source import IterableSource, set_input_source
+
+INPUTS = [5, 3, 2, 1, 4, 7]
+RANDOM_INPUTS = [(i * 37) % 23 - 11 for i in range(200)]
+
+ENGINES = {
+    "tree": lambda ast: ast.evaluate(SymbolTable()),
+    "vm": lambda ast: VM(Compiler.run(ast)).run(SymbolTable()),
+    "codegen": lambda ast: CodeGenerator.run(ast).run(SymbolTable()),
+    "flat": lambda ast: ast.evaluate(SymbolTable()),
+}
+
+def run(source: str, engine: str, inputs=INPUTS):
+    """Lines printed by source on engine, prepared as main.py does, reading inputs."""
+    ast = Parser.run(source, builder=FlatBuilder()).to_program() if engine == "flat" else Parser.run(source)
+    try: TypeChecker.run(ast)
+    except KhwarizmiTypeError as e: return [f"Type Error: {message}" for message in e.errors]
+    Optimizer.run(ast)
+    if engine == "flat": ast = FlatAST.from_program(ast)
+    sink = ListSink(); previous_sink = set_sink(sink); previous_source = set_input_source(IterableSource(inputs))
+    try: ENGINES[engine](ast)
+    finally: set_sink(previous_sink); set_input_source(previous_source)
+    return sink.lines
+
+def random_program(rng: random.Random) -> str:
+    """Declarations, assignments, prints, show(), if/elif/else and bounded while loops over int, bool and 'eq' variables."""
+    lines = ["BEGIN", "int x"]; ints = []; bools = []; eqs = []; counters = []; count = [0] # x stays free: 'eq' bodies use it
+    def int_expression(depth=0):
+        roll = rng.random()
+        if depth > 2 or roll < 0.3: return rng.choice(ints + counters) if ints and rng.random() < 0.6 else str(rng.randint(-5, 9))
+        if roll < 0.4: return "-" + int_expression(depth + 1)
+        if roll < 0.42 and eqs: return rng.choice(eqs)
+        if roll < 0.44: return "input()"
+        operator = rng.choice("+-*/")
+        right = str(rng.choice([1, 2, 3, -4, 7])) if operator == "/" and rng.random() < 0.8 else int_expression(depth + 1)
+        return f"({int_expression(depth + 1)} {operator} {right})"
+    def bool_expression(depth=0):
+        roll = rng.random()
+        if depth > 2 or roll < 0.25: return rng.choice(bools) if bools and rng.random() < 0.6 else rng.choice(["true", "false"])
+        if roll < 0.35: return "!" + bool_expression(depth + 1)
+        if roll < 0.7: return f"({int_expression(depth + 1)} {rng.choice(['<', '>', '<=', '>=', '==', '!='])} {int_expression(depth + 1)})"
+        return f"({bool_expression(depth + 1)} {rng.choice(['&&', '||', '==', '!='])} {bool_expression(depth + 1)})"
+    def block(statements, nesting):
+        saved = ints[:], bools[:], eqs[:], counters[:]
+        lines.append("BEGIN"); body(statements, nesting + 1); lines.append("END")
+        ints[:], bools[:], eqs[:], counters[:] = saved
+    def body(statements, nesting):
+        for _ in range(statements):
+            roll = rng.random(); count[0] += 1; name = f"v{count[0]}"
+            if roll < 0.15: lines.append(f"int {name}" + (f" = {int_expression()}" if rng.random() < 0.85 else "")); ints.append(name)
+            elif roll < 0.22: lines.append(f"bool {name} = {bool_expression()}"); bools.append(name)
+            elif roll < 0.26: lines.append(f"eq {name} = {int_expression()} + x"); eqs.append(name)
+            elif roll < 0.45 and ints: lines.append(f"{rng.choice(ints)} = {int_expression()}")
+            elif roll < 0.5 and bools: lines.append(f"{rng.choice(bools)} = {bool_expression()}")
+            elif roll < 0.7: lines.append(f"print({int_expression()}, {bool_expression()})")
+            elif roll < 0.8 and nesting < 3:
+                lines.append(f"if {bool_expression()}"); block(3, nesting)
+                if rng.random() < 0.5: lines.append(f"elif {bool_expression()}"); block(2, nesting)
+                if rng.random() < 0.5: lines.append("else"); block(2, nesting)
+            elif roll < 0.88 and nesting < 3:
+                lines.extend([f"int {name} = 0", f"while {name} < {rng.randint(0, 3)}"])
+                counters.append(name); lines.append("BEGIN"); saved = ints[:], bools[:], eqs[:], counters[:]
+                body(3, nesting + 1); ints[:], bools[:], eqs[:], counters[:] = saved
+                lines.extend([f"{name} = {name} + 1", "END"])
+            elif roll < 0.92 and eqs: lines.append(f"show({rng.choice(eqs)})")
+            else: lines.append(f"print({rng.choice(ints + bools + eqs + ['x', '1'])})")
+    body(rng.randint(5, 25), 0)
+    return "\n".join(lines + ["END"]) + "\n"
+
+def nested_ifs(depth: int) -> str:
+    lines = ["BEGIN", "int a = 1", "int u"]
+    for d in range(depth): lines += [f"if a > {d - depth}", "BEGIN", f"int d{d} = a + {d}"]
+    lines += ["print(d0 + d1, u, a)", "u = d2 * 2"] + ["END"] * depth + ["print(u)", "END"]
+    return "\n".join(lines) + "\n"
+
+def nested_whiles(depth: int) -> str:
+    lines = ["BEGIN", "int total = 0"]
+    for d in range(depth): lines += [f"int i{d} = 0", f"while i{d} < {1 + d % 2}", "BEGIN"]
+    lines.append("total = total + 1")
+    for d in reversed(range(depth)): lines += [f"i{d} = i{d} + 1", "END"]
+    return "\n".join(lines + ["print(total)", "END"]) + "\n"
+
+def deep_expression(height: int, operand: str) -> str:
+    expression = "1"
+    for _ in range(height // 2): expression = f"(-({expression}) + {operand})"
+    return f"BEGIN\nint i = 3\nint z\nbool b = true\nprint({expression})\nprint(b && {expression} > 0)\nEND\n"
+
+ERROR_PROGRAMS = [
+    "BEGIN\nint a = 1\nprint(a)\nint a = 2\nprint(a)\nEND\n",            # re-declaration
+    "BEGIN\nint i = 0\ny = 3\nEND\n",                                    # assignment to an undeclared name
+    "BEGIN\nint i = 3\nint w = 5 / (i - 3)\nprint(w)\nEND\n",            # division by zero
+    "BEGIN\nint u\nu = u + 1\nprint(u)\nEND\n",                          # symbolic value stored in an int
+    "BEGIN\nint i = 0\nwhile i < 10\nBEGIN\nprint(input())\ni = i + 1\nEND\nEND\n", # input runs out
+    "BEGIN\nint k = 0\nwhile k < 3\nBEGIN\nprint(k)\nk = k + 1\nEND\nif k > 100\nBEGIN\nk = true\nEND\nEND\n", # type error in a branch never taken
+    "BEGIN\nint x\nif false\nBEGIN\nprint(1)\nEND\nelif x\nBEGIN\nprint(2)\nEND\nEND\n", # non-bool elif promoted by the optimizer
+]
+
+class EngineParityTest(unittest.TestCase):
+    def assertSameOutput(self, source: str, label: str, inputs=INPUTS):
+        expected = run(source, "tree", inputs)
+        for engine in ("vm", "codegen", "flat"): self.assertEqual(run(source, engine, inputs), expected, f"{label}: {engine}")
+
+    def test_testes_programs(self):
+        testes_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "testes")
+        for path in sorted(glob.glob(os.path.join(testes_dir, "**", "*.kh"), recursive=True)):
+            with open(path, "r") as f: self.assertSameOutput(f.read(), os.path.relpath(path, testes_dir))
+
+    def test_random_programs(self):
+        rng = random.Random(21)
+        for case in range(300): self.assertSameOutput(random_program(rng), f"random program #{case}", RANDOM_INPUTS)
+
+    def test_nesting_limits(self):
+        for depth in (MAX_NESTING - 1, MAX_NESTING + 10): self.assertSameOutput(nested_ifs(depth), f"{depth} nested ifs")
+        for depth in (MAX_LOOP_NESTING - 1, MAX_LOOP_NESTING + 2): self.assertSameOutput(nested_whiles(depth), f"{depth} nested whiles")
+
+    def test_deep_expressions(self):
+        for height in (RECURSION_HEIGHT - 2, RECURSION_HEIGHT, RECURSION_HEIGHT + 2, 4 * RECURSION_HEIGHT):
+            for operand in ("i", "z"): self.assertSameOutput(deep_expression(height, operand), f"height {height} over {operand}")
+
+    def test_errors(self):
+        for source in ERROR_PROGRAMS: self.assertSameOutput(source, source)
+
+    def test_flatten_round_trip(self):
+        """FlatAST.from_program keeps what the front end made of the tree: shapes, values, positions, condition messages."""
+        def shape(program):
+            return [(type(node).__name__, node.value, getattr(node, "position", None), getattr(node, "condition_message", None))
+                    for node in postorder(program)]
+        rng = random.Random(15)
+        for case, source in enumerate(ERROR_PROGRAMS + [random_program(rng) for _ in range(50)]):
+            program = Parser.run(source); Optimizer.run(program)
+            self.assertEqual(shape(FlatAST.from_program(program).to_program()), shape(program), f"program #{case}")
+
+if __name__ == "__main__":
+    unittest.main()
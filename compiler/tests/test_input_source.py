@@ -0,0 +1,96 @@
+"""
+Tests for FileSource: on random files (invalid lines, blank lines, missing
+final newline, lines longer than a chunk), the values read must be those of
+reading the file line by line as stdin would, for chunk sizes down to one
+byte; the file is parsed one chunk at a time as input() gets to it, and the
+mapping is closed once the last value has been read.
+bench/input_source.py times FileSource against the other input sources.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import mmap
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.input_source import FileSource
+from classes.output import ListSink, set_sink
+
+def random_file(rng: random.Random) -> bytes:
+    lines = []
+    for _ in range(rng.randint(0, 40)):
+        roll = rng.random()
+        if roll < 0.7: lines.append(str(rng.randint(-10 ** rng.randint(1, 30), 10 ** 6)).encode())
+        elif roll < 0.8: lines.append(b" 12 ")
+        elif roll < 0.85: lines.append(b"")
+        elif roll < 0.9: lines.append("٣٤".encode()) # non-ASCII digits, accepted by int() as on stdin
+        else: lines.append(rng.choice([b"abc", b"1.5", b"\xff", b"--3"]))
+    data = b"\n".join(lines)
+    return data + b"\n" if lines and rng.random() < 0.7 else data
+
+def reference_values(data: bytes):
+    """What input() reads from stdin, line after line: an int, or INVALID."""
+    lines = data.split(b"\n") if data else [] # an empty file has no lines
+    if data.endswith(b"\n"): lines.pop()
+    values = []
+    for line in lines:
+        try: values.append(int(line.decode("utf-8")))
+        except ValueError: values.append(FileSource.INVALID)
+    return values
+
+class FileSourceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory(); self.path = os.path.join(self.directory.name, "input.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def source(self, data: bytes) -> FileSource:
+        with open(self.path, "wb") as f: f.write(data)
+        return FileSource(self.path)
+
+    def test_random_files(self):
+        rng = random.Random(23)
+        for case in range(500):
+            data = random_file(rng)
+            for chunk_size in (1, 2, 7, 64, 1 << 20):
+                with mock.patch.object(FileSource, "CHUNK_SIZE", chunk_size):
+                    self.assertEqual(list(self.source(data).values), reference_values(data), f"file #{case}, chunks of {chunk_size}")
+
+    def test_read_int(self):
+        sink = ListSink(); previous_sink = set_sink(sink)
+        try:
+            source = self.source(b"4\nx\n-2\n")
+            self.assertEqual([source.read_int(), source.read_int()], [4, -2])
+            self.assertRaises(EOFError, source.read_int)
+        finally: set_sink(previous_sink)
+        self.assertEqual(sink.lines, ["Invalid input. Please enter an integer."])
+
+    def test_reads_one_chunk_at_a_time(self):
+        parse_lines = FileSource.parse_lines; parsed = []
+        def counted(lines): parsed.append(len(lines)); return parse_lines(lines)
+        with mock.patch.object(FileSource, "CHUNK_SIZE", 8), mock.patch.object(FileSource, "parse_lines", staticmethod(counted)):
+            source = self.source(b"".join(b"%d\n" % i for i in range(1000)))
+            self.assertEqual(parsed, [])
+            self.assertEqual(source.read_int(), 0)
+            self.assertEqual(len(parsed), 1)
+            self.assertEqual([source.read_int() for _ in range(999)], list(range(1, 1000)))
+            self.assertEqual(sum(parsed), 1000)
+
+    def test_closes_the_mapping_at_the_end(self):
+        buffers = []; mmap_class = mmap.mmap
+        def mapped(*args, **kwargs): buffers.append(mmap_class(*args, **kwargs)); return buffers[-1]
+        with mock.patch("classes.input_source.mmap.mmap", mapped):
+            source = self.source(b"1\n2\n")
+        self.assertEqual(source.read_int(), 1); self.assertFalse(buffers[0].closed)
+        self.assertEqual(source.read_int(), 2)
+        self.assertRaises(EOFError, source.read_int); self.assertTrue(buffers[0].closed)
+        self.assertRaises(EOFError, self.source(b"").read_int)
+
+if __name__ == "__main__":
+    unittest.main()
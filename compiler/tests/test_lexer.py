@@ -0,0 +1,28 @@
+"""
+Differential tests for the lexers: Tokenizer, RegexTokenizer and
+StreamTokenizer (fed through tiny chunks) must produce the same tokens,
+positions and lexical errors on every program in testes/ and on fuzzed
+inputs (see lexer_differential.py). bench/lexer.py runs the same checks on
+more inputs and times the lexers.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tests.lexer_differential import check, check_stream, sources
+
+FUZZ_CASES = 10000
+
+class LexerDifferentialTest(unittest.TestCase):
+    def test_regex_tokenizer_matches_tokenizer(self):
+        self.assertEqual(check(sources(FUZZ_CASES)), 0, "token streams differ (mismatches printed above)")
+
+    def test_stream_tokenizer_matches_regex_tokenizer(self):
+        self.assertEqual(check_stream(sources(FUZZ_CASES)), 0, "token streams differ (mismatches printed above)")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for solve() over several equations: classes/linear_system.py against a
+dense Fraction Gauss-Jordan elimination on small random systems (singular and
+inconsistent ones included), and the language-level outcomes on every engine.
+bench/solve.py times the same solver on large sparse systems.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.type_checker import TypeChecker
+from classes.optimizer import Optimizer
+from classes.symbol_table import SymbolTable
+from classes.bytecode import Compiler
+from classes.vm import VM
+from classes.codegen import CodeGenerator
+from classes.linear_system import solve_linear_system, UNIQUE, INFINITE, INCONSISTENT
+
+def gauss_jordan(rows, n_vars):
+    """Reference solver: dense Fraction elimination of the same rows."""
+    matrix = [[Fraction(row.get(c, 0)) for c in range(n_vars + 1)] for row in rows]
+    rank = 0
+    for col in range(n_vars):
+        pivot = next((r for r in range(rank, len(matrix)) if matrix[r][col]), None)
+        if pivot is None: continue
+        matrix[rank], matrix[pivot] = matrix[pivot], matrix[rank]
+        matrix[rank] = [v / matrix[rank][col] for v in matrix[rank]]
+        for r in range(len(matrix)):
+            if r != rank and matrix[r][col]:
+                factor = matrix[r][col]; matrix[r] = [v - factor * p for v, p in zip(matrix[r], matrix[rank])]
+        rank += 1
+    if any(matrix[r][n_vars] for r in range(rank, len(matrix))): return INCONSISTENT, None
+    if rank < n_vars: return INFINITE, None
+    return UNIQUE, [matrix[i][n_vars] for i in range(n_vars)]
+
+def random_system(rng: random.Random):
+    """Sparse integer rows over n_vars unknowns; some rows combine earlier ones, so systems can be singular or inconsistent."""
+    n_vars = rng.randint(1, 5); rows = []
+    for _ in range(rng.randint(1, n_vars + 1)):
+        if rows and rng.random() < 0.3:
+            a, b = rng.choice(rows), rng.choice(rows); ka, kb = rng.randint(-2, 2), rng.randint(-2, 2)
+            row = {c: ka * a.get(c, 0) + kb * b.get(c, 0) for c in range(n_vars + 1)}
+            if rng.random() < 0.5: row[n_vars] += rng.randint(-1, 1)
+        else: row = {c: rng.randint(-4, 4) for c in range(n_vars + 1) if rng.random() < 0.7}
+        rows.append({c: v for c, v in row.items() if v})
+    return rows, n_vars
+
+ENGINES = {
+    "tree": lambda ast: ast.evaluate(SymbolTable()),
+    "vm": lambda ast: VM(Compiler.run(ast)).run(SymbolTable()),
+    "codegen": lambda ast: CodeGenerator.run(ast).run(SymbolTable()),
+}
+
+def outputs(source: str):
+    """Output of source on every engine."""
+    results = {}
+    for engine, run in ENGINES.items():
+        ast = Parser.run(source); TypeChecker.run(ast); Optimizer.run(ast)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output): run(ast)
+        results[engine] = output.getvalue()
+    return results
+
+class LinearSystemTest(unittest.TestCase):
+    def test_matches_gauss_jordan(self):
+        rng = random.Random(2024)
+        for case in range(3000):
+            rows, n_vars = random_system(rng)
+            expected = gauss_jordan(rows, n_vars)
+            self.assertEqual(solve_linear_system([dict(row) for row in rows], n_vars), expected, (case, rows, n_vars))
+
+    def assertOutput(self, body: str, expected: str):
+        source = "BEGIN\neq f = 2 * x + y\neq g = x - y + z\nint z\n" + body + "\nEND\n"
+        for engine, output in outputs(source).items(): self.assertEqual(output, expected, engine)
+
+    def test_outcomes(self):
+        self.assertOutput("solve(f == 4, g == 0, x, y, z == 1)", "x = 1\ny = 2\n")
+        self.assertOutput("solve(f == 7, g == 2, x, y, z == 1)",
+                          "No integer solution for x (result is 8/3).\nNo integer solution for y (result is 5/3).\n")
+        self.assertOutput("solve(f == 4, f == 4, x, y, z == 1)", "Infinite solutions\n")
+        self.assertOutput("solve(f == 4, f == 5, x, y, z == 1)", "No solution\n")
+        self.assertOutput("solve(f == 4, g == 2, x, y)", "Error: Cannot solve. Equation has other unresolved symbolic variables: {'z'}.\n")
+        self.assertOutput("solve(f == 4, g == 2, x, y, x == 1)", "Runtime Error: 'x' is both solved for and substituted in solve().\n")
+        self.assertOutput("solve(f == 3, x * y == 0, x, y)",
+                          "Runtime Error: Argument 2 of solve() must be an equation (eqName == int_val, eqName an 'eq' variable) or the variable to solve for.\n")
+
+if __name__ == "__main__":
+    unittest.main()
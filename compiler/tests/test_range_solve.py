@@ -0,0 +1,89 @@
+"""
+Tests for range substitutions: solve(e == v, x, y in low..high) must print
+exactly what a while loop of solve(e == v, x, y == i) prints, with NumPy
+(classes/batch_solve.py in int64 arrays) and without it. bench/solve.py
+times the same comparison on the README sweep.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable
+import classes.batch_solve as batch_solve
+
+EQUATIONS = [
+    "3*x + y/4 + z + 3",                          # the README sweep, with uneven divisions
+    "2*x - 6*y + 4",
+    "y*x + 7",                                    # the coefficient of x is zero for y == 0
+    "x*x + y",                                    # not linear in x
+    "x / y + 1",                                  # division by zero for y == 0
+    "(x + y) / 3 - y*y",
+    "123456789012*x + y*987654321987*y - 5",      # too large for int64: falls back to the per-value loop
+    "y + 5",                                      # x does not appear
+    "x + w * y",                                  # w is unresolved
+]
+
+def random_equation(rng: random.Random) -> str:
+    terms = []
+    for _ in range(rng.randint(1, 5)):
+        term = rng.choice(["x", "y", "z", "x*y", "y*y", "(x - y)", "(y + 3)"])
+        if rng.random() < 0.6: term = f"{rng.randint(-9, 9)}*{term}"
+        if rng.random() < 0.3: term = f"{term} / {rng.choice([1, 2, 3, 4, -6])}"
+        terms.append(term)
+    return " + ".join(terms) + f" + {rng.randint(-20, 20)}"
+
+PROGRAM = """BEGIN
+int x
+int y
+int z = 5
+int w
+eq e = {equation}
+{solve}
+END
+"""
+
+LOOP = """int i = {low}
+while i <= {high}
+BEGIN
+solve(e == {target}, x, y == i)
+i = i + 1
+END"""
+
+def output(source: str) -> str:
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed): Parser.run(source).evaluate(SymbolTable())
+    return printed.getvalue()
+
+class RangeSolveTest(unittest.TestCase):
+    def assertSameAsLoop(self, equation: str, target: int, low: int, high: int):
+        loop = output(PROGRAM.format(equation=equation, solve=LOOP.format(low=low, high=high, target=target)))
+        ranged = PROGRAM.format(equation=equation, solve=f"solve(e == {target}, x, y in {low}..{high})")
+        numpy = batch_solve.np
+        try:
+            for module in (numpy, None):
+                batch_solve.np = module
+                self.assertEqual(output(ranged), loop, (equation, target, low, high, "NumPy" if module else "pure Python"))
+        finally: batch_solve.np = numpy
+
+    def test_equations(self):
+        for equation in EQUATIONS: self.assertSameAsLoop(equation, 0, -30, 30)
+
+    def test_random_equations(self):
+        rng = random.Random(11)
+        for _ in range(150):
+            low = rng.randint(-50, 50)
+            self.assertSameAsLoop(random_equation(rng), rng.randint(-30, 30), low, low + rng.randint(-1, 60))
+
+    def test_several_batches(self):
+        self.assertSameAsLoop(EQUATIONS[0], 0, -10, 2 * batch_solve.BATCH_SIZE + 10)
+
+if __name__ == "__main__":
+    unittest.main()
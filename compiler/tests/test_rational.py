@@ -0,0 +1,70 @@
+"""
+Tests for exact rational coefficients in solve(): random equations with
+uneven divisions by constants are solved through the cached LinearForm and
+through the AST walk (SolveCmdNode.use_linear_forms = False), and both must
+print the answer computed directly with fractions.Fraction.
+bench/rational_terms.py times the two paths on equations of thousands of terms.
+
+Usage (from compiler/): python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import unittest
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from classes.parser import Parser
+from classes.symbol_table import SymbolTable
+from classes.ops import SolveCmdNode
+from classes.batch_solve import outcome_message
+from tests.rational_equations import equation, expected_line
+
+def random_term(rng: random.Random, depth: int = 0) -> str:
+    """A term linear in x, with divisions by nonzero constants."""
+    choice = rng.randint(0, 5 if depth < 2 else 2)
+    if choice == 0: return f"{rng.randint(-9, 9)} * x"
+    if choice == 1: return f"{rng.randint(-9, 9)} * y"
+    if choice == 2: return str(rng.randint(-20, 20))
+    if choice == 3: return f"y * x / {rng.choice([2, 3, -4, 6])}"
+    if choice == 4: return f"({random_term(rng, depth + 1)} + {random_term(rng, depth + 1)}) / {rng.choice([1, 2, 3, 5, -7, 12])}"
+    return f"({random_term(rng, depth + 1)} - {random_term(rng, depth + 1)}) * {rng.randint(-3, 3)}"
+
+def reference_line(body: str, target: int, y: int) -> str:
+    """solve(e == target, x, y == y) computed with Fractions: the body is valid Python once its literals are Fractions."""
+    python = re.sub(r"\d+", lambda literal: f"F({literal.group()})", body)
+    at = lambda x: eval(python, {"F": Fraction}, {"x": Fraction(x), "y": Fraction(y)})
+    const = at(0) - target; coeff = at(1) - at(0)
+    coeff = coeff.numerator if coeff.denominator == 1 else coeff; const = const.numerator if const.denominator == 1 else const
+    return outcome_message("x", coeff, const, True, set())
+
+def output(source: str, use_linear_forms: bool) -> str:
+    SolveCmdNode.use_linear_forms = use_linear_forms
+    printed = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(printed): Parser.run(source).evaluate(SymbolTable())
+    finally: SolveCmdNode.use_linear_forms = True
+    return printed.getvalue()
+
+class RationalCoefficientsTest(unittest.TestCase):
+    def test_random_equations(self):
+        rng = random.Random(20)
+        for _ in range(300):
+            body = " + ".join(random_term(rng) for _ in range(rng.randint(1, 4)))
+            target = rng.randint(-10, 10); y = rng.randint(-6, 6)
+            source = f"BEGIN\nint x\neq e = {body}\nsolve(e == {target}, x, y == {y})\nEND\n"
+            expected = reference_line(body, target, y) + "\n"
+            for use_linear_forms in (True, False): self.assertEqual(output(source, use_linear_forms), expected, (body, target, y, use_linear_forms))
+
+    def test_many_terms(self):
+        for exact in (False, True):
+            declarations, body, const = equation(300, exact, random.Random(300))
+            source = "\n".join(["BEGIN", "int x", *declarations, f"eq f = {body}", "solve(f == 0, x)", "END"]) + "\n"
+            for use_linear_forms in (True, False): self.assertEqual(output(source, use_linear_forms), expected_line(const) + "\n", (exact, use_linear_forms))
+
+if __name__ == "__main__":
+    unittest.main()